@@ -20,7 +20,7 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('itineraries', sa.Column('trip_theme', sa.ARRAY(sa.String()), nullable=True))
+    op.add_column('itineraries', sa.Column('trip_theme', sa.ARRAY(sa.String()).with_variant(sa.JSON(), 'sqlite'), nullable=True))
     op.add_column('itineraries', sa.Column('budget', sa.String(), nullable=True))
     op.add_column('itineraries', sa.Column('pace', sa.String(), nullable=True))
     op.add_column('itineraries', sa.Column('travel_mode', sa.String(), nullable=True))
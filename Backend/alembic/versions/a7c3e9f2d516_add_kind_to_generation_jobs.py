@@ -0,0 +1,35 @@
+"""add kind to generation jobs
+
+Revision ID: a7c3e9f2d516
+Revises: f4d1b7e3a962
+Create Date: 2026-10-18 23:41:07.518264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f2d516'
+down_revision: Union[str, None] = 'f4d1b7e3a962'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+generation_jobs = sa.table(
+    'generation_jobs',
+    sa.column('kind', sa.String()),
+    sa.column('trip_id', sa.Integer()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('generation_jobs') as batch_op:
+        batch_op.add_column(sa.Column('kind', sa.String(), server_default='itinerary', nullable=False))
+    op.execute(generation_jobs.update().where(generation_jobs.c.trip_id.isnot(None)).values(kind='trip'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('generation_jobs') as batch_op:
+        batch_op.drop_column('kind')
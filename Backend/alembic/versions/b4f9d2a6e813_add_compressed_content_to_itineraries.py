@@ -0,0 +1,92 @@
+"""add compressed content to itineraries
+
+Revision ID: b4f9d2a6e813
+Revises: a8e3b6c1f047
+Create Date: 2026-10-18 16:27:55.208931
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f9d2a6e813'
+down_revision: Union[str, None] = 'a8e3b6c1f047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# Frozen copy of app.compression as of this revision, so the migration keeps
+# producing the same bytes however the app module changes later
+ITINERARY_DICTIONARY_V1 = (
+    "Currency: Language: Safety: Emergency numbers Visa requirements "
+    "Optional Activities: Practical Tips: Packing list: comfortable walking shoes, sunscreen, "
+    "a light jacket, an umbrella, a reusable water bottle "
+    "Accommodation Suggestions: budget-friendly hostels, mid-range hotels, luxury resorts, homestays, guesthouses "
+    "Transportation: public transport, taxi, auto-rickshaw, metro, bus, walking, self-drive, cab "
+    "Weather Considerations: temperature, humidity, rainfall, monsoon, winter, summer "
+    "Food Recommendations: local cuisine, street food, traditional dishes, famous restaurants, cafe "
+    "Breakfast: Lunch: Dinner: "
+    "Check in to your hotel and relax. Explore the local market. Visit the museum. "
+    "Enjoy a sunset view. Return to your hotel. "
+    "Morning: Afternoon: Evening: Night: "
+    "**Day 10: **Day 9: **Day 8: **Day 7: **Day 6: **Day 5: **Day 4: **Day 3: **Day 2: **Day 1: "
+    "\n* **Morning:** \n* **Afternoon:** \n* **Evening:** \n\n**"
+).encode("utf-8")
+
+DICTIONARIES = {
+    0: b"",
+    1: ITINERARY_DICTIONARY_V1,
+}
+
+
+def compress_content(content: str) -> bytes:
+    compressor = zlib.compressobj(9, zdict=ITINERARY_DICTIONARY_V1)
+    return bytes([1]) + compressor.compress(content.encode("utf-8")) + compressor.flush()
+
+
+def decompress_content(data: bytes) -> str:
+    zdict = DICTIONARIES[data[0]]
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(data[1:]) + decompressor.flush()).decode("utf-8")
+
+itineraries = sa.table(
+    'itineraries',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+    sa.column('content_compressed', sa.LargeBinary()),
+)
+
+
+def _convert(source, target, convert) -> None:
+    # Walk the table by id in batches so large tables are not loaded at once
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(itineraries.c.id, source)
+            .where(itineraries.c.id > last_id, source.isnot(None))
+            .order_by(itineraries.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            itineraries.update().where(itineraries.c.id == sa.bindparam('row_id')),
+            [{'row_id': row[0], target.name: convert(row[1]), source.name: None} for row in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.add_column('itineraries', sa.Column('content_compressed', sa.LargeBinary(), nullable=True))
+    _convert(itineraries.c.content, itineraries.c.content_compressed, compress_content)
+
+
+def downgrade() -> None:
+    _convert(itineraries.c.content_compressed, itineraries.c.content, decompress_content)
+    op.drop_column('itineraries', 'content_compressed')
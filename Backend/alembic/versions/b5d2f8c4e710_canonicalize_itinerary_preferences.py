@@ -0,0 +1,101 @@
+"""canonicalize itinerary preferences
+
+Revision ID: b5d2f8c4e710
+Revises: a7c3e9f2d516
+Create Date: 2026-10-19 09:12:44.903517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f8c4e710'
+down_revision: Union[str, None] = 'a7c3e9f2d516'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# Frozen copies of the canonical names and aliases in app.prompts as of this
+# revision. Themes and group types saved before requests were validated are
+# rewritten to these names so the search filters match them; values with no
+# canonical name are dropped.
+THEMES = ("adventure", "religious", "cultural", "foodie", "relaxation", "romantic", "family-friendly")
+THEME_ALIASES = {
+    "adventurous": "adventure",
+    "spiritual": "religious",
+    "culture": "cultural",
+    "food": "foodie",
+    "relax": "relaxation",
+    "romance": "romantic",
+    "family friendly": "family-friendly",
+    "family_friendly": "family-friendly",
+    "kids": "family-friendly",
+}
+GROUP_TYPES = ("solo", "couple", "family", "friends", "senior_friendly")
+GROUP_ALIASES = {
+    "senior friendly": "senior_friendly",
+    "senior-friendly": "senior_friendly",
+    "seniors": "senior_friendly",
+    "couples": "couple",
+}
+
+itineraries = sa.table(
+    'itineraries',
+    sa.column('id', sa.Integer()),
+    sa.column('trip_theme', sa.ARRAY(sa.String()).with_variant(sa.JSON(none_as_null=True), 'sqlite')),
+    sa.column('group_type', sa.String()),
+)
+
+
+def _canonical(value: str, names, aliases) -> Union[str, None]:
+    key = " ".join(value.lower().split())
+    key = aliases.get(key, key)
+    return key if key in names else None
+
+
+def _canonical_themes(value):
+    if not value:
+        return value
+    themes = []
+    for theme in value:
+        canonical = _canonical(theme, THEMES, THEME_ALIASES)
+        if canonical is not None and canonical not in themes:
+            themes.append(canonical)
+    return themes
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(itineraries.c.id, itineraries.c.trip_theme, itineraries.c.group_type)
+            .where(itineraries.c.id > last_id)
+            .order_by(itineraries.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        changed = []
+        for row in rows:
+            trip_theme = _canonical_themes(row.trip_theme)
+            group_type = _canonical(row.group_type, GROUP_TYPES, GROUP_ALIASES) if row.group_type else row.group_type
+            if trip_theme != row.trip_theme or group_type != row.group_type:
+                changed.append({'row_id': row.id, 'row_trip_theme': trip_theme, 'row_group_type': group_type})
+        if changed:
+            conn.execute(
+                itineraries.update()
+                .where(itineraries.c.id == sa.bindparam('row_id'))
+                .values(trip_theme=sa.bindparam('row_trip_theme'), group_type=sa.bindparam('row_group_type')),
+                changed,
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    # The original spellings are not kept
+    pass
@@ -0,0 +1,126 @@
+"""add search index to itineraries
+
+Revision ID: c6a1e4d8b072
+Revises: b4f9d2a6e813
+Create Date: 2026-10-18 17:05:31.482907
+
+"""
+import os
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a1e4d8b072'
+down_revision: Union[str, None] = 'b4f9d2a6e813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# Frozen copies of app.search and app.compression as of this revision, so
+# later changes to those modules do not change what this migration builds.
+# The text search configuration must still match the one queries use.
+SEARCH_TEXT_CONFIG = os.getenv("SEARCH_TEXT_CONFIG", "english")
+FTS_TABLE = "itineraries_fts"
+CREATE_FTS_TABLE = f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(destination, content, owner_id)"
+
+ITINERARY_DICTIONARY_V1 = (
+    "Currency: Language: Safety: Emergency numbers Visa requirements "
+    "Optional Activities: Practical Tips: Packing list: comfortable walking shoes, sunscreen, "
+    "a light jacket, an umbrella, a reusable water bottle "
+    "Accommodation Suggestions: budget-friendly hostels, mid-range hotels, luxury resorts, homestays, guesthouses "
+    "Transportation: public transport, taxi, auto-rickshaw, metro, bus, walking, self-drive, cab "
+    "Weather Considerations: temperature, humidity, rainfall, monsoon, winter, summer "
+    "Food Recommendations: local cuisine, street food, traditional dishes, famous restaurants, cafe "
+    "Breakfast: Lunch: Dinner: "
+    "Check in to your hotel and relax. Explore the local market. Visit the museum. "
+    "Enjoy a sunset view. Return to your hotel. "
+    "Morning: Afternoon: Evening: Night: "
+    "**Day 10: **Day 9: **Day 8: **Day 7: **Day 6: **Day 5: **Day 4: **Day 3: **Day 2: **Day 1: "
+    "\n* **Morning:** \n* **Afternoon:** \n* **Evening:** \n\n**"
+).encode("utf-8")
+
+DICTIONARIES = {
+    0: b"",
+    1: ITINERARY_DICTIONARY_V1,
+}
+
+itineraries = sa.table(
+    'itineraries',
+    sa.column('id', sa.Integer()),
+    sa.column('destination', sa.String()),
+    sa.column('owner_id', sa.Integer()),
+    sa.column('content', sa.Text()),
+    sa.column('content_compressed', sa.LargeBinary()),
+    sa.column('search_vector', postgresql.TSVECTOR()),
+)
+
+
+def decompress_content(data: bytes) -> str:
+    zdict = DICTIONARIES[data[0]]
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(data[1:]) + decompressor.flush()).decode("utf-8")
+
+
+def search_vector(destination, content):
+    return sa.func.setweight(sa.func.to_tsvector(SEARCH_TEXT_CONFIG, sa.func.coalesce(destination, "")), sa.literal_column("'A'")).op("||")(
+        sa.func.setweight(sa.func.to_tsvector(SEARCH_TEXT_CONFIG, sa.func.coalesce(content, "")), sa.literal_column("'B'"))
+    )
+
+
+def _backfill(statement) -> None:
+    # Content may be compressed, so the text is decoded here in id-ordered batches
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(itineraries.c.id, itineraries.c.destination, itineraries.c.owner_id, itineraries.c.content, itineraries.c.content_compressed)
+            .where(itineraries.c.id > last_id)
+            .order_by(itineraries.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(statement, [
+            {
+                'row_id': row.id,
+                'row_destination': row.destination,
+                'row_owner_id': row.owner_id,
+                'row_content': decompress_content(row.content_compressed) if row.content_compressed is not None else row.content,
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.add_column('itineraries', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        _backfill(
+            itineraries.update()
+            .where(itineraries.c.id == sa.bindparam('row_id'))
+            .values(search_vector=search_vector(sa.bindparam('row_destination'), sa.bindparam('row_content')))
+        )
+        op.create_index('ix_itineraries_search_vector', 'itineraries', ['search_vector'], unique=False, postgresql_using='gin')
+        op.create_index('ix_itineraries_trip_theme', 'itineraries', ['trip_theme'], unique=False, postgresql_using='gin')
+    else:
+        op.add_column('itineraries', sa.Column('search_vector', sa.Text(), nullable=True))
+        op.execute(CREATE_FTS_TABLE)
+        _backfill(sa.text(
+            f"INSERT INTO {FTS_TABLE} (rowid, destination, content, owner_id) "
+            "VALUES (:row_id, :row_destination, :row_content, :row_owner_id)"
+        ))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_itineraries_trip_theme', table_name='itineraries', postgresql_using='gin')
+        op.drop_index('ix_itineraries_search_vector', table_name='itineraries', postgresql_using='gin')
+    else:
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    op.drop_column('itineraries', 'search_vector')
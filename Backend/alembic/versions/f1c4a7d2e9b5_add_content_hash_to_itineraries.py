@@ -0,0 +1,56 @@
+"""add content hash to itineraries
+
+Revision ID: f1c4a7d2e9b5
+Revises: e5b8f0a3c6d1
+Create Date: 2026-10-18 13:02:38.117646
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c4a7d2e9b5'
+down_revision: Union[str, None] = 'e5b8f0a3c6d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+itineraries = sa.table(
+    'itineraries',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+    sa.column('content_hash', sa.String()),
+)
+
+
+def upgrade() -> None:
+    op.add_column('itineraries', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_itineraries_content_hash'), 'itineraries', ['content_hash'], unique=False)
+
+    # Backfill hashes so existing itineraries also render lazily on download
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(itineraries.c.id, itineraries.c.content)
+            .where(itineraries.c.id > last_id, itineraries.c.content.isnot(None))
+            .order_by(itineraries.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            itineraries.update().where(itineraries.c.id == sa.bindparam('row_id')),
+            [{'row_id': row.id, 'content_hash': hashlib.sha256(row.content.encode('utf-8')).hexdigest()} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_itineraries_content_hash'), table_name='itineraries')
+    op.drop_column('itineraries', 'content_hash')
@@ -1,30 +1,69 @@
 import os
+import asyncio
 import requests
 import logging
-from datetime import date
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterator, List, Optional
 
-from langchain.tools import tool
-from langchain.agents import initialize_agent, AgentType
-from langchain_google_genai import ChatGoogleGenerativeAI
+from .llm import DEFAULT_TIER, get_llm
+from .prompts import build_itinerary_prompt, build_structured_prompt, build_day_prompt, build_refine_prompt, build_transport_prompt
+from .schemas import StructuredItinerary
+from .structured import parse_day, parse_structured_itinerary
+from .geocache import geocode_cache
+from .poi import poi_index
+from .forecast import OPEN_METEO_URL, forecast_cache, format_weather_table
+from .http_client import http_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+# Places from the POI index listed to the LLM, nearest to the centre first
+POI_CONTEXT_LIMIT = int(os.getenv("POI_CONTEXT_LIMIT", 15))
+# Threads fetching places alongside the weather for pipeline generation
+CONTEXT_WORKERS = int(os.getenv("CONTEXT_WORKERS", 8))
+
+# "agent" lets the ReAct agent decide which tools to call, at the cost of
+# several LLM round-trips. "pipeline" fetches places and weather up front
+# and makes a single LLM call.
+GENERATION_MODES = ("agent", "pipeline")
+GENERATION_MODE = os.getenv("GENERATION_MODE", "agent")
+if GENERATION_MODE not in GENERATION_MODES:
+    raise ValueError(f"GENERATION_MODE must be one of {', '.join(GENERATION_MODES)}")
+
+_context_executor = ThreadPoolExecutor(max_workers=CONTEXT_WORKERS, thread_name_prefix="city-context")
+
+
+class AgentUnavailable(Exception):
+    pass
+
+
+def _complete_days(days: list, start_date: date, end_date: date) -> list:
+    # Extra days are already dropped; a short reply would store day records
+    # for only part of the trip
+    expected = (end_date - start_date).days + 1
+    if len(days) != expected:
+        raise ValueError(f"LLM reply has {len(days)} days, expected {expected}")
+    return days
+
+
 class AIAgent:
-    def __init__(self):
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        if not google_api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable not set.")
-        
-        self.llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=google_api_key)
-        
+    def __init__(self, tier: Optional[str] = None):
+        # langchain and the model SDKs are slow to import, so they are only
+        # loaded once an agent is actually needed
+        from langchain.tools import tool
+        from langchain.agents import initialize_agent, AgentType
+
+        self.llm = get_llm(tier)
+
         tools = [
-            AIAgent._search_places_tool,
-            AIAgent._get_weather_tool,
-            AIAgent._suggest_itinerary_tool
+            tool(AIAgent._search_places_tool),
+            tool(AIAgent._get_weather_tool),
+            tool(AIAgent._suggest_itinerary_tool)
         ]
-        
+
         self.agent = initialize_agent(
             tools,
             self.llm,
@@ -43,10 +82,13 @@ class AIAgent:
 
     @staticmethod
     def _get_city_coords(city: str):
-        url = f"https://nominatim.openstreetmap.org/search?city={city}&format=json&limit=1"
-        headers = {"User-Agent": "TripPlanner/1.0 (dev@example.com)"}
+        return geocode_cache.get_or_fetch(city, AIAgent._fetch_city_coords)
+
+    @staticmethod
+    def _fetch_city_coords(city: str):
+        params = {"city": city, "format": "json", "limit": 1}
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_client.get(NOMINATIM_URL, params=params)
             resp.raise_for_status()
             try:
                 geo = resp.json()
@@ -61,71 +103,113 @@ class AIAgent:
             logger.error(f"Error in _get_city_coords: {e}")
             return None, None
 
+    @staticmethod
+    def _weather_params(lat: str, lon: str) -> dict:
+        return {"latitude": lat, "longitude": lon, "current_weather": "true"}
+
+    @staticmethod
+    def _parse_weather(data) -> dict:
+        return data.get('current_weather', {}) if data else {}
+
     @staticmethod
     def _search_places(city: str):
-        lat, lon = AIAgent._get_city_coords(city)
-        if not lat or not lon:
-            return []
-        url = f"https://en.wikipedia.org/w/api.php?action=query&list=geosearch&gsradius=5000&gscoord={lat}|{lon}&gslimit=5&format=json"
-        try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-            try:
-                data = resp.json()
-            except requests.exceptions.JSONDecodeError:
-                data = None
-            return [place['title'] for place in data.get('query', {}).get('geosearch', [])] if data else []
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error in _search_places: {e}")
-            return []
+        return [poi["title"] for poi in poi_index.places(city, limit=POI_CONTEXT_LIMIT)]
 
     @staticmethod
     def _get_weather(city: str):
         lat, lon = AIAgent._get_city_coords(city)
         if not lat or not lon:
             return {}
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = http_client.get(OPEN_METEO_URL, params=AIAgent._weather_params(lat, lon))
             resp.raise_for_status()
             try:
                 data = resp.json()
             except requests.exceptions.JSONDecodeError:
                 data = None
-            return data.get('current_weather', {}) if data else {}
+            return AIAgent._parse_weather(data)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error in _get_weather: {e}")
             return {}
 
     @staticmethod
-    def _suggest_itinerary(city: str, days: int):
-        places = AIAgent._search_places(city)
-        if not places:
+    def _get_trip_weather(city: str, start_date: date, end_date: date) -> str:
+        lat, lon = AIAgent._get_city_coords(city)
+        if not lat or not lon:
+            return ""
+        days = forecast_cache.get_daily(lat, lon, start_date, end_date)
+        return format_weather_table(days) if days else ""
+
+    @staticmethod
+    def gather_city_context(city: str, start_date: date, end_date: date) -> dict:
+        """Geocode the city once, then fetch places and the trip's daily weather concurrently.
+
+        Both go through the shared http_client, so connections stay pooled
+        across requests.
+        """
+        lat, lon = AIAgent._get_city_coords(city)
+        if not lat or not lon:
+            return {"places": [], "forecast": ""}
+        places = _context_executor.submit(AIAgent._search_places, city)
+        days = forecast_cache.get_daily(lat, lon, start_date, end_date)
+        return {"places": places.result(), "forecast": format_weather_table(days) if days else ""}
+
+    @staticmethod
+    async def agather_city_context(city: str, start_date: date, end_date: date) -> dict:
+        """gather_city_context for callers on the event loop.
+
+        The weather comes through the shared async_http_client; geocoding and
+        the POI index are cached and run on threads alongside it.
+        """
+        lat, lon = await asyncio.to_thread(AIAgent._get_city_coords, city)
+        if not lat or not lon:
+            return {"places": [], "forecast": ""}
+        places, days = await asyncio.gather(
+            asyncio.to_thread(AIAgent._search_places, city),
+            forecast_cache.aget_daily(lat, lon, start_date, end_date),
+        )
+        return {"places": places, "forecast": format_weather_table(days) if days else ""}
+
+    @staticmethod
+    def _suggest_itinerary(city: str, days: int, pace: Optional[str] = None):
+        # numpy is only needed here, so keep it off the startup path
+        from .planner import plan_days
+
+        plan = plan_days(poi_index.places(city), days, pace)
+        if not any(plan):
             return ["No places found."]
-        itinerary = []
-        for i in range(days):
-            place = places[i % len(places)]
-            itinerary.append(f"Day {i+1}: Visit {place}")
-        return itinerary
+        return [
+            f"Day {i+1}: Visit {', '.join(poi['title'] for poi in stops)}" if stops else f"Day {i+1}: Free day"
+            for i, stops in enumerate(plan)
+        ]
 
-    @tool
     @staticmethod
     def _search_places_tool(city: str) -> list:
         """Return a list of the most notable tourist attractions and places to visit in the given city."""
         return AIAgent._search_places(city)
 
-    @tool
     @staticmethod
-    def _get_weather_tool(city: str) -> dict:
-        """Get the current weather for a given city."""
-        return AIAgent._get_weather(city)
+    def _get_weather_tool(user_input: str):
+        """
+        Get the weather for a city. Input 'city' returns the current weather.
+        Input 'city, start_date, end_date' with ISO dates returns a daily
+        forecast (or typical weather, for dates far ahead) for the trip.
+        """
+        parts = [p.strip() for p in user_input.split(",")]
+        if len(parts) < 3:
+            return AIAgent._get_weather(parts[0])
+        try:
+            start_date, end_date = date.fromisoformat(parts[1]), date.fromisoformat(parts[2])
+        except ValueError:
+            return "Error: Dates must be in YYYY-MM-DD format."
+        return AIAgent._get_trip_weather(parts[0], start_date, end_date) or "No weather data found."
 
-    @tool
     @staticmethod
     def _suggest_itinerary_tool(user_input: str) -> list:
         """
-        Suggest a travel itinerary for a given city and number of days.
-        Input should be 'city, days'.
+        Suggest a travel itinerary for a given city and number of days, with
+        nearby places grouped into the same day. Input should be
+        'city, days' or 'city, days, pace' where pace is relaxed or packed.
         """
         parts = [p.strip() for p in user_input.split(",")]
         if len(parts) < 2:
@@ -135,78 +219,138 @@ class AIAgent:
             days = int(parts[1])
         except ValueError:
             return ["Error: Number of days must be an integer."]
-        return AIAgent._suggest_itinerary(city, days)
+        return AIAgent._suggest_itinerary(city, days, parts[2] if len(parts) > 2 else None)
 
-    def generate_itinerary(
-        self, 
-        place: str, 
-        start_date: date, 
+    def _build_prompt(
+        self,
+        place: str,
+        start_date: date,
         end_date: date,
         trip_theme: Optional[List[str]] = None,
         budget: Optional[str] = None,
         pace: Optional[str] = None,
         travel_mode: Optional[str] = None,
-        group_type: Optional[str] = None
+        group_type: Optional[str] = None,
+        context: Optional[dict] = None
     ) -> str:
-        preferences_context = ""
-        if trip_theme:
-            preferences_context += f"\nTrip Themes: {', '.join(trip_theme)}"
-        if budget:
-            preferences_context += f"\nBudget Level: {budget}"
-        if pace:
-            preferences_context += f"\nPace Preference: {pace}"
-        if travel_mode:
-            preferences_context += f"\nPreferred Travel Mode: {travel_mode}"
-        if group_type:
-            preferences_context += f"\nGroup Type: {group_type}"
-
-        theme_recommendations = ""
-        if trip_theme:
-            theme_recommendations = "\n\nTheme-Based Recommendations:\n"
-            for theme in trip_theme:
-                if theme.lower() == "adventure":
-                    theme_recommendations += "- Focus on outdoor activities, trekking, adventure sports, and adrenaline-pumping experiences\n"
-                elif theme.lower() == "religious":
-                    theme_recommendations += "- Include temples, holy sites, spiritual experiences, and religious festivals\n"
-                elif theme.lower() == "cultural":
-                    theme_recommendations += "- Emphasize museums, historical sites, local traditions, and cultural experiences\n"
-                elif theme.lower() == "foodie":
-                    theme_recommendations += "- Highlight local cuisine, food tours, cooking classes, and famous restaurants\n"
-                elif theme.lower() == "relaxation":
-                    theme_recommendations += "- Focus on spas, beaches, peaceful locations, and stress-free activities\n"
-                elif theme.lower() == "romantic":
-                    theme_recommendations += "- Include romantic spots, couple activities, scenic views, and intimate dining\n"
-                elif theme.lower() == "family-friendly":
-                    theme_recommendations += "- Ensure child-safe activities, family restaurants, and kid-friendly attractions\n"
-
-        group_recommendations = ""
-        if group_type:
-            group_recommendations = "\n\nGroup-Specific Recommendations:\n"
-            if group_type.lower() == "solo":
-                group_recommendations += "- Include solo-friendly activities, social opportunities, and safe travel options\n"
-            elif group_type.lower() == "couple":
-                group_recommendations += "- Focus on romantic activities, intimate dining, and couple-friendly experiences\n"
-            elif group_type.lower() == "family":
-                group_recommendations += "- Ensure child-safe activities, family restaurants, and kid-friendly attractions\n"
-            elif group_type.lower() == "friends":
-                group_recommendations += "- Include group activities, social experiences, nightlife, and fun group adventures\n"
-            elif group_type.lower() == "senior_friendly":
-                group_recommendations += "- Focus on accessible activities, comfortable transportation, and senior-friendly accommodations\n"
-
-        prompt = f"""Generate a detailed travel itinerary for a trip to {place} from {start_date} to {end_date}.{preferences_context}
-
-        Please include:
-        - Daily breakdown: A day-by-day plan with specific activities, attractions, and recommended timings.
-        - Weather considerations: Suggest activities and packing advice based on the typical weather conditions in {place} during that time.
-        - Transportation: Recommendations for getting around based on the preferred travel mode.
-        - Accommodation suggestions: Briefly mention suitable accommodation types based on budget level.
-        - Food recommendations: Highlight local dishes or restaurants.
-        - Optional activities: Include a few extra suggestions.
-        - Practical tips: Any essential travel tips (currency, language, safety).{theme_recommendations}{group_recommendations}
-        
-        Please present the itinerary in a clear, organized, and professional format that aligns with the specified preferences."""
-        
+        return build_itinerary_prompt(
+            place, start_date, end_date,
+            trip_theme=trip_theme,
+            budget=budget,
+            pace=pace,
+            travel_mode=travel_mode,
+            group_type=group_type,
+            context=context
+        )
+
+    def generate_itinerary(self, place: str, start_date: date, end_date: date, mode: Optional[str] = None, **preferences) -> str:
+        if (mode or GENERATION_MODE) == "pipeline":
+            prompt = self._build_prompt(place, start_date, end_date, context=self.gather_city_context(place, start_date, end_date), **preferences)
+            return self.llm.invoke(prompt).content
+        prompt = self._build_prompt(place, start_date, end_date, **preferences)
         response = self.agent.run(prompt)
         return response
 
-agent_instance = AIAgent()
\ No newline at end of file
+    def generate_structured_itinerary(self, place: str, start_date: date, end_date: date, **preferences):
+        """Return one validated day record per trip day, from a single LLM call."""
+        context = self.gather_city_context(place, start_date, end_date)
+        prompt = build_structured_prompt(place, start_date, end_date, context=context, **preferences)
+        return _complete_days(parse_structured_itinerary(self.llm.invoke(prompt).content, start_date, end_date), start_date, end_date)
+
+    def regenerate_day(self, place: str, start_date: date, end_date: date, day_number: int, other_days: List[str], **preferences):
+        """Replan a single day; ``other_days`` summarises the rest of the trip so it is not repeated."""
+        day_date = start_date + timedelta(days=day_number - 1)
+        prompt = build_day_prompt(place, start_date, end_date, day_number, day_date, other_days, **preferences)
+        return parse_day(self.llm.invoke(prompt).content, day_number, day_date)
+
+    def refine_itinerary(
+        self,
+        place: str,
+        start_date: date,
+        end_date: date,
+        content: str,
+        changes: dict,
+        instruction: Optional[str] = None
+    ) -> str:
+        """Revise existing itinerary text, sending only the changed preferences."""
+        prompt = build_refine_prompt(place, start_date, end_date, content, changes, instruction)
+        return self.llm.invoke(prompt).content
+
+    def refine_structured_itinerary(
+        self,
+        place: str,
+        start_date: date,
+        end_date: date,
+        days: list,
+        changes: dict,
+        instruction: Optional[str] = None
+    ):
+        content = StructuredItinerary(days=days).json(exclude={"days": {"__all__": {"date"}}})
+        prompt = build_refine_prompt(place, start_date, end_date, content, changes, instruction, structured=True)
+        return _complete_days(parse_structured_itinerary(self.llm.invoke(prompt).content, start_date, end_date), start_date, end_date)
+
+    def summarise_transport(self, legs: List[tuple], distances: List[Optional[float]], **preferences) -> str:
+        """One call covering every transfer of a multi-city trip."""
+        return self.llm.invoke(build_transport_prompt(legs, distances, **preferences)).content
+
+    def stream_itinerary(
+        self,
+        place: str,
+        start_date: date,
+        end_date: date,
+        mode: Optional[str] = None,
+        context: Optional[dict] = None,
+        **preferences
+    ) -> Iterator[str]:
+        """Yield itinerary text as the LLM produces it.
+
+        Streams straight from the LLM rather than the ReAct agent, whose
+        intermediate tool-use steps cannot be shown to the user. In pipeline
+        mode the prompt also carries the city context, gathered here unless
+        the caller already has it.
+        """
+        if context is None and (mode or GENERATION_MODE) == "pipeline":
+            context = self.gather_city_context(place, start_date, end_date)
+        prompt = self._build_prompt(place, start_date, end_date, context=context, **preferences)
+        for chunk in self.llm.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+
+_agents = {}
+_agent_errors = {}
+_agent_lock = threading.Lock()
+
+
+def get_agent(tier: Optional[str] = None) -> AIAgent:
+    """Return the shared agent for a model tier, creating it on first use.
+
+    Raises AgentUnavailable when it cannot be created, e.g. without an API
+    key; the rest of the API keeps working in that case.
+    """
+    tier = tier or DEFAULT_TIER
+    agent = _agents.get(tier)
+    if agent is None:
+        with _agent_lock:
+            agent = _agents.get(tier)
+            if agent is None:
+                try:
+                    agent = _agents[tier] = AIAgent(tier)
+                except (ValueError, ImportError) as e:
+                    _agent_errors[tier] = str(e)
+                    raise AgentUnavailable(str(e)) from e
+                _agent_errors.pop(tier, None)
+    return agent
+
+
+def warm_up_agent():
+    try:
+        get_agent()
+    except AgentUnavailable as e:
+        logger.warning(f"Itinerary generation unavailable, running in degraded mode: {e}")
+
+
+def agent_status() -> str:
+    if DEFAULT_TIER in _agents:
+        return "available"
+    return "unavailable" if DEFAULT_TIER in _agent_errors else "starting"
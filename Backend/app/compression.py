@@ -0,0 +1,41 @@
+import zlib
+
+# Preset dictionary of phrases that recur in generated itineraries. zlib can
+# reference it from the first byte, which matters for short texts. The most
+# frequent phrases go last, where back-references to them are cheapest.
+# Never edit a published dictionary: add a new version so old rows still decode.
+ITINERARY_DICTIONARY_V1 = (
+    "Currency: Language: Safety: Emergency numbers Visa requirements "
+    "Optional Activities: Practical Tips: Packing list: comfortable walking shoes, sunscreen, "
+    "a light jacket, an umbrella, a reusable water bottle "
+    "Accommodation Suggestions: budget-friendly hostels, mid-range hotels, luxury resorts, homestays, guesthouses "
+    "Transportation: public transport, taxi, auto-rickshaw, metro, bus, walking, self-drive, cab "
+    "Weather Considerations: temperature, humidity, rainfall, monsoon, winter, summer "
+    "Food Recommendations: local cuisine, street food, traditional dishes, famous restaurants, cafe "
+    "Breakfast: Lunch: Dinner: "
+    "Check in to your hotel and relax. Explore the local market. Visit the museum. "
+    "Enjoy a sunset view. Return to your hotel. "
+    "Morning: Afternoon: Evening: Night: "
+    "**Day 10: **Day 9: **Day 8: **Day 7: **Day 6: **Day 5: **Day 4: **Day 3: **Day 2: **Day 1: "
+    "\n* **Morning:** \n* **Afternoon:** \n* **Evening:** \n\n**"
+).encode("utf-8")
+
+# First byte of every stored value identifies the dictionary used
+DICTIONARIES = {
+    0: b"",
+    1: ITINERARY_DICTIONARY_V1,
+}
+CURRENT_DICTIONARY = 1
+COMPRESSION_LEVEL = 9
+
+
+def compress_content(content: str, version: int = CURRENT_DICTIONARY) -> bytes:
+    zdict = DICTIONARIES[version]
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=zdict) if zdict else zlib.compressobj(COMPRESSION_LEVEL)
+    return bytes([version]) + compressor.compress(content.encode("utf-8")) + compressor.flush()
+
+
+def decompress_content(data: bytes) -> str:
+    zdict = DICTIONARIES[data[0]]
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(data[1:]) + decompressor.flush()).decode("utf-8")
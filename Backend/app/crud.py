@@ -1,22 +1,348 @@
-from sqlalchemy.orm import Session
+import hashlib
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import String, and_, cast, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
 from . import models, schemas
+from .search import SEARCH_TEXT_CONFIG, FTS_TABLE, fts_table, fts_query
 from fastapi import HTTPException
-from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+GENERATION_OPTIONS = {"bypass_cache", "cache_fuzzy_dates", "generation_mode", "model_tier", "structured"}
 
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+def hash_content(content: str):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest() if content else None
 
-def create_user(db: Session, user: schemas.UserCreate):
-    if get_user_by_username(db, user.username):
+# List views only need metadata; content is fetched per itinerary
+SUMMARY_COLUMNS = (
+    models.Itinerary.id,
+    models.Itinerary.owner_id,
+    models.Itinerary.destination,
+    models.Itinerary.start_date,
+    models.Itinerary.end_date,
+    models.Itinerary.pdf_path,
+    models.Itinerary.trip_theme,
+    models.Itinerary.budget,
+    models.Itinerary.pace,
+    models.Itinerary.travel_mode,
+    models.Itinerary.group_type,
+)
+
+def _itinerary_summaries_query(user_id: int, after_id: int = None, limit: int = 100):
+    # Keyset pagination on the (owner_id, id) index instead of OFFSET scans
+    query = select(models.Itinerary).options(load_only(*SUMMARY_COLUMNS)).filter(models.Itinerary.owner_id == user_id)
+    if after_id is not None:
+        query = query.filter(models.Itinerary.id > after_id)
+    return query.order_by(models.Itinerary.id).limit(limit)
+
+def _itinerary_search_query(
+    dialect: str,
+    user_id: int,
+    q: Optional[str] = None,
+    trip_theme: Optional[List[str]] = None,
+    budget: Optional[str] = None,
+    pace: Optional[str] = None,
+    travel_mode: Optional[str] = None,
+    group_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    offset: int = 0,
+    limit: int = 100,
+):
+    # Ranked by relevance when there is a text query, newest first otherwise.
+    # trip_theme matches any of the given themes; the dates match overlapping trips.
+    query = select(models.Itinerary).options(load_only(*SUMMARY_COLUMNS)).filter(models.Itinerary.owner_id == user_id)
+    if q and q.strip():
+        if dialect == "postgresql":
+            tsquery = func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, q)
+            query = query.filter(models.Itinerary.search_vector.op("@@")(tsquery)).order_by(
+                func.ts_rank(models.Itinerary.search_vector, tsquery).desc())
+        else:
+            query = query.join(fts_table, fts_table.c.rowid == models.Itinerary.id).filter(
+                fts_table.c[FTS_TABLE].op("MATCH")(fts_query(q, user_id))).order_by(fts_table.c.rank)
+    if trip_theme:
+        if dialect == "postgresql":
+            # Typed to match the column; an untyped array of parameters has no && with varchar[]
+            query = query.filter(models.Itinerary.trip_theme.overlap(cast(array(trip_theme), ARRAY(String))))
+        else:
+            themes = func.json_each(models.Itinerary.trip_theme).table_valued("value")
+            query = query.filter(exists(select(1).select_from(themes).where(themes.c.value.in_(trip_theme))))
+    for field, value in (("budget", budget), ("pace", pace), ("travel_mode", travel_mode), ("group_type", group_type)):
+        if value is not None:
+            query = query.filter(getattr(models.Itinerary, field) == value)
+    if date_from is not None:
+        query = query.filter(models.Itinerary.end_date >= date_from)
+    if date_to is not None:
+        query = query.filter(models.Itinerary.start_date <= date_to)
+    return query.order_by(models.Itinerary.id.desc()).offset(offset).limit(limit)
+
+def get_itinerary(db: Session, itinerary_id: int):
+    return db.query(models.Itinerary).filter(models.Itinerary.id == itinerary_id).first()
+
+def _db_days(days: Optional[List[schemas.ItineraryDayBase]]):
+    return [models.ItineraryDay(**day.dict(exclude={"activities"}), activities=[a.dict() for a in day.activities]) for day in days or []]
+
+def create_user_itinerary(
+    db: Session,
+    itinerary: schemas.ItineraryCreate,
+    user_id: int,
+    pdf_path: str = None,
+    content: str = None,
+    days: List[schemas.ItineraryDayBase] = None
+):
+    db_itinerary = models.Itinerary(
+        **itinerary.dict(exclude=GENERATION_OPTIONS),
+        owner_id=user_id, 
+        pdf_path=pdf_path,
+        content=content,
+        content_hash=hash_content(content),
+        days=_db_days(days)
+    )
+    db.add(db_itinerary)
+    db.commit()
+    db.refresh(db_itinerary)
+    return db_itinerary 
+
+def content_hash_in_use(db: Session, content_hash: str) -> bool:
+    return db.query(exists().where(models.Itinerary.content_hash == content_hash)).scalar()
+
+def _update_day(db_day: models.ItineraryDay, day: schemas.ItineraryDayBase):
+    db_day.title = day.title
+    db_day.activities = [a.dict() for a in day.activities]
+    db_day.notes = day.notes
+
+def replace_itinerary_day(db: Session, db_itinerary: models.Itinerary, day: schemas.ItineraryDayBase, content: str):
+    """Swap in a regenerated day and the itinerary text rendered with it."""
+    db_day = next(d for d in db_itinerary.days if d.day_number == day.day_number)
+    _update_day(db_day, day)
+    db_itinerary.content = content
+    db_itinerary.content_hash = hash_content(content)
+    db.commit()
+    db.refresh(db_day)
+    return db_day
+
+def refine_itinerary(
+    db: Session,
+    db_itinerary: models.Itinerary,
+    changes: dict,
+    content: str,
+    days: List[schemas.ItineraryDayBase] = None
+):
+    """Apply refined preferences and content in place.
+
+    The PDF is keyed on content_hash, so it is re-rendered on the next
+    download. Day records are updated by day number, which keeps their ids;
+    days the itinerary had no record for yet are added.
+    """
+    for key, value in changes.items():
+        setattr(db_itinerary, key, value)
+    db_itinerary.content = content
+    db_itinerary.content_hash = hash_content(content)
+    if days is not None:
+        db_days = {d.day_number: d for d in db_itinerary.days}
+        for day in days:
+            if day.day_number in db_days:
+                _update_day(db_days[day.day_number], day)
+            else:
+                db_itinerary.days.extend(_db_days([day]))
+    db.commit()
+    db.refresh(db_itinerary)
+    return db_itinerary
+
+def create_generation_job(db: Session, job_id: str, itinerary: schemas.ItineraryCreate, user_id: int):
+    db_job = models.GenerationJob(
+        id=job_id,
+        owner_id=user_id,
+        status="queued",
+        stage="queued",
+        request=itinerary.json()
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def create_generation_job_batch(
+    db: Session,
+    user_id: int,
+    queued: List[Tuple[str, schemas.ItineraryCreate]],
+    completed: List[Tuple[str, schemas.ItineraryCreate, str, Optional[List[schemas.ItineraryDayBase]]]],
+):
+    """Insert a batch of jobs in one transaction.
+
+    ``completed`` entries were served from the result cache; their
+    itineraries (and day records, for structured requests) are saved
+    alongside and the jobs recorded as succeeded.
+    """
+    db_itineraries = [
+        models.Itinerary(
+            **itinerary.dict(exclude=GENERATION_OPTIONS),
+            owner_id=user_id,
+            content=content,
+            content_hash=hash_content(content),
+            days=_db_days(days)
+        )
+        for _, itinerary, content, days in completed
+    ]
+    db.add_all(db_itineraries)
+    db.flush()
+    db_jobs = [
+        models.GenerationJob(id=job_id, owner_id=user_id, status="queued", stage="queued", request=itinerary.json())
+        for job_id, itinerary in queued
+    ]
+    db_jobs.extend(
+        models.GenerationJob(
+            id=job_id, owner_id=user_id, status="succeeded", stage="done",
+            request=itinerary.json(), itinerary_id=db_itinerary.id
+        )
+        for (job_id, itinerary, _, _), db_itinerary in zip(completed, db_itineraries)
+    )
+    db.add_all(db_jobs)
+    db.commit()
+    return get_generation_jobs(db, [db_job.id for db_job in db_jobs])
+
+def create_trip_job(db: Session, job_id: str, trip: schemas.TripCreate, user_id: int):
+    """Create an empty trip and the job that will generate its legs."""
+    db_trip = models.Trip(owner_id=user_id, start_date=trip.legs[0].start_date, end_date=trip.legs[-1].end_date)
+    db.add(db_trip)
+    db.flush()
+    db_job = models.GenerationJob(
+        id=job_id,
+        owner_id=user_id,
+        kind="trip",
+        status="queued",
+        stage="queued",
+        request=trip.json(),
+        trip_id=db_trip.id
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def create_itinerary_update_job(db: Session, job_id: str, kind: str, db_itinerary: models.Itinerary, request: str):
+    """Create a job that changes an existing itinerary in place."""
+    db_job = models.GenerationJob(
+        id=job_id,
+        owner_id=db_itinerary.owner_id,
+        kind=kind,
+        status="queued",
+        stage="queued",
+        request=request,
+        itinerary_id=db_itinerary.id
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def save_trip_legs(
+    db: Session,
+    db_trip: models.Trip,
+    legs: List[Tuple[schemas.ItineraryCreate, str]],
+    transport_summary: Optional[str],
+):
+    """Store every generated leg and the transport summary in one transaction."""
+    db.add_all(
+        models.Itinerary(
+            **itinerary.dict(exclude=GENERATION_OPTIONS),
+            owner_id=db_trip.owner_id,
+            trip_id=db_trip.id,
+            leg_number=number,
+            content=content,
+            content_hash=hash_content(content)
+        )
+        for number, (itinerary, content) in enumerate(legs, start=1)
+    )
+    db_trip.transport_summary = transport_summary
+    db.commit()
+    db.refresh(db_trip)
+    return db_trip
+
+def delete_failed_trip(db: Session, db_job: models.GenerationJob):
+    """Detach a failed trip job from its trip and delete the trip.
+
+    The trip row is created empty with the job and its legs are only saved
+    once all of them are generated, so there is nothing worth keeping.
+    """
+    trip_id = db_job.trip_id
+    db_job.trip_id = None
+    db.flush()
+    db.query(models.Itinerary).filter(models.Itinerary.trip_id == trip_id).delete(synchronize_session=False)
+    db.query(models.Trip).filter(models.Trip.id == trip_id).delete(synchronize_session=False)
+    db.commit()
+
+def get_trip(db: Session, trip_id: int):
+    return db.query(models.Trip).filter(models.Trip.id == trip_id).first()
+
+def get_generation_jobs(db: Session, job_ids: List[str]):
+    result = db.execute(
+        select(models.GenerationJob)
+        .options(selectinload(models.GenerationJob.itinerary))
+        .filter(models.GenerationJob.id.in_(job_ids))
+    )
+    return result.scalars().all()
+
+def get_generation_job(db: Session, job_id: str):
+    return db.query(models.GenerationJob).filter(models.GenerationJob.id == job_id).first()
+
+def _claimable(stale_before: datetime):
+    # Running jobs are only taken over once their worker stops updating them
+    return or_(
+        models.GenerationJob.status == "queued",
+        and_(models.GenerationJob.status == "running", models.GenerationJob.updated_at < stale_before),
+    )
+
+def get_pending_generation_jobs(db: Session, stale_before: datetime):
+    return db.query(models.GenerationJob).filter(_claimable(stale_before)).all()
+
+def claim_generation_job(db: Session, job_id: str, stale_before: datetime) -> bool:
+    """Mark a job as running for this worker; False if another worker holds it.
+
+    A single conditional UPDATE, so two workers can never both claim a job.
+    """
+    result = db.execute(
+        update(models.GenerationJob)
+        .where(models.GenerationJob.id == job_id, _claimable(stale_before))
+        .values(status="running", updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def update_generation_job(db: Session, db_job: models.GenerationJob, **fields):
+    for key, value in fields.items():
+        setattr(db_job, key, value)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+# Async variants, for endpoints that use get_async_db
+
+async def get_user_by_username_async(db: AsyncSession, username: str):
+    result = await db.execute(select(models.User).filter(models.User.username == username))
+    return result.scalars().first()
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).filter(models.User.email == email))
+    return result.scalars().first()
+
+async def ensure_user_available_async(db: AsyncSession, user: schemas.UserCreate):
+    if await get_user_by_username_async(db, user.username):
         raise HTTPException(status_code=400, detail="Username already registered")
-    if get_user_by_email(db, user.email):
+    if await get_user_by_email_async(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = pwd_context.hash(user.password)
+
+async def create_user_async(db: AsyncSession, user: schemas.UserCreate, hashed_password: str):
+    # Callers check availability before hashing; the unique constraints
+    # settle a registration that raced in since
     db_user = models.User(
         username=user.username,
         email=user.email,
@@ -25,21 +351,46 @@ def create_user(db: Session, user: schemas.UserCreate):
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        await ensure_user_available_async(db, user)
+        raise
     return db_user
 
-def get_itineraries_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Itinerary).filter(models.Itinerary.owner_id == user_id).offset(skip).limit(limit).all()
+async def get_itineraries_by_user_async(db: AsyncSession, user_id: int, after_id: int = None, limit: int = 100):
+    result = await db.execute(_itinerary_summaries_query(user_id, after_id, limit))
+    return result.scalars().all()
 
-def create_user_itinerary(db: Session, itinerary: schemas.ItineraryCreate, user_id: int, pdf_path: str = None, content: str = None):
-    db_itinerary = models.Itinerary(
-        **itinerary.dict(), 
-        owner_id=user_id, 
-        pdf_path=pdf_path,
-        content=content
+async def search_itineraries_async(db: AsyncSession, user_id: int, **filters):
+    query = _itinerary_search_query(db.bind.dialect.name, user_id, **filters)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def get_itinerary_async(db: AsyncSession, itinerary_id: int):
+    return await db.get(models.Itinerary, itinerary_id)
+
+async def get_itinerary_days_async(db: AsyncSession, itinerary_id: int):
+    result = await db.execute(
+        select(models.ItineraryDay)
+        .filter(models.ItineraryDay.itinerary_id == itinerary_id)
+        .order_by(models.ItineraryDay.day_number)
     )
-    db.add(db_itinerary)
-    db.commit()
-    db.refresh(db_itinerary)
-    return db_itinerary 
\ No newline at end of file
+    return result.scalars().all()
+
+async def get_trip_async(db: AsyncSession, trip_id: int):
+    result = await db.execute(
+        select(models.Trip)
+        .options(selectinload(models.Trip.legs))
+        .filter(models.Trip.id == trip_id)
+    )
+    return result.scalars().first()
+
+async def get_generation_job_async(db: AsyncSession, job_id: str):
+    result = await db.execute(
+        select(models.GenerationJob)
+        .options(selectinload(models.GenerationJob.itinerary))
+        .filter(models.GenerationJob.id == job_id)
+    )
+    return result.scalars().first()
@@ -1,27 +1,33 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 import os
 
 from . import schemas, crud, models
-from .database import get_db
+from .database import get_db, get_async_db
+from .user_cache import user_cache
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+TOKEN_EMBED_USER_ID = os.getenv("TOKEN_EMBED_USER_ID", "true").lower() == "true"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def create_access_token(data: dict):
+def create_access_token(data: dict, user_id: int = None):
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now})
+    if user_id is not None and TOKEN_EMBED_USER_ID:
+        to_encode["uid"] = user_id
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def _decode_token(token: str):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -35,7 +41,38 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_username(db, username=token_data.username)
+    return token_data.username, payload.get("iat"), payload.get("uid")
+
+def _check_user(user, username: str):
+    if user is None or user.username != username:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    username, issued_at, user_id = _decode_token(token)
+    user = user_cache.get(db, username, issued_at)
     if user is None:
-        raise credentials_exception
-    return user 
\ No newline at end of file
+        # A primary key lookup is served from the session's identity map when possible
+        if user_id is not None:
+            user = db.get(models.User, user_id)
+        else:
+            user = crud.get_user_by_username(db, username=username)
+        _check_user(user, username)
+        user_cache.set(username, issued_at, user)
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    username, issued_at, user_id = _decode_token(token)
+    user = await user_cache.get_async(db, username, issued_at)
+    if user is None:
+        if user_id is not None:
+            user = await db.get(models.User, user_id)
+        else:
+            user = await crud.get_user_by_username_async(db, username=username)
+        _check_user(user, username)
+        user_cache.set(username, issued_at, user)
+    return user
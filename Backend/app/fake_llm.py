@@ -0,0 +1,122 @@
+import re
+import json
+import time
+import random
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+FAKE_ITINERARY = """Day 1: Arrive, check in and take an evening walk through the old town.
+Day 2: Morning museum visit, lunch at a local market, sunset viewpoint.
+Day 3: Day trip to the surrounding hills, dinner with regional specialities.
+Weather: Pack layers and a light rain jacket.
+Transportation: Use public transport for the city centre and a cab for day trips.
+Accommodation: A mid-range guesthouse close to the centre.
+Practical tips: Carry some cash and keep emergency numbers handy."""
+
+
+STRUCTURED_DAYS_RE = re.compile(r"Return exactly (\d+) days")
+DAY_PROMPT_RE = re.compile(r"^Plan day (\d+) ")
+REFINE_PROMPT_RE = re.compile(r"Revise it with these changes:(.*?)\n\n", re.S)
+TOKEN_RE = re.compile(r"\S+\s*")
+
+
+def _fake_day(day_number: int, variant: int = 0) -> dict:
+    return {
+        "day_number": day_number,
+        "title": f"Day {day_number} highlights" + (f" (option {variant + 1})" if variant else ""),
+        "activities": [
+            {"time": "09:00", "title": "Morning walk", "description": "Explore the old town.", "location": "Old town", "cost": 0, "currency": "EUR"},
+            {"time": "13:00", "title": "Local lunch", "description": "Try the regional specialities.", "location": "Central market", "cost": 15, "currency": "EUR"},
+        ],
+        "notes": "Pack layers and carry some cash.",
+    }
+
+
+class FakeLLMError(RuntimeError):
+    pass
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """Offline stand-in for the Gemini chat model.
+
+    Emits a canned itinerary word by word after a fixed per-call latency and
+    with a fixed delay per token, so the generation path can be load-tested
+    and profiled without network access. ``failure_rate`` makes that share
+    of calls raise, drawn from a seeded generator so runs are repeatable.
+    ``token_usage()`` counts the tokens sent and generated, for comparing
+    the cost of generation paths.
+    """
+
+    response: str = FAKE_ITINERARY
+    latency: float = 0.0
+    token_delay: float = 0.0
+    failure_rate: float = 0.0
+    seed: Optional[int] = None
+    _random: Any = PrivateAttr(default=None)
+    _calls: int = PrivateAttr(default=0)
+    _prompt_tokens: int = PrivateAttr(default=0)
+    _completion_tokens: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._random = random.Random(self.seed)
+
+    def token_usage(self) -> dict:
+        """Whitespace-delimited tokens sent and generated so far."""
+        return {"prompt": self._prompt_tokens, "completion": self._completion_tokens, "calls": self._calls}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = str(messages[-1].content) if messages else ""
+        day = DAY_PROMPT_RE.match(prompt)
+        if day:
+            return json.dumps(_fake_day(int(day.group(1)), self._calls))
+        days = STRUCTURED_DAYS_RE.search(prompt)
+        if days:
+            return json.dumps({"days": [_fake_day(n) for n in range(1, int(days.group(1)) + 1)]})
+        refine = REFINE_PROMPT_RE.search(prompt)
+        if refine:
+            changes = " ".join(refine.group(1).split())
+            return f"{self.response}\nRevised for: {changes}"
+        # The ReAct agent only stops once it sees a final answer
+        if any("Final Answer" in str(m.content) for m in messages):
+            return f"Thought: I now know the final answer\nFinal Answer: {self.response}"
+        return self.response
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = "".join(chunk.message.content for chunk in self._stream(messages, stop, run_manager, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        self._calls += 1
+        self._prompt_tokens += sum(len(TOKEN_RE.findall(str(m.content))) for m in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise FakeLLMError("Injected LLM failure")
+        for token in TOKEN_RE.findall(self._reply(messages)):
+            self._completion_tokens += 1
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            if run_manager:
+                run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
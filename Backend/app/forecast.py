@@ -0,0 +1,229 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import requests
+
+from .http_client import async_http_client, http_client
+
+logger = logging.getLogger(__name__)
+
+OPEN_METEO_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+OPEN_METEO_ARCHIVE_URL = os.getenv("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+
+# Open-Meteo forecasts 16 days ahead and its archive lags by about 5 days
+FORECAST_HORIZON_DAYS = int(os.getenv("FORECAST_HORIZON_DAYS", 16))
+ARCHIVE_DELAY_DAYS = int(os.getenv("ARCHIVE_DELAY_DAYS", 7))
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", 4096))
+FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", 3 * 3600))
+CLIMATE_CACHE_TTL = int(os.getenv("CLIMATE_CACHE_TTL", 30 * 24 * 3600))
+# Coordinates are rounded to this many decimals (0.1 degrees is about 11 km)
+# so nearby destinations share cached days
+WEATHER_CELL_PRECISION = int(os.getenv("WEATHER_CELL_PRECISION", 1))
+
+DAILY_VARIABLES = "weathercode,temperature_2m_max,temperature_2m_min,precipitation_sum"
+
+WEATHER_CODES = (
+    (0, "Clear"),
+    (3, "Partly cloudy"),
+    (48, "Fog"),
+    (57, "Drizzle"),
+    (67, "Rain"),
+    (77, "Snow"),
+    (82, "Showers"),
+    (86, "Snow showers"),
+    (99, "Thunderstorm"),
+)
+
+Cell = Tuple[float, float, date]
+
+
+def describe_weather_code(code: Optional[int]) -> str:
+    if code is None:
+        return "Unknown"
+    for upper, label in WEATHER_CODES:
+        if code <= upper:
+            return label
+    return "Unknown"
+
+
+def _years_back(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        # 29 February
+        return day.replace(year=day.year - 1, day=28)
+
+
+def _reference_date(day: date, today: date) -> date:
+    """Date whose recorded weather stands in for ``day`` beyond the forecast horizon."""
+    reference = day
+    while reference > today - timedelta(days=ARCHIVE_DELAY_DAYS):
+        reference = _years_back(reference)
+    return reference
+
+
+class ForecastCache:
+    """Daily weather per (rounded lat, rounded lon, date) cell.
+
+    Days within the forecast horizon come from the forecast API. Other days
+    use the same date in the most recent year the archive covers, as a guide
+    to typical conditions. Missing days are fetched in one call per source.
+    """
+
+    def __init__(self, maxsize: int = FORECAST_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+
+    @staticmethod
+    def _cell(lat, lon) -> Tuple[float, float]:
+        return round(float(lat), WEATHER_CELL_PRECISION), round(float(lon), WEATHER_CELL_PRECISION)
+
+    def _get(self, key: Cell) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[0]
+        return None
+
+    def _set(self, key: Cell, day: dict, ttl: int):
+        self._entries[key] = (day, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_daily(self, lat, lon, start_date: date, end_date: date, today: Optional[date] = None) -> List[dict]:
+        """Return one dict per day from start_date to end_date, inclusive."""
+        lat, lon, days, found, sources = self._lookup(lat, lon, start_date, end_date, today)
+        fetched = {}
+        for url, references, basis in sources:
+            fetched.update(self._fetch(url, lat, lon, references, basis))
+        return self._merge(lat, lon, days, found, fetched)
+
+    async def aget_daily(self, lat, lon, start_date: date, end_date: date, today: Optional[date] = None) -> List[dict]:
+        """Like get_daily, but fetches the forecast and archive concurrently on the event loop."""
+        lat, lon, days, found, sources = self._lookup(lat, lon, start_date, end_date, today)
+        fetched = {}
+        for result in await asyncio.gather(*(self._afetch(url, lat, lon, references, basis) for url, references, basis in sources)):
+            fetched.update(result)
+        return self._merge(lat, lon, days, found, fetched)
+
+    def _lookup(self, lat, lon, start_date: date, end_date: date, today: Optional[date]):
+        """Split the requested days into cached ones and (url, references, basis) fetches for the rest."""
+        today = today or date.today()
+        lat, lon = self._cell(lat, lon)
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+        with self._lock:
+            found = {day: self._get((lat, lon, day)) for day in days}
+            missing = [day for day in days if found[day] is None]
+            self.hits += len(days) - len(missing)
+            self.misses += len(missing)
+
+        horizon = today + timedelta(days=FORECAST_HORIZON_DAYS)
+        # The forecast covers FORECAST_HORIZON_DAYS days starting today
+        forecast_days = [day for day in missing if today <= day < horizon]
+        climate_days = [day for day in missing if not today <= day < horizon]
+        sources = []
+        if forecast_days:
+            sources.append((OPEN_METEO_URL, {day: day for day in forecast_days}, "forecast"))
+        if climate_days:
+            sources.append((OPEN_METEO_ARCHIVE_URL, {day: _reference_date(day, today) for day in climate_days}, None))
+        return lat, lon, days, found, sources
+
+    def _merge(self, lat: float, lon: float, days: List[date], found: Dict[date, Optional[dict]], fetched: Dict[date, dict]) -> List[dict]:
+        with self._lock:
+            for day, value in fetched.items():
+                ttl = FORECAST_CACHE_TTL if value["basis"] == "forecast" else CLIMATE_CACHE_TTL
+                self._set((lat, lon, day), value, ttl)
+        found.update(fetched)
+        return [found[day] for day in days if found[day] is not None]
+
+    def _params(self, lat: float, lon: float, references: Dict[date, date]) -> dict:
+        with self._lock:
+            self.fetches += 1
+        return {
+            "latitude": lat,
+            "longitude": lon,
+            "daily": DAILY_VARIABLES,
+            "timezone": "auto",
+            "start_date": min(references.values()).isoformat(),
+            "end_date": max(references.values()).isoformat(),
+        }
+
+    def _fetch(self, url: str, lat: float, lon: float, references: Dict[date, date], basis: Optional[str]) -> Dict[date, dict]:
+        try:
+            resp = http_client.get(url, params=self._params(lat, lon, references))
+            resp.raise_for_status()
+            daily = resp.json().get("daily") or {}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Error fetching daily weather: {e}")
+            return {}
+        return self._parse(daily, references, basis)
+
+    async def _afetch(self, url: str, lat: float, lon: float, references: Dict[date, date], basis: Optional[str]) -> Dict[date, dict]:
+        try:
+            resp = await async_http_client.get(url, params=self._params(lat, lon, references))
+            resp.raise_for_status()
+            daily = resp.json().get("daily") or {}
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Error fetching daily weather: {e}")
+            return {}
+        return self._parse(daily, references, basis)
+
+    @staticmethod
+    def _parse(daily: dict, references: Dict[date, date], basis: Optional[str]) -> Dict[date, dict]:
+        columns = {name: daily.get(name) or [] for name in DAILY_VARIABLES.split(",")}
+        rows = {
+            value: {name: values[i] if i < len(values) else None for name, values in columns.items()}
+            for i, value in enumerate(daily.get("time", []))
+        }
+        result = {}
+        for day, reference in references.items():
+            row = rows.get(reference.isoformat())
+            if row is not None:
+                result[day] = {
+                    "date": day.isoformat(),
+                    "basis": basis or ("recorded" if reference == day else "typical"),
+                    **row,
+                }
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses, "fetches": self.fetches}
+
+
+def _number(value, spec: str) -> str:
+    return format(value, spec) if value is not None else "?"
+
+
+def format_weather_table(days: List[dict]) -> str:
+    """Compact per-day table for the prompt."""
+    lines = ["Date | Weather | Min-Max °C | Rain mm | Basis"]
+    for day in days:
+        lines.append(" | ".join((
+            day["date"],
+            describe_weather_code(day.get("weathercode")),
+            f"{_number(day.get('temperature_2m_min'), '.0f')}-{_number(day.get('temperature_2m_max'), '.0f')}",
+            _number(day.get("precipitation_sum"), ".1f"),
+            day["basis"],
+        )))
+    return "\n".join(lines)
+
+
+forecast_cache = ForecastCache()
@@ -0,0 +1,143 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Tuple
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", 1024))
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", 7 * 24 * 3600))
+GEOCODE_CACHE_PERSIST = os.getenv("GEOCODE_CACHE_PERSIST", "false").lower() == "true"
+
+Coords = Tuple[Optional[str], Optional[str]]
+
+
+class GeocodeCache:
+    """LRU + TTL cache in front of the geocoder, with an optional database tier.
+
+    Concurrent misses for the same city are coalesced so only one upstream
+    request is made; the other callers wait for its result.
+    """
+
+    def __init__(self, maxsize: int = GEOCODE_CACHE_SIZE, ttl: int = GEOCODE_CACHE_TTL, persist: bool = GEOCODE_CACHE_PERSIST):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persist = persist
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _key(city: str) -> str:
+        return " ".join(city.lower().split())
+
+    def get_or_fetch(self, city: str, fetch: Callable[[str], Coords]) -> Coords:
+        key = self._key(city)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                inflight = self._inflight[key] = {"event": threading.Event(), "result": (None, None)}
+                owner = True
+                self.misses += 1
+            else:
+                owner = False
+                self.coalesced += 1
+
+        if not owner:
+            inflight["event"].wait()
+            return inflight["result"]
+
+        try:
+            result = self._load_persistent(key)
+            if result is None:
+                result = fetch(city)
+                if result[0] and result[1]:
+                    self._store_persistent(key, result)
+            else:
+                self.persistent_hits += 1
+            if result[0] and result[1]:
+                self._set(key, result)
+            inflight["result"] = result
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight["event"].set()
+
+    def _set(self, key: str, coords: Coords):
+        with self._lock:
+            self._entries[key] = (coords, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _load_persistent(self, key: str) -> Optional[Coords]:
+        if not self.persist:
+            return None
+        db = SessionLocal()
+        try:
+            row = db.get(models.GeocodeCacheEntry, key)
+            if row is None:
+                return None
+            fetched_at = row.fetched_at
+            if fetched_at.tzinfo is None:
+                fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+            if fetched_at + timedelta(seconds=self.ttl) < datetime.now(timezone.utc):
+                return None
+            return row.lat, row.lon
+        except Exception as e:
+            logger.error(f"Error reading geocode cache: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _store_persistent(self, key: str, coords: Coords):
+        if not self.persist:
+            return
+        db = SessionLocal()
+        try:
+            db.merge(models.GeocodeCacheEntry(
+                city=key,
+                lat=coords[0],
+                lon=coords[1],
+                fetched_at=datetime.now(timezone.utc)
+            ))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error writing geocode cache: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "persistent_hits": self.persistent_hits,
+                "coalesced": self.coalesced,
+            }
+
+
+geocode_cache = GeocodeCache()
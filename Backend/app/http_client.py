@@ -0,0 +1,110 @@
+import os
+import asyncio
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", 4))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.5))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_HEADERS = {"User-Agent": "TripPlanner/1.0 (dev@example.com)"}
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+class HTTPClient:
+    """Shared keep-alive session for the agent tools.
+
+    Connections are pooled per host, retried with exponential backoff and
+    limited to HTTP_MAX_PER_HOST concurrent requests per host.
+    """
+
+    def __init__(self):
+        retry = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=HTTP_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_MAX_PER_HOST, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(HTTP_MAX_PER_HOST)
+            return self._host_limits[host]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        with self._limit(_host(url)):
+            return self.session.get(url, **kwargs)
+
+
+class AsyncHTTPClient:
+    """Async counterpart of HTTPClient for code running on the event loop.
+
+    One httpx.AsyncClient is kept for the life of the process with the same
+    pool size, per-host limit and retry policy; call aclose() on shutdown.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._host_limits = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                timeout=HTTP_TIMEOUT,
+                limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+            )
+        return self._client
+
+    def _limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(HTTP_MAX_PER_HOST)
+        return self._host_limits[host]
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        async with self._limit(_host(url)):
+            for attempt in range(HTTP_RETRIES + 1):
+                try:
+                    resp = await self.client.get(url, **kwargs)
+                    if resp.status_code not in RETRY_STATUSES or attempt == HTTP_RETRIES:
+                        return resp
+                except httpx.TransportError:
+                    if attempt == HTTP_RETRIES:
+                        raise
+                await asyncio.sleep(HTTP_BACKOFF * (2 ** attempt))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_limits.clear()
+
+
+http_client = HTTPClient()
+async_http_client = AsyncHTTPClient()
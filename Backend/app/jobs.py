@@ -0,0 +1,378 @@
+import os
+import json
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from . import crud, models, schemas
+from .database import SessionLocal
+from .agent import AIAgent, get_agent
+from .pdf_generator import pdf_generator_instance
+from .result_cache import result_cache
+from .structured import parse_structured_itinerary, render_itinerary_text
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 100))
+# Legs of multi-city trips generated at once, across all trip jobs
+TRIP_LEG_CONCURRENCY = int(os.getenv("TRIP_LEG_CONCURRENCY", 4))
+# A running job whose row has not been updated for this long is assumed
+# abandoned by its worker and may be claimed again. Every stage change
+# updates the row, so this must exceed the longest single stage.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 900))
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """Runs itinerary generation jobs on a bounded in-process worker pool.
+
+    Job state lives in the ``generation_jobs`` table, so any API worker can
+    report progress for a job regardless of which process is running it.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, queue_size: int = JOB_QUEUE_SIZE, leg_workers: int = TRIP_LEG_CONCURRENCY):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="itinerary-job")
+        # Legs of trip jobs run here rather than on the job executor, so a
+        # trip job never waits on work queued behind itself
+        self.leg_executor = ThreadPoolExecutor(max_workers=leg_workers, thread_name_prefix="trip-leg")
+        # Caps queued + running jobs so a burst cannot grow the backlog unbounded
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def enqueue(self, db: Session, itinerary: schemas.ItineraryCreate, user_id: int):
+        if not self.slots.acquire(blocking=False):
+            raise JobQueueFull()
+        try:
+            db_job = crud.create_generation_job(db, uuid.uuid4().hex, itinerary, user_id)
+        except Exception:
+            self.slots.release()
+            raise
+        self._submit(db_job.id)
+        return db_job
+
+    def enqueue_trip(self, db: Session, trip: schemas.TripCreate, user_id: int):
+        if not self.slots.acquire(blocking=False):
+            raise JobQueueFull()
+        try:
+            db_job = crud.create_trip_job(db, uuid.uuid4().hex, trip, user_id)
+        except Exception:
+            self.slots.release()
+            raise
+        self._submit(db_job.id)
+        return db_job
+
+    def enqueue_update(self, db: Session, kind: str, db_itinerary: models.Itinerary, request: str):
+        """Queue a job that changes an existing itinerary: "day" regenerates one day, "refine" revises it."""
+        if not self.slots.acquire(blocking=False):
+            raise JobQueueFull()
+        try:
+            db_job = crud.create_itinerary_update_job(db, uuid.uuid4().hex, kind, db_itinerary, request)
+        except Exception:
+            self.slots.release()
+            raise
+        self._submit(db_job.id)
+        return db_job
+
+    def enqueue_batch(self, db: Session, itineraries: List[schemas.ItineraryCreate], user_id: int):
+        """Create jobs for a batch of itineraries, returning one job per item.
+
+        Identical requests share a job. Items in the result cache complete
+        immediately; the rest run on the worker pool. Either every item that
+        needs generating gets a queue slot or JobQueueFull is raised.
+        """
+        unique = {}
+        for itinerary in itineraries:
+            unique.setdefault(itinerary.json(), itinerary)
+
+        queued, completed = [], []
+        job_ids = {}
+        for request, itinerary in unique.items():
+            job_ids[request] = uuid.uuid4().hex
+            cached_content = result_cache.get(itinerary)
+            if cached_content is not None:
+                completed.append((job_ids[request], itinerary, *cached_result(itinerary, cached_content)))
+            else:
+                queued.append((job_ids[request], itinerary))
+
+        for tier in {itinerary.model_tier for _, itinerary in queued}:
+            get_agent(tier)
+        acquired = 0
+        try:
+            for _ in queued:
+                if not self.slots.acquire(blocking=False):
+                    raise JobQueueFull()
+                acquired += 1
+            db_jobs = crud.create_generation_job_batch(db, user_id, queued, completed)
+        except Exception:
+            for _ in range(acquired):
+                self.slots.release()
+            raise
+        for job_id, _ in queued:
+            self._submit(job_id)
+
+        jobs_by_id = {db_job.id: db_job for db_job in db_jobs}
+        return [jobs_by_id[job_ids[itinerary.json()]] for itinerary in itineraries]
+
+    def resume_pending(self):
+        """Re-submit queued jobs and running jobs whose lease has expired.
+
+        Jobs that another worker is still running are left alone; the
+        claim in run_generation_job settles any race over the rest.
+        """
+        db = SessionLocal()
+        try:
+            job_ids = [job.id for job in crud.get_pending_generation_jobs(db, _stale_before())]
+        finally:
+            db.close()
+        for job_id in job_ids:
+            if self.slots.acquire(blocking=False):
+                self._submit(job_id)
+            else:
+                logger.warning(f"Job queue full, leaving job {job_id} pending")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.leg_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, job_id: str):
+        future = self.executor.submit(run_generation_job, job_id)
+        future.add_done_callback(lambda _: self.slots.release())
+
+
+def _stale_before() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=JOB_LEASE_SECONDS)
+
+
+def cached_result(itinerary: schemas.ItineraryCreate, cached_content: str):
+    """Return (content, days) for a result cache entry.
+
+    Structured requests cache the day records as JSON; they are re-dated to
+    the request, which may differ when fuzzy date matching is on.
+    """
+    if not itinerary.structured:
+        return cached_content, None
+    days = parse_structured_itinerary(cached_content, itinerary.start_date, itinerary.end_date)
+    return render_itinerary_text(days), days
+
+
+def save_itinerary(db: Session, itinerary: schemas.ItineraryCreate, user_id: int, content: str, days: List[schemas.ItineraryDayBase] = None):
+    # The PDF is rendered lazily on first download
+    return crud.create_user_itinerary(
+        db=db,
+        itinerary=itinerary,
+        user_id=user_id,
+        content=content,
+        days=days
+    )
+
+
+def discard_stale_pdf(db: Session, content_hash: str):
+    """Delete the PDF for replaced content unless another itinerary still has that content.
+
+    PDFs are stored by content hash, so refining or regenerating a day
+    would otherwise leave the old file behind for good.
+    """
+    if content_hash and not crud.content_hash_in_use(db, content_hash):
+        pdf_generator_instance.discard(content_hash)
+
+
+def complete_from_cache(db: Session, itinerary: schemas.ItineraryCreate, user_id: int, cached_content: str):
+    """Record an already finished job for an itinerary served from the result cache."""
+    db_itinerary = save_itinerary(db, itinerary, user_id, *cached_result(itinerary, cached_content))
+    db_job = crud.create_generation_job(db, uuid.uuid4().hex, itinerary, user_id)
+    return crud.update_generation_job(db, db_job, status="succeeded", stage="done", itinerary_id=db_itinerary.id)
+
+
+def generate(itinerary: schemas.ItineraryCreate):
+    """Generate (content, days) for a request and store it in the result cache."""
+    agent = get_agent(itinerary.model_tier)
+    preferences = dict(
+        trip_theme=itinerary.trip_theme,
+        budget=itinerary.budget,
+        pace=itinerary.pace,
+        travel_mode=itinerary.travel_mode,
+        group_type=itinerary.group_type
+    )
+    if itinerary.structured:
+        days = agent.generate_structured_itinerary(
+            itinerary.destination, itinerary.start_date, itinerary.end_date, **preferences
+        )
+        result_cache.set(itinerary, schemas.StructuredItinerary(days=days).json())
+        return render_itinerary_text(days), days
+    content = agent.generate_itinerary(
+        place=itinerary.destination,
+        start_date=itinerary.start_date,
+        end_date=itinerary.end_date,
+        mode=itinerary.generation_mode,
+        **preferences
+    )
+    result_cache.set(itinerary, content)
+    return content, None
+
+
+def _generate_leg(itinerary: schemas.ItineraryCreate) -> str:
+    cached_content = result_cache.get(itinerary)
+    return cached_content if cached_content is not None else generate(itinerary)[0]
+
+
+def _leg_distances(coords: list) -> list:
+    """Great-circle km between consecutive legs, None where a city was not found."""
+    # numpy is only needed here, so keep it off the startup path
+    import numpy as np
+    from .planner import haversine_matrix
+
+    distances = []
+    for (lat, lon), (next_lat, next_lon) in zip(coords, coords[1:]):
+        if not (lat and lon and next_lat and next_lon):
+            distances.append(None)
+            continue
+        matrix = haversine_matrix(np.array([float(lat), float(next_lat)]), np.array([float(lon), float(next_lon)]))
+        distances.append(float(matrix[0, 1]))
+    return distances
+
+
+def run_trip(db: Session, db_job):
+    """Generate every leg of a trip concurrently, then summarise the transfers.
+
+    Legs share a pool of TRIP_LEG_CONCURRENCY workers, so a trip takes
+    about as long as its slowest leg plus the summary call rather than the
+    sum of its legs.
+    """
+    trip = schemas.TripCreate.parse_raw(db_job.request)
+    legs = trip.leg_itineraries()
+
+    # Geocode every city up front; the legs then hit the geocode cache
+    crud.update_generation_job(db, db_job, stage="geocoding")
+    coords = list(job_queue.leg_executor.map(AIAgent._get_city_coords, [leg.destination for leg in legs]))
+
+    crud.update_generation_job(db, db_job, stage="generating")
+    contents = list(job_queue.leg_executor.map(_generate_leg, legs))
+
+    transport_summary = None
+    if len(legs) > 1:
+        crud.update_generation_job(db, db_job, stage="summarising")
+        transport_summary = get_agent(trip.model_tier).summarise_transport(
+            [(leg.destination, leg.start_date, leg.end_date) for leg in legs],
+            _leg_distances(coords),
+            budget=trip.budget,
+            travel_mode=trip.travel_mode,
+            group_type=trip.group_type
+        )
+
+    crud.update_generation_job(db, db_job, stage="saving")
+    crud.save_trip_legs(db, crud.get_trip(db, db_job.trip_id), list(zip(legs, contents)), transport_summary)
+    crud.update_generation_job(db, db_job, status="succeeded", stage="done")
+
+
+def _day_summary(day: models.ItineraryDay) -> str:
+    activities = ", ".join(activity["title"] for activity in day.activities)
+    return f"Day {day.day_number}: {day.title or ''} ({activities})"
+
+
+def run_regenerate_day(db: Session, db_job):
+    """Replan one day of a structured itinerary with a single small LLM call."""
+    day_number = json.loads(db_job.request)["day_number"]
+    itinerary = db_job.itinerary
+    days = itinerary.days
+    if not any(d.day_number == day_number for d in days):
+        raise ValueError(f"Itinerary has no day {day_number}")
+
+    crud.update_generation_job(db, db_job, stage="generating")
+    day = get_agent().regenerate_day(
+        itinerary.destination,
+        itinerary.start_date,
+        itinerary.end_date,
+        day_number,
+        [_day_summary(d) for d in days if d.day_number != day_number],
+        trip_theme=itinerary.trip_theme,
+        budget=itinerary.budget,
+        pace=itinerary.pace,
+        travel_mode=itinerary.travel_mode,
+        group_type=itinerary.group_type
+    )
+
+    crud.update_generation_job(db, db_job, stage="saving")
+    updated = [day if d.day_number == day_number else schemas.ItineraryDay.from_orm(d) for d in days]
+    old_hash = itinerary.content_hash
+    crud.replace_itinerary_day(db, itinerary, day, render_itinerary_text(updated))
+    discard_stale_pdf(db, old_hash)
+    crud.update_generation_job(db, db_job, status="succeeded", stage="done")
+
+
+def run_refine(db: Session, db_job):
+    """Revise an itinerary from its current content and only the changed preferences.
+
+    Skips the tool calls and fresh city context of a full regeneration.
+    """
+    refinement = schemas.ItineraryRefine.parse_raw(db_job.request)
+    changes = refinement.preferences()
+    itinerary = db_job.itinerary
+    agent = get_agent(refinement.model_tier)
+
+    crud.update_generation_job(db, db_job, stage="generating")
+    days = None
+    if itinerary.days:
+        days = agent.refine_structured_itinerary(
+            itinerary.destination, itinerary.start_date, itinerary.end_date,
+            [schemas.ItineraryDay.from_orm(d) for d in itinerary.days], changes, refinement.instruction
+        )
+        content = render_itinerary_text(days)
+    else:
+        content = agent.refine_itinerary(
+            itinerary.destination, itinerary.start_date, itinerary.end_date,
+            itinerary.content, changes, refinement.instruction
+        )
+
+    crud.update_generation_job(db, db_job, stage="saving")
+    old_hash = itinerary.content_hash
+    crud.refine_itinerary(db, itinerary, changes, content, days)
+    discard_stale_pdf(db, old_hash)
+    crud.update_generation_job(db, db_job, status="succeeded", stage="done")
+
+
+JOB_RUNNERS = {
+    "trip": run_trip,
+    "day": run_regenerate_day,
+    "refine": run_refine,
+}
+
+
+def run_generation_job(job_id: str):
+    db = SessionLocal()
+    try:
+        if not crud.claim_generation_job(db, job_id, _stale_before()):
+            return
+        db_job = crud.get_generation_job(db, job_id)
+        try:
+            if db_job.kind in JOB_RUNNERS:
+                JOB_RUNNERS[db_job.kind](db, db_job)
+                return
+            itinerary = schemas.ItineraryCreate.parse_raw(db_job.request)
+            crud.update_generation_job(db, db_job, stage="generating")
+            content, days = generate(itinerary)
+
+            crud.update_generation_job(db, db_job, stage="saving")
+            db_itinerary = save_itinerary(db, itinerary, db_job.owner_id, content, days)
+            crud.update_generation_job(db, db_job, status="succeeded", stage="done", itinerary_id=db_itinerary.id)
+        except Exception as e:
+            logger.exception(f"Generation job {job_id} failed")
+            db.rollback()
+            if db_job.kind == "trip":
+                # Otherwise GET /trips/{id} would serve an empty trip for good
+                crud.delete_failed_trip(db, db_job)
+            crud.update_generation_job(db, db_job, status="failed", stage="failed", error=str(e))
+    finally:
+        db.close()
+
+
+job_queue = JobQueue()
@@ -0,0 +1,72 @@
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "google")
+# The provider's default model is used when unset
+LLM_MODEL = os.getenv("LLM_MODEL") or None
+
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", 0))
+# Tokens per second; 0 streams without delay
+FAKE_LLM_TOKEN_RATE = float(os.getenv("FAKE_LLM_TOKEN_RATE", 50))
+FAKE_LLM_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", 0))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", 0))
+
+DEFAULT_TIER = "default"
+
+LLMSpec = Tuple[str, Optional[str]]
+
+
+def _parse_tiers(value: str) -> Dict[str, LLMSpec]:
+    """Parse "draft=google:gemini-1.5-flash-8b,final=google:gemini-1.5-pro"."""
+    tiers = {DEFAULT_TIER: (LLM_PROVIDER, LLM_MODEL)}
+    for entry in filter(None, (e.strip() for e in value.split(","))):
+        name, _, spec = entry.partition("=")
+        provider, _, model = spec.partition(":")
+        tiers[name.strip()] = (provider.strip(), model.strip() or None)
+    return tiers
+
+
+# Named models a request can pick, e.g. a fast one for previews
+LLM_TIERS = _parse_tiers(os.getenv("LLM_TIERS", ""))
+
+_providers: Dict[str, Callable] = {}
+
+
+def register_provider(name: str):
+    """Register a factory that takes an optional model name and returns a chat model."""
+    def decorator(factory: Callable):
+        _providers[name] = factory
+        return factory
+    return decorator
+
+
+@register_provider("google")
+def _google(model: Optional[str]):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if not google_api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable not set.")
+    return ChatGoogleGenerativeAI(model=model or "gemini-1.5-flash", google_api_key=google_api_key)
+
+
+@register_provider("fake")
+def _fake(model: Optional[str]):
+    from .fake_llm import FakeStreamingChatModel
+
+    return FakeStreamingChatModel(
+        latency=FAKE_LLM_LATENCY,
+        token_delay=1 / FAKE_LLM_TOKEN_RATE if FAKE_LLM_TOKEN_RATE > 0 else 0.0,
+        failure_rate=FAKE_LLM_FAILURE_RATE,
+        seed=FAKE_LLM_SEED,
+    )
+
+
+def get_llm(tier: Optional[str] = None):
+    name = tier or DEFAULT_TIER
+    if name not in LLM_TIERS:
+        raise ValueError(f"Unknown model tier: {name}")
+    provider, model = LLM_TIERS[name]
+    if provider not in _providers:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    return _providers[provider](model)
@@ -1,23 +1,55 @@
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import os
+import json
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import APIRouter
-from typing import Any
+from datetime import date
+from typing import Any, List, Optional
 from pydantic import BaseModel
-from passlib.context import CryptContext
 
 from . import crud, models, schemas
-from .database import engine, get_db
-from .deps import create_access_token, get_current_user
-from .crud import pwd_context
-from .agent import agent_instance
-from .pdf_generator import pdf_generator_instance, PDF_STORAGE_PATH
-from fastapi.responses import FileResponse
-
-
-app = FastAPI(title="Trip Planner API")
+from .database import engine, get_db, get_async_db, SessionLocal, dispose_async_engine, pool_wait_stats, async_pool_wait_stats
+from .deps import create_access_token, get_current_user, get_current_user_async
+from .passwords import password_hasher, PasswordHasherBusy
+from .agent import AIAgent, AgentUnavailable, GENERATION_MODE, agent_status, get_agent, warm_up_agent
+from .pdf_generator import PDFGenerator, get_pdf_generator, pdf_generator_instance, PDF_STORAGE_PATH
+from .geocache import geocode_cache
+from .forecast import forecast_cache
+from .http_client import async_http_client
+from .poi import poi_index
+from .jobs import job_queue, JobQueueFull, TERMINAL_STATUSES, complete_from_cache, save_itinerary
+from .result_cache import result_cache
+from .user_cache import user_cache
+from .prompts import canonical_theme, canonical_group_type
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+JOB_EVENTS_POLL_INTERVAL = float(os.getenv("JOB_EVENTS_POLL_INTERVAL", 0.5))
+ITINERARY_BATCH_LIMIT = int(os.getenv("ITINERARY_BATCH_LIMIT", 100))
+TRIP_LEG_LIMIT = int(os.getenv("TRIP_LEG_LIMIT", 10))
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the agent in the background so startup does not wait for langchain
+    asyncio.get_running_loop().run_in_executor(None, warm_up_agent)
+    job_queue.resume_pending()
+    yield
+    job_queue.shutdown()
+    pdf_generator_instance.shutdown()
+    password_hasher.shutdown()
+    await async_http_client.aclose()
+    await dispose_async_engine()
+
+
+app = FastAPI(title="Trip Planner API", lifespan=lifespan)
 
 
 origins = [
@@ -31,9 +63,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Cache", "X-Next-Cursor", "ETag"],
 )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@app.exception_handler(AgentUnavailable)
+async def agent_unavailable_handler(request: Request, exc: AgentUnavailable):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Itinerary generation is currently unavailable"},
+    )
+
+
+@app.exception_handler(JobQueueFull)
+async def job_queue_full_handler(request: Request, exc: JobQueueFull):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many itineraries are being generated, please retry shortly"},
+        headers={"Retry-After": "5"},
+    )
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many authentication requests, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 router = APIRouter()
 
@@ -43,24 +100,40 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
 
 
-@router.get("/profile", response_model=schemas.User)
-def get_profile(current_user: models.User = Depends(get_current_user)):
-    return current_user
+PROFILE_ITINERARY_LIMIT = int(os.getenv("PROFILE_ITINERARY_LIMIT", 20))
+
+
+async def _user_profile(db: AsyncSession, user: models.User, include: Optional[str]):
+    # Built from the lean schema so the itineraries relationship is never lazy-loaded
+    profile = schemas.UserProfile(**schemas.User.from_orm(user).dict())
+    if include and "itineraries" in include.split(","):
+        itineraries = await crud.get_itineraries_by_user_async(db, user_id=user.id, limit=PROFILE_ITINERARY_LIMIT)
+        profile.itineraries = [schemas.ItinerarySummary.from_orm(itinerary) for itinerary in itineraries]
+    return profile
+
+
+@router.get("/profile", response_model=schemas.UserProfile, response_model_exclude_unset=True)
+async def get_profile(
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    return await _user_profile(db, current_user, include)
 
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     req: ChangePasswordRequest,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
 ):
-    if not pwd_context.verify(req.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(req.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=400, detail="Current password is incorrect")
-    hashed_new = pwd_context.hash(req.new_password)
+    hashed_new = await password_hasher.hash(req.new_password)
     current_user.hashed_password = hashed_new
     db.add(current_user)
-    db.commit()
+    await db.commit()
     return {"msg": "Password updated successfully"}
 
 
@@ -68,81 +141,322 @@ app.include_router(router)
 
 
 @app.post("/register", response_model=schemas.User)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    return crud.create_user(db, user)
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Check for duplicates before paying for the hash
+    await crud.ensure_user_available_async(db, user)
+    hashed_password = await password_hasher.hash(user.password)
+    return await crud.create_user_async(db, user, hashed_password)
 
 
 @app.post("/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_username(db, username=form_data.username)
-    if not user or not pwd_context.verify(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await crud.get_user_by_username_async(db, username=form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.username})
+    if new_hash:
+        # Rehash with the current scheme and cost now that we have the plaintext
+        user.hashed_password = new_hash
+        await db.commit()
+    access_token = create_access_token(data={"sub": user.username}, user_id=user.id)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@app.get("/users/me/", response_model=schemas.User)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
-    return current_user
+@app.get("/users/me/", response_model=schemas.UserProfile, response_model_exclude_unset=True)
+async def read_users_me(
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    return await _user_profile(db, current_user, include)
 
 
-@app.post("/itineraries/", response_model=schemas.Itinerary)
+@app.post("/itineraries/", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
 def create_itinerary(
     itinerary: schemas.ItineraryCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # Generate itinerary with preferences
-    content = agent_instance.generate_itinerary(
-        place=itinerary.destination,
-        start_date=itinerary.start_date,
-        end_date=itinerary.end_date,
-        trip_theme=itinerary.trip_theme,
-        budget=itinerary.budget,
-        pace=itinerary.pace,
-        travel_mode=itinerary.travel_mode,
-        group_type=itinerary.group_type
-    )
+    cached_content = result_cache.get(itinerary)
+    if cached_content is not None:
+        response.status_code = status.HTTP_201_CREATED
+        response.headers["X-Cache"] = "HIT"
+        return complete_from_cache(db, itinerary, current_user.id, cached_content)
 
-    pdf_filename = pdf_generator_instance.generate(
-        content=content,
-        user_id=current_user.id,
-        destination=itinerary.destination
-    )
+    response.headers["X-Cache"] = "BYPASS" if itinerary.bypass_cache else "MISS"
+    get_agent(itinerary.model_tier)
+    # Generation runs on the job queue; clients poll /jobs/{id} for the result
+    return job_queue.enqueue(db, itinerary, current_user.id)
+
+
+@app.post("/itineraries/batch", response_model=list[schemas.Job], status_code=status.HTTP_202_ACCEPTED)
+def create_itineraries_batch(
+    itineraries: List[schemas.ItineraryCreate],
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    # One job per item, in request order; identical items share a job
+    if not itineraries or len(itineraries) > ITINERARY_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch must contain between 1 and {ITINERARY_BATCH_LIMIT} itineraries",
+        )
+    return job_queue.enqueue_batch(db, itineraries, current_user.id)
 
-    return crud.create_user_itinerary(
-        db=db,
-        itinerary=itinerary,
-        user_id=current_user.id,
-        pdf_path=pdf_filename,
-        content=content
-    )
+
+@app.post("/trips/", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def create_trip(
+    trip: schemas.TripCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    # Legs are generated concurrently by one job; poll /jobs/{id}, then read /trips/{trip_id}
+    if len(trip.legs) > TRIP_LEG_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A trip can have at most {TRIP_LEG_LIMIT} legs",
+        )
+    get_agent(trip.model_tier)
+    return job_queue.enqueue_trip(db, trip, current_user.id)
+
+
+@app.get("/trips/{trip_id}", response_model=schemas.Trip)
+async def read_trip(
+    trip_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    trip = await crud.get_trip_async(db, trip_id)
+
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    if trip.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Not authorized to access this trip")
+
+    return trip
+
+
+@app.post("/itineraries/stream")
+async def stream_itinerary(
+    itinerary: schemas.ItineraryCreate,
+    current_user: models.User = Depends(get_current_user)
+):
+    if itinerary.structured:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Structured itineraries cannot be streamed, use POST /itineraries/",
+        )
+    user_id = current_user.id
+    cached_content = await run_in_threadpool(result_cache.get, itinerary)
+    agent = await run_in_threadpool(get_agent, itinerary.model_tier) if cached_content is None else None
+    context = None
+    if agent is not None and (itinerary.generation_mode or GENERATION_MODE) == "pipeline":
+        context = await AIAgent.agather_city_context(itinerary.destination, itinerary.start_date, itinerary.end_date)
+
+    def generate_chunks():
+        if cached_content is not None:
+            yield cached_content
+            return
+        yield from agent.stream_itinerary(
+            place=itinerary.destination,
+            start_date=itinerary.start_date,
+            end_date=itinerary.end_date,
+            trip_theme=itinerary.trip_theme,
+            budget=itinerary.budget,
+            pace=itinerary.pace,
+            travel_mode=itinerary.travel_mode,
+            group_type=itinerary.group_type,
+            mode=itinerary.generation_mode,
+            context=context
+        )
+
+    def ndjson_stream():
+        chunks = []
+        try:
+            for chunk in generate_chunks():
+                chunks.append(chunk)
+                yield json.dumps({"type": "chunk", "text": chunk}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+            return
+
+        content = "".join(chunks)
+        if cached_content is None:
+            result_cache.set(itinerary, content)
+        # The request-scoped session is already closed once streaming starts
+        db = SessionLocal()
+        try:
+            db_itinerary = save_itinerary(db, itinerary, user_id, content)
+            yield json.dumps({"type": "done", "itinerary": jsonable_encoder(schemas.Itinerary.from_orm(db_itinerary))}) + "\n"
+        finally:
+            db.close()
+
+    cache_status = "HIT" if cached_content is not None else "BYPASS" if itinerary.bypass_cache else "MISS"
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson", headers={"X-Cache": cache_status})
+
+
+def _get_owned_job(db: Session, job_id: str, user_id: int):
+    db_job = crud.get_generation_job(db, job_id)
+    if not db_job or db_job.owner_id != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+
+@app.get("/jobs/{job_id}", response_model=schemas.Job)
+async def read_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    db_job = await crud.get_generation_job_async(db, job_id)
+    if not db_job or db_job.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+
+def _job_snapshot(job_id: str):
+    db = SessionLocal()
+    try:
+        db_job = crud.get_generation_job(db, job_id)
+        return schemas.Job.from_orm(db_job) if db_job else None
+    finally:
+        db.close()
 
 
-@app.get("/itineraries/", response_model=list[schemas.Itinerary])
-def read_itineraries(
-    skip: int = 0,
-    limit: int = 100,
+@app.get("/jobs/{job_id}/events")
+def stream_job_events(
+    job_id: str,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    itineraries = crud.get_itineraries_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit)
+    _get_owned_job(db, job_id, current_user.id)
+
+    async def event_stream():
+        last_event = None
+        while True:
+            job = await run_in_threadpool(_job_snapshot, job_id)
+            if job is None:
+                return
+            event = job.json()
+            if event != last_event:
+                yield f"event: {job.status}\ndata: {event}\n\n"
+                last_event = event
+            if job.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/itineraries/", response_model=list[schemas.ItinerarySummary])
+async def read_itineraries(
+    response: Response,
+    after: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    itineraries = await crud.get_itineraries_by_user_async(
+        db, user_id=current_user.id, after_id=after, limit=limit)
+    if len(itineraries) == limit:
+        # Pass as ?after= to fetch the next page
+        response.headers["X-Next-Cursor"] = str(itineraries[-1].id)
     return itineraries
 
 
-@app.get("/itineraries/{itinerary_id}/download")
-def download_itinerary_pdf(
+def _canonical_filter(value: str, canonical, name: str):
+    result = canonical(value)
+    if result is None:
+        raise HTTPException(status_code=422, detail=f"Unknown {name}: {value}")
+    return result
+
+
+@app.get("/itineraries/search", response_model=list[schemas.ItinerarySummary])
+async def search_itineraries(
+    q: Optional[str] = None,
+    trip_theme: Optional[List[str]] = Query(None),
+    budget: Optional[str] = None,
+    pace: Optional[str] = None,
+    travel_mode: Optional[str] = None,
+    group_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    offset: int = Query(0, ge=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    if trip_theme:
+        trip_theme = [_canonical_filter(theme, canonical_theme, "trip theme") for theme in trip_theme]
+    if group_type:
+        group_type = _canonical_filter(group_type, canonical_group_type, "group type")
+    return await crud.search_itineraries_async(
+        db, current_user.id, q=q, trip_theme=trip_theme, budget=budget, pace=pace,
+        travel_mode=travel_mode, group_type=group_type, date_from=date_from, date_to=date_to,
+        offset=offset, limit=limit)
+
+
+@app.get("/itineraries/{itinerary_id}", response_model=schemas.Itinerary)
+async def read_itinerary(
+    itinerary_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    itinerary = await crud.get_itinerary_async(db, itinerary_id)
+
+    if not itinerary:
+        raise HTTPException(status_code=404, detail="Itinerary not found")
+
+    if itinerary.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Not authorized to access this itinerary")
+
+    return itinerary
+
+
+@app.get("/itineraries/{itinerary_id}/days", response_model=list[schemas.ItineraryDay])
+async def read_itinerary_days(
+    itinerary_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    itinerary = await crud.get_itinerary_async(db, itinerary_id)
+
+    if not itinerary:
+        raise HTTPException(status_code=404, detail="Itinerary not found")
+
+    if itinerary.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Not authorized to access this itinerary")
+
+    return await crud.get_itinerary_days_async(db, itinerary_id)
+
+
+@app.post(
+    "/itineraries/{itinerary_id}/days/{day_number}/regenerate",
+    response_model=schemas.Job,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def regenerate_itinerary_day(
     itinerary_id: int,
+    day_number: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    itinerary = db.query(models.Itinerary).filter(
-        models.Itinerary.id == itinerary_id).first()
+    itinerary = crud.get_itinerary(db, itinerary_id)
 
     if not itinerary:
         raise HTTPException(status_code=404, detail="Itinerary not found")
@@ -151,12 +465,159 @@ def download_itinerary_pdf(
         raise HTTPException(
             status_code=403, detail="Not authorized to access this itinerary")
 
-    pdf_path = f"{PDF_STORAGE_PATH}/{itinerary.pdf_path}"
+    if not any(day.day_number == day_number for day in itinerary.days):
+        raise HTTPException(status_code=404, detail="Day not found, only structured itineraries have day records")
 
-    if not os.path.exists(pdf_path):
-        raise HTTPException(status_code=404, detail="PDF file not found")
+    get_agent()
+    # One small LLM call for the day instead of regenerating the whole trip,
+    # run on the job queue; the updated day is read from /itineraries/{id}/days
+    return job_queue.enqueue_update(db, "day", itinerary, json.dumps({"day_number": day_number}))
+
+
+@app.patch(
+    "/itineraries/{itinerary_id}/refine",
+    response_model=schemas.Job,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def refine_itinerary(
+    itinerary_id: int,
+    refinement: schemas.ItineraryRefine,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    itinerary = crud.get_itinerary(db, itinerary_id)
+
+    if not itinerary:
+        raise HTTPException(status_code=404, detail="Itinerary not found")
+
+    if itinerary.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Not authorized to access this itinerary")
+
+    if not itinerary.content:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Itinerary has no content to refine")
+
+    get_agent(refinement.model_tier)
+    # Only the fields that were sent are changed, so unset ones stay out of the job
+    return job_queue.enqueue_update(db, "refine", itinerary, refinement.json(exclude_unset=True))
+
+
+def _parse_range(range_header: str, size: int):
+    """Parse a single ``bytes=`` range into inclusive offsets, or None if unsatisfiable."""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start:
+            first = int(start)
+            last = min(int(end), size - 1) if end else size - 1
+        else:
+            first = max(size - int(end), 0)
+            last = size - 1
+    except ValueError:
+        return None
+    if first > last or first >= size:
+        return None
+    return first, last
+
+
+def _read_file(f, remaining: int):
+    try:
+        while remaining > 0:
+            chunk = f.read(min(PDF_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _pdf_response(request: Request, f, filename: str, etag: str = None):
+    """Stream a PDF from an open file, which is closed once it is sent."""
+    headers = {"Accept-Ranges": "bytes", "Content-Disposition": f'attachment; filename="{filename}"'}
+    if etag:
+        headers["ETag"] = etag
+
+    size = os.fstat(f.fileno()).st_size
+    range_header = request.headers.get("range")
+    if not range_header:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(_read_file(f, size), media_type='application/pdf', headers=headers)
+
+    byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        f.close()
+        return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers={"Content-Range": f"bytes */{size}"})
+    first, last = byte_range
+    f.seek(first)
+    headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    headers["Content-Length"] = str(last - first + 1)
+    return StreamingResponse(
+        _read_file(f, last - first + 1), status_code=status.HTTP_206_PARTIAL_CONTENT, media_type='application/pdf', headers=headers)
+
+
+@app.get("/itineraries/{itinerary_id}/download")
+async def download_itinerary_pdf(
+    itinerary_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    pdf_generator: PDFGenerator = Depends(get_pdf_generator),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    itinerary = await crud.get_itinerary_async(db, itinerary_id)
+
+    if not itinerary:
+        raise HTTPException(status_code=404, detail="Itinerary not found")
+
+    if itinerary.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Not authorized to access this itinerary")
 
-    return FileResponse(pdf_path, media_type='application/pdf', filename=itinerary.pdf_path)
+    filename = f"itinerary_{itinerary.id}_{itinerary.destination.replace(' ', '_')}.pdf"
+
+    if not itinerary.content_hash:
+        # Itineraries without content only have the PDF rendered at creation
+        if not itinerary.pdf_path:
+            raise HTTPException(status_code=404, detail="PDF file not found")
+        try:
+            f = await run_in_threadpool(open, f"{PDF_STORAGE_PATH}/{itinerary.pdf_path}", "rb")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="PDF file not found")
+        return _pdf_response(request, f, filename)
+
+    etag = f'"{itinerary.content_hash}"'
+    if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # A refine may discard this file while it is sent; the open handle keeps it readable
+    f = await pdf_generator.aopen_pdf(itinerary.content_hash, itinerary.content)
+    return _pdf_response(request, f, filename, etag)
+
+
+@app.get("/metrics/caches")
+def read_cache_metrics(current_user: models.User = Depends(get_current_user)):
+    return {
+        "geocode": geocode_cache.stats(),
+        "forecast": forecast_cache.stats(),
+        "poi": poi_index.stats(),
+        "itinerary": result_cache.stats(),
+        "user": user_cache.stats(),
+    }
+
+
+@app.get("/metrics/db-pool")
+def read_db_pool_metrics(current_user: models.User = Depends(get_current_user)):
+    return {"sync": pool_wait_stats.stats(), "async": async_pool_wait_stats.stats()}
+
+
+@app.get("/health")
+def read_health():
+    # "degraded" while itinerary generation is unavailable, e.g. without an API key
+    generation = agent_status()
+    return {"status": "degraded" if generation == "unavailable" else "ok", "generation": generation}
 
 
 @app.get("/")
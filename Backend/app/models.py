@@ -1,6 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, ARRAY
-from sqlalchemy.orm import relationship
+import os
+from sqlalchemy import Column, Float, Index, Integer, JSON, LargeBinary, String, Text, Date, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
+from .compression import compress_content, decompress_content
+
+CONTENT_STORAGE = os.getenv("CONTENT_STORAGE", "compressed")
 
 class User(Base):
     __tablename__ = "users"
@@ -22,14 +27,137 @@ class Itinerary(Base):
     destination = Column(String, index=True, nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
-    content = Column(Text, nullable=True)
+    # Content is stored in one of two columns; use the ``content`` property
+    content_text = Column("content", Text, nullable=True)
+    content_compressed = Column(LargeBinary, nullable=True)
+    content_hash = Column(String(64), index=True, nullable=True)
+    # Maintained by app.search on write; never read back
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
     pdf_path = Column(String, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id"))
+    # Set for the legs of a multi-city trip
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), index=True, nullable=True)
+    leg_number = Column(Integer, nullable=True)
     
-    trip_theme = Column(ARRAY(String), nullable=True, default=[])
+    # SQLite has no arrays; themes are stored as a JSON list there
+    trip_theme = Column(ARRAY(String).with_variant(JSON, "sqlite"), nullable=True, default=[])
     budget = Column(String, nullable=True)
     pace = Column(String, nullable=True)
     travel_mode = Column(String, nullable=True)
     group_type = Column(String, nullable=True)
 
-    owner = relationship("User", back_populates="itineraries")
\ No newline at end of file
+    owner = relationship("User", back_populates="itineraries")
+    trip = relationship("Trip", back_populates="legs")
+    days = relationship(
+        "ItineraryDay", back_populates="itinerary", order_by="ItineraryDay.day_number", cascade="all, delete-orphan"
+    )
+
+    @property
+    def content(self):
+        if self.content_compressed is not None:
+            return decompress_content(self.content_compressed)
+        return self.content_text
+
+    @content.setter
+    def content(self, value):
+        if value is not None and CONTENT_STORAGE == "compressed":
+            self.content_compressed = compress_content(value)
+            self.content_text = None
+        else:
+            self.content_text = value
+            self.content_compressed = None
+
+    __table_args__ = (
+        Index("ix_itineraries_owner_id_id", "owner_id", "id"),
+        Index("ix_itineraries_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_itineraries_trip_theme", "trip_theme", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+
+class ItineraryDay(Base):
+    __tablename__ = "itinerary_days"
+
+    id = Column(Integer, primary_key=True, index=True)
+    itinerary_id = Column(Integer, ForeignKey("itineraries.id", ondelete="CASCADE"), nullable=False)
+    day_number = Column(Integer, nullable=False)
+    date = Column(Date, nullable=True)
+    title = Column(String, nullable=True)
+    activities = Column(JSON, nullable=False, default=list)
+    notes = Column(Text, nullable=True)
+
+    itinerary = relationship("Itinerary", back_populates="days")
+
+    __table_args__ = (
+        UniqueConstraint("itinerary_id", "day_number", name="uq_itinerary_days_itinerary_id_day_number"),
+    )
+
+
+class Trip(Base):
+    __tablename__ = "trips"
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    transport_summary = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    legs = relationship("Itinerary", back_populates="trip", order_by="Itinerary.leg_number")
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(String(32), primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    # "itinerary" and "trip" create new records; "day" and "refine" change
+    # an existing itinerary, whose id is set on the job up front
+    kind = Column(String, nullable=False, default="itinerary", server_default="itinerary")
+    status = Column(String, nullable=False, default="queued")
+    stage = Column(String, nullable=True)
+    request = Column(Text, nullable=False)
+    error = Column(Text, nullable=True)
+    itinerary_id = Column(Integer, ForeignKey("itineraries.id"), nullable=True)
+    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    itinerary = relationship("Itinerary")
+
+
+class GeocodeCacheEntry(Base):
+    __tablename__ = "geocode_cache"
+
+    city = Column(String, primary_key=True)
+    lat = Column(String, nullable=False)
+    lon = Column(String, nullable=False)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class PointOfInterest(Base):
+    __tablename__ = "points_of_interest"
+
+    id = Column(Integer, primary_key=True)
+    city = Column(String, nullable=False)
+    pageid = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    lat = Column(Float, nullable=True)
+    lon = Column(Float, nullable=True)
+    # Metres from the city centre
+    distance = Column(Float, nullable=True)
+    extract = Column(Text, nullable=True)
+    categories = Column(JSON, nullable=False, default=list)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("city", "pageid", name="uq_points_of_interest_city_pageid"),
+    )
+
+
+class ItineraryCacheEntry(Base):
+    __tablename__ = "itinerary_cache"
+
+    key = Column(String(64), primary_key=True)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    last_used_at = Column(DateTime(timezone=True), index=True, nullable=False)
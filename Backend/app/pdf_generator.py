@@ -1,32 +1,138 @@
-from fpdf import FPDF
+import io
 import os
-from datetime import datetime
+import copy
+import uuid
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-PDF_STORAGE_PATH = "/app/generated_pdfs"
+PDF_STORAGE_PATH = os.getenv("PDF_STORAGE_PATH", "/app/generated_pdfs")
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 2))
 FONT_PATH = os.path.join(os.path.dirname(__file__), "fonts", "DejaVuSans.ttf")
 
+# Per worker process: the parsed font and its raw bytes, loaded once
+_font = None
+_font_bytes = None
+
+
+def _preload_font():
+    global _font, _font_bytes
+    # fpdf is imported here so only the rendering processes load it
+    from fpdf import FPDF
+
+    template = FPDF()
+    template.add_font("DejaVu", "", FONT_PATH)
+    _font = template.fonts["dejavu"]
+    with open(FONT_PATH, "rb") as f:
+        _font_bytes = f.read()
+
+
+def _new_document():
+    from fpdf import FPDF
+    from fpdf.fonts import SubsetMap
+    from fontTools import ttLib
+
+    if _font is None:
+        _preload_font()
+    pdf = FPDF()
+    # Reuse the parsed metrics, but give each document its own font tables
+    # and subset since fpdf subsets the tables in place when writing output.
+    # These are fpdf2 internals: fpdf2 and fonttools are pinned exactly, and
+    # tests/test_pdf_generator.py checks the output matches add_font's.
+    font = copy.copy(_font)
+    font.i = len(pdf.fonts) + 1
+    font.ttfont = ttLib.TTFont(io.BytesIO(_font_bytes), recalcTimestamp=False, fontNumber=0, lazy=True)
+    font.missing_glyphs = []
+    font.subset = SubsetMap(font)
+    pdf.fonts["dejavu"] = font
+    return pdf
+
+
+def render_pdf(content: str) -> bytes:
+    pdf = _new_document()
+    pdf.add_page()
+    pdf.set_font("DejaVu", size=12)
+    pdf.multi_cell(0, 10, content)
+    return bytes(pdf.output())
+
+
+def write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
 class PDFGenerator:
-    def generate(self, content: str, user_id: int, destination: str) -> str:
-        if not os.path.exists(PDF_STORAGE_PATH):
-            os.makedirs(PDF_STORAGE_PATH)
-        
-        pdf = FPDF()
-        pdf.add_page()
-        # Register and use the Unicode font
-        pdf.add_font("DejaVu", "", FONT_PATH, uni=True)
-        pdf.set_font("DejaVu", size=12)
-        
-        # Add content to the PDF
-        pdf.multi_cell(0, 10, content)
-        
-        # Generate a unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"itinerary_{user_id}_{destination.replace(' ', '_')}_{timestamp}.pdf"
-        filepath = os.path.join(PDF_STORAGE_PATH, filename)
-        
-        # Save the PDF
-        pdf.output(filepath)
-        
-        return filename
-
-pdf_generator_instance = PDFGenerator()
\ No newline at end of file
+    """Renders itinerary PDFs in a process pool so rendering never blocks API workers."""
+
+    def __init__(self, workers: int = PDF_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._storage_ready = False
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn keeps worker start-up independent of the API's threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_preload_font,
+            )
+        return self._executor
+
+    async def arender(self, content: str) -> bytes:
+        # Awaited on the event loop, so a slow render holds no threadpool worker
+        return await asyncio.wrap_future(self.executor.submit(render_pdf, content))
+
+    def _path(self, content_hash: str) -> str:
+        if not self._storage_ready:
+            os.makedirs(PDF_STORAGE_PATH, exist_ok=True)
+            self._storage_ready = True
+        return os.path.join(PDF_STORAGE_PATH, f"{content_hash}.pdf")
+
+    async def aensure_pdf(self, content_hash: str, content: str) -> str:
+        """Return the path of the PDF for this content, rendering it on first use.
+
+        Files are named by content hash, so identical itineraries share one file.
+        """
+        path = self._path(content_hash)
+        if not os.path.exists(path):
+            data = await self.arender(content)
+            await asyncio.to_thread(write_atomic, path, data)
+        return path
+
+    async def aopen_pdf(self, content_hash: str, content: str):
+        """Open the PDF for this content for reading, rendering it on first use.
+
+        Responses stream from the returned file object, so a file discarded
+        while it is being sent is still sent in full.
+        """
+        for attempt in range(2):
+            path = await self.aensure_pdf(content_hash, content)
+            try:
+                return await asyncio.to_thread(open, path, "rb")
+            except FileNotFoundError:
+                # Discarded between rendering and opening; render it again
+                if attempt:
+                    raise
+
+    def discard(self, content_hash: str):
+        """Delete the stored PDF for content that no itinerary has any more."""
+        try:
+            os.remove(self._path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pdf_generator_instance = PDFGenerator()
+
+
+def get_pdf_generator() -> PDFGenerator:
+    return pdf_generator_instance
@@ -0,0 +1,150 @@
+from typing import List, Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Stops per day for each pace preference; unset pace uses None
+STOPS_PER_DAY = {"relaxed": 3, None: 4, "packed": 6}
+
+KMEANS_ITERATIONS = 20
+
+
+def haversine_matrix(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km between every pair of points."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _project(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    # Equirectangular projection in km; accurate enough within a city
+    lat0 = np.radians(lat.mean())
+    return np.column_stack((np.radians(lon) * np.cos(lat0), np.radians(lat))) * EARTH_RADIUS_KM
+
+
+def balanced_kmeans(points: np.ndarray, k: int, capacity: int) -> np.ndarray:
+    """Assign points to k clusters of at most ``capacity`` points each.
+
+    Lloyd iterations from a farthest-point start, so results are
+    deterministic, with a capacity-constrained assignment step.
+    """
+    n = len(points)
+    centres = [int(np.argmin(((points - points.mean(axis=0)) ** 2).sum(axis=1)))]
+    nearest = ((points - points[centres[0]]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        centres.append(int(np.argmax(nearest)))
+        nearest = np.minimum(nearest, ((points - points[centres[-1]]) ** 2).sum(axis=1))
+    centres = points[centres]
+
+    labels = None
+    for _ in range(KMEANS_ITERATIONS):
+        dist = ((points[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2)
+        new_labels = _assign_with_capacity(dist, capacity)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centres)
+        np.add.at(sums, labels, points)
+        centres = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centres)
+    return labels
+
+
+def _assign_with_capacity(dist: np.ndarray, capacity: int) -> np.ndarray:
+    """Nearest-centre assignment where overfull centres evict their farthest points.
+
+    Evicted points move to their nearest centre with room and never return
+    to the centre that evicted them; that centre stays full from then on.
+    """
+    dist = dist.copy()
+    k = dist.shape[1]
+    labels = dist.argmin(axis=1)
+    while True:
+        counts = np.bincount(labels, minlength=k)
+        overfull = np.flatnonzero(counts > capacity)
+        if not len(overfull):
+            return labels
+        for centre in overfull:
+            members = np.flatnonzero(labels == centre)
+            evicted = members[np.argsort(dist[members, centre], kind="stable")[capacity:]]
+            dist[evicted, centre] = np.inf
+            counts[centre] = capacity
+            choices = np.where(counts >= capacity, np.inf, dist[evicted])
+            labels[evicted] = choices.argmin(axis=1)
+
+
+def order_route(dist: np.ndarray, start: int = 0) -> np.ndarray:
+    """Open path from ``start`` through every point: nearest neighbour, then 2-opt."""
+    n = len(dist)
+    order = [start]
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start] = False
+    for _ in range(n - 1):
+        candidates = np.where(unvisited, dist[order[-1]], np.inf)
+        order.append(int(np.argmin(candidates)))
+        unvisited[order[-1]] = False
+    if n < 4:
+        return np.array(order)
+
+    # A trailing node at distance 0 from everything lets the path end move
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = dist
+    path = np.array(order + [n])
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            # Reversing path[i..j] swaps edges (i-1, i), (j, j+1) for (i-1, j), (i, j+1)
+            j = np.arange(i + 1, n)
+            delta = (
+                padded[path[i - 1], path[j]] + padded[path[i], path[j + 1]]
+                - padded[path[i - 1], path[i]] - padded[path[j], path[j + 1]]
+            )
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                path[i:j[best] + 1] = path[i:j[best] + 1][::-1].copy()
+                improved = True
+    return path[:-1]
+
+
+def plan_days(pois: List[dict], days: int, pace: Optional[str] = None) -> List[List[dict]]:
+    """Group POIs into one walkable cluster per day, each in visiting order.
+
+    Uses the first days x stops-per-day POIs that have coordinates, so pass
+    them best first (the POI index returns them nearest the centre first).
+    Days are ordered so each starts near where the previous one ended.
+    """
+    stops = STOPS_PER_DAY.get(pace.lower() if pace else None, STOPS_PER_DAY[None])
+    located = [poi for poi in pois if poi.get("lat") is not None and poi.get("lon") is not None][:days * stops]
+    if not located or days < 1:
+        return [[] for _ in range(max(days, 0))]
+
+    lat = np.array([poi["lat"] for poi in located], dtype=float)
+    lon = np.array([poi["lon"] for poi in located], dtype=float)
+    dist = haversine_matrix(lat, lon)
+    k = min(days, len(located))
+    labels = balanced_kmeans(_project(lat, lon), k, capacity=-(-len(located) // k))
+
+    plan, position = [], None
+    members = {c: np.flatnonzero(labels == c) for c in range(k)}
+    remaining = set(range(k))
+    while remaining:
+        if position is None:
+            # Start with the day closest to the city centre
+            cluster = min(remaining, key=lambda c: dist[members[c]].sum(axis=1).min() if len(members[c]) else np.inf)
+        else:
+            cluster = min(remaining, key=lambda c: dist[position, members[c]].min() if len(members[c]) else np.inf)
+        remaining.discard(cluster)
+        idx = members[cluster]
+        if not len(idx):
+            plan.append([])
+            continue
+        sub = dist[np.ix_(idx, idx)]
+        start = int(np.argmin(dist[position, idx])) if position is not None else int(np.argmin(sub.sum(axis=1)))
+        route = idx[order_route(sub, start)]
+        position = int(route[-1])
+        plan.append([located[i] for i in route])
+    return plan + [[] for _ in range(days - k)]
@@ -0,0 +1,228 @@
+import os
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from sqlalchemy import delete, func, select
+
+from . import models
+from .database import SessionLocal
+from .geocache import geocode_cache
+from .http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php")
+
+# Wikipedia allows a radius of up to 10 km and 500 geosearch results
+POI_SEARCH_RADIUS = int(os.getenv("POI_SEARCH_RADIUS", 10000))
+POI_SEARCH_LIMIT = int(os.getenv("POI_SEARCH_LIMIT", 100))
+POI_INDEX_TTL = int(os.getenv("POI_INDEX_TTL", 30 * 24 * 3600))
+# Page details are requested for at most 50 pages per call
+DETAILS_BATCH_SIZE = 50
+
+POPULAR_DESTINATIONS = (
+    "Paris", "London", "Rome", "Barcelona", "Amsterdam", "Prague", "Vienna", "Istanbul",
+    "Dubai", "Singapore", "Bangkok", "Tokyo", "Kyoto", "Seoul", "Bali", "Sydney",
+    "New York", "San Francisco", "Mexico City", "Cape Town", "Delhi", "Mumbai", "Jaipur", "Goa",
+)
+
+
+def _get_json(params: dict) -> Optional[dict]:
+    try:
+        resp = http_client.get(WIKIPEDIA_API_URL, params={**params, "format": "json", "formatversion": 2})
+        resp.raise_for_status()
+        return resp.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"Error querying Wikipedia: {e}")
+        return None
+
+
+def fetch_pois(lat, lon) -> List[dict]:
+    """Geosearch around a point, then fetch page details in batched calls.
+
+    Each details call asks for extracts, coordinates and categories of up
+    to 50 pages at once, following ``continue`` for properties the API
+    returns in parts.
+    """
+    data = _get_json({
+        "action": "query",
+        "list": "geosearch",
+        "gscoord": f"{lat}|{lon}",
+        "gsradius": POI_SEARCH_RADIUS,
+        "gslimit": POI_SEARCH_LIMIT,
+    })
+    results = (data or {}).get("query", {}).get("geosearch", [])
+    pois: Dict[int, dict] = {
+        r["pageid"]: {
+            "pageid": r["pageid"],
+            "title": r["title"],
+            "lat": r.get("lat"),
+            "lon": r.get("lon"),
+            "distance": r.get("dist"),
+            "extract": None,
+            "categories": [],
+        }
+        for r in results if "pageid" in r
+    }
+
+    pageids = list(pois)
+    for i in range(0, len(pageids), DETAILS_BATCH_SIZE):
+        params = {
+            "action": "query",
+            "pageids": "|".join(str(pageid) for pageid in pageids[i:i + DETAILS_BATCH_SIZE]),
+            "prop": "extracts|coordinates|categories",
+            "exintro": 1,
+            "explaintext": 1,
+            "exsentences": 2,
+            "exlimit": "max",
+            "cllimit": "max",
+            "clshow": "!hidden",
+        }
+        cont = {}
+        while True:
+            data = _get_json({**params, **cont})
+            if data is None:
+                break
+            for page in data.get("query", {}).get("pages", []):
+                poi = pois.get(page.get("pageid"))
+                if poi is None:
+                    continue
+                if page.get("extract"):
+                    poi["extract"] = page["extract"]
+                if page.get("coordinates"):
+                    poi["lat"], poi["lon"] = page["coordinates"][0]["lat"], page["coordinates"][0]["lon"]
+                poi["categories"].extend(c["title"].split(":", 1)[-1] for c in page.get("categories", []))
+            if "continue" not in data:
+                break
+            cont = data["continue"]
+    return list(pois.values())
+
+
+class POIIndex:
+    """Per-city points of interest from Wikipedia, kept in the database.
+
+    A city is fetched once and then served from the index until it is older
+    than POI_INDEX_TTL, so itinerary requests do not hit the network.
+    """
+
+    def __init__(self, ttl: int = POI_INDEX_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(city: str) -> str:
+        return " ".join(city.lower().split())
+
+    def places(self, city: str, limit: Optional[int] = None) -> List[dict]:
+        """Return the indexed POIs for a city, nearest to its centre first."""
+        key = self._key(city)
+        pois = self._load(key, limit)
+        if pois is not None:
+            self.hits += 1
+            return pois
+        self.misses += 1
+        pois = self.refresh(city)
+        return pois[:limit] if limit else pois
+
+    def refresh(self, city: str) -> List[dict]:
+        lat, lon = geocode_cache.get_or_fetch(city, _fetch_city_coords)
+        if not lat or not lon:
+            return []
+        pois = sorted(fetch_pois(lat, lon), key=lambda poi: poi["distance"] if poi["distance"] is not None else float("inf"))
+        if pois:
+            self._store(self._key(city), pois)
+        return pois
+
+    def _load(self, key: str, limit: Optional[int]) -> Optional[List[dict]]:
+        db = SessionLocal()
+        try:
+            fetched_at = db.execute(
+                select(func.min(models.PointOfInterest.fetched_at)).filter(models.PointOfInterest.city == key)
+            ).scalar()
+            if fetched_at is None:
+                return None
+            if fetched_at.tzinfo is None:
+                fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+            if fetched_at + timedelta(seconds=self.ttl) < datetime.now(timezone.utc):
+                return None
+            query = (
+                select(models.PointOfInterest)
+                .filter(models.PointOfInterest.city == key)
+                .order_by(models.PointOfInterest.distance, models.PointOfInterest.id)
+                .limit(limit)
+            )
+            return [
+                {
+                    "pageid": row.pageid,
+                    "title": row.title,
+                    "lat": row.lat,
+                    "lon": row.lon,
+                    "distance": row.distance,
+                    "extract": row.extract,
+                    "categories": row.categories,
+                }
+                for row in db.execute(query).scalars()
+            ]
+        except Exception as e:
+            logger.error(f"Error reading POI index: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _store(self, key: str, pois: List[dict]):
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            db.execute(delete(models.PointOfInterest).filter(models.PointOfInterest.city == key))
+            db.add_all(models.PointOfInterest(city=key, fetched_at=now, **poi) for poi in pois)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error writing POI index: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def warm(self, cities: Iterable[str], refresh: bool = False) -> Dict[str, int]:
+        """Index each city, skipping fresh ones unless ``refresh``; returns POI counts."""
+        counts = {}
+        for city in cities:
+            pois = None if refresh else self._load(self._key(city), None)
+            counts[city] = len(pois if pois is not None else self.refresh(city))
+        return counts
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def _fetch_city_coords(city: str):
+    # Imported here: agent imports this module for its place search
+    from .agent import AIAgent
+    return AIAgent._fetch_city_coords(city)
+
+
+poi_index = POIIndex()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Manage the points of interest index")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    warm = subcommands.add_parser("warm", help="Index POIs for a list of destinations")
+    warm.add_argument("cities", nargs="*", help="Destinations to index (default: a built-in list of popular ones)")
+    warm.add_argument("--file", help="Read destinations from a file, one per line")
+    warm.add_argument("--refresh", action="store_true", help="Re-fetch destinations that are already indexed")
+    args = parser.parse_args(argv)
+
+    cities = list(args.cities)
+    if args.file:
+        with open(args.file) as f:
+            cities.extend(line.strip() for line in f if line.strip())
+    for city, count in poi_index.warm(cities or POPULAR_DESTINATIONS, refresh=args.refresh).items():
+        print(f"{city}: {count} places")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+from datetime import date
+from typing import List, Optional, Tuple
+
+# Bump whenever the template or fragments change so cached results from an
+# older prompt are not served for the new one.
+PROMPT_VERSION = "v1"
+
+THEME_FRAGMENTS = {
+    "adventure": "- Focus on outdoor activities, trekking, adventure sports, and adrenaline-pumping experiences\n",
+    "religious": "- Include temples, holy sites, spiritual experiences, and religious festivals\n",
+    "cultural": "- Emphasize museums, historical sites, local traditions, and cultural experiences\n",
+    "foodie": "- Highlight local cuisine, food tours, cooking classes, and famous restaurants\n",
+    "relaxation": "- Focus on spas, beaches, peaceful locations, and stress-free activities\n",
+    "romantic": "- Include romantic spots, couple activities, scenic views, and intimate dining\n",
+    "family-friendly": "- Ensure child-safe activities, family restaurants, and kid-friendly attractions\n",
+}
+
+THEME_ALIASES = {
+    "adventurous": "adventure",
+    "spiritual": "religious",
+    "culture": "cultural",
+    "food": "foodie",
+    "relax": "relaxation",
+    "romance": "romantic",
+    "family friendly": "family-friendly",
+    "family_friendly": "family-friendly",
+    "kids": "family-friendly",
+}
+
+GROUP_FRAGMENTS = {
+    "solo": "- Include solo-friendly activities, social opportunities, and safe travel options\n",
+    "couple": "- Focus on romantic activities, intimate dining, and couple-friendly experiences\n",
+    "family": "- Ensure child-safe activities, family restaurants, and kid-friendly attractions\n",
+    "friends": "- Include group activities, social experiences, nightlife, and fun group adventures\n",
+    "senior_friendly": "- Focus on accessible activities, comfortable transportation, and senior-friendly accommodations\n",
+}
+
+GROUP_ALIASES = {
+    "senior friendly": "senior_friendly",
+    "senior-friendly": "senior_friendly",
+    "seniors": "senior_friendly",
+    "couples": "couple",
+}
+
+PREFERENCE_LABELS = (
+    ("budget", "Budget Level"),
+    ("pace", "Pace Preference"),
+    ("travel_mode", "Preferred Travel Mode"),
+    ("group_type", "Group Type"),
+)
+
+ITINERARY_TEMPLATE = """Generate a detailed travel itinerary for a trip to {place} from {start_date} to {end_date}.{preferences}
+
+        Please include:
+        - Daily breakdown: A day-by-day plan with specific activities, attractions, and recommended timings.
+        - Weather considerations: Suggest activities and packing advice based on the typical weather conditions in {place} during that time.
+        - Transportation: Recommendations for getting around based on the preferred travel mode.
+        - Accommodation suggestions: Briefly mention suitable accommodation types based on budget level.
+        - Food recommendations: Highlight local dishes or restaurants.
+        - Optional activities: Include a few extra suggestions.
+        - Practical tips: Any essential travel tips (currency, language, safety).{recommendations}
+        
+        Please present the itinerary in a clear, organized, and professional format that aligns with the specified preferences.""".format
+
+
+CONTEXT_TEMPLATE = """
+
+        Use this live information about {place} where relevant:{places}{weather}""".format
+
+
+def build_context_block(place: str, context: dict) -> str:
+    places = context.get("places") or []
+    forecast = context.get("forecast")
+    if forecast:
+        weather_block = "\n        - Daily weather for the trip:\n" + "\n".join(f"          {line}" for line in forecast.splitlines())
+    else:
+        weather_block = ""
+    if not places and not weather_block:
+        return ""
+    return CONTEXT_TEMPLATE(
+        place=place,
+        places=f"\n        - Notable places nearby: {', '.join(places)}" if places else "",
+        weather=weather_block,
+    )
+
+
+ACTIVITY_FORMAT = (
+    '{{"time": "09:00", "title": "...", "description": "...", "location": "...", "cost": 20, "currency": "EUR"}}'
+)
+
+STRUCTURED_TEMPLATE = ("""
+
+        Respond with JSON only, no other text, in this format:
+        {{"days": [{{"day_number": 1, "title": "...", "activities": [""" + ACTIVITY_FORMAT + """], "notes": "..."}}]}}
+        Return exactly {days} days. Put weather, transport, food and practical tips for each day in its notes.""").format
+
+DAY_TEMPLATE = ("""Plan day {day_number} ({day_date}) of a trip to {place} from {start_date} to {end_date}.{preferences}
+
+        The other days of the trip are already planned:
+{other_days}
+        Do not repeat their activities.{recommendations}
+
+        Respond with JSON only, no other text, in this format:
+        {{"day_number": {day_number}, "title": "...", "activities": [""" + ACTIVITY_FORMAT + """], "notes": "..."}}""").format
+
+REFINE_TEMPLATE = """Here is an existing travel itinerary for a trip to {place} from {start_date} to {end_date}:
+
+{content}
+
+        Revise it with these changes:{changes}{recommendations}
+
+        Keep everything the changes do not affect as it is, and return the complete revised itinerary in the same format.""".format
+
+TRANSPORT_TEMPLATE = """Summarise how to travel between the cities of this multi-city trip.{preferences}
+
+        Route:
+{route}
+
+        For each transfer, recommend the best way to travel (train, bus, flight, car or ferry) with the typical journey time and approximate cost, and mention anything that should be booked in advance. Keep it brief.""".format
+
+
+def _canonical(value: str, fragments: dict, aliases: dict) -> Optional[str]:
+    key = " ".join(value.lower().split())
+    key = aliases.get(key, key)
+    return key if key in fragments else None
+
+
+def canonical_theme(theme: str) -> Optional[str]:
+    return _canonical(theme, THEME_FRAGMENTS, THEME_ALIASES)
+
+
+def canonical_group_type(group_type: str) -> Optional[str]:
+    return _canonical(group_type, GROUP_FRAGMENTS, GROUP_ALIASES)
+
+
+def _preference_blocks(
+    trip_theme: Optional[List[str]],
+    budget: Optional[str],
+    pace: Optional[str],
+    travel_mode: Optional[str],
+    group_type: Optional[str]
+) -> Tuple[str, str]:
+    values = {"budget": budget, "pace": pace, "travel_mode": travel_mode, "group_type": group_type}
+    preferences = []
+    if trip_theme:
+        preferences.append(f"\nTrip Themes: {', '.join(trip_theme)}")
+    preferences.extend(f"\n{label}: {values[name]}" for name, label in PREFERENCE_LABELS if values[name])
+
+    recommendations = []
+    if trip_theme:
+        recommendations.append("\n\nTheme-Based Recommendations:\n")
+        recommendations.extend(THEME_FRAGMENTS.get(theme.lower(), "") for theme in trip_theme)
+    if group_type:
+        recommendations.append("\n\nGroup-Specific Recommendations:\n")
+        recommendations.append(GROUP_FRAGMENTS.get(group_type.lower(), ""))
+    return "".join(preferences), "".join(recommendations)
+
+
+def build_itinerary_prompt(
+    place: str,
+    start_date: date,
+    end_date: date,
+    trip_theme: Optional[List[str]] = None,
+    budget: Optional[str] = None,
+    pace: Optional[str] = None,
+    travel_mode: Optional[str] = None,
+    group_type: Optional[str] = None,
+    context: Optional[dict] = None
+) -> str:
+    preferences, recommendations = _preference_blocks(trip_theme, budget, pace, travel_mode, group_type)
+    prompt = ITINERARY_TEMPLATE(
+        place=place,
+        start_date=start_date,
+        end_date=end_date,
+        preferences=preferences,
+        recommendations=recommendations,
+    )
+    return prompt + build_context_block(place, context) if context else prompt
+
+
+def build_structured_prompt(place: str, start_date: date, end_date: date, context: Optional[dict] = None, **preferences) -> str:
+    prompt = build_itinerary_prompt(place, start_date, end_date, context=context, **preferences)
+    return prompt + STRUCTURED_TEMPLATE(days=(end_date - start_date).days + 1)
+
+
+def build_day_prompt(
+    place: str,
+    start_date: date,
+    end_date: date,
+    day_number: int,
+    day_date: date,
+    other_days: List[str],
+    trip_theme: Optional[List[str]] = None,
+    budget: Optional[str] = None,
+    pace: Optional[str] = None,
+    travel_mode: Optional[str] = None,
+    group_type: Optional[str] = None
+) -> str:
+    """Prompt for regenerating a single day of a structured itinerary."""
+    preferences, recommendations = _preference_blocks(trip_theme, budget, pace, travel_mode, group_type)
+    return DAY_TEMPLATE(
+        day_number=day_number,
+        day_date=day_date,
+        place=place,
+        start_date=start_date,
+        end_date=end_date,
+        preferences=preferences,
+        other_days="\n".join(f"        - {line}" for line in other_days),
+        recommendations=recommendations,
+    )
+
+
+def build_refine_prompt(
+    place: str,
+    start_date: date,
+    end_date: date,
+    content: str,
+    changes: dict,
+    instruction: Optional[str] = None,
+    structured: bool = False
+) -> str:
+    """Prompt for revising an existing itinerary with only the changed preferences.
+
+    ``changes`` holds the preference fields being changed; a field set to
+    None is dropped from the trip.
+    """
+    preferences, recommendations = _preference_blocks(
+        changes.get("trip_theme"), changes.get("budget"), changes.get("pace"),
+        changes.get("travel_mode"), changes.get("group_type"),
+    )
+    dropped = [label for name, label in (("trip_theme", "Trip Themes"),) + PREFERENCE_LABELS if name in changes and not changes[name]]
+    if dropped:
+        preferences += f"\nNo longer required: {', '.join(dropped)}"
+    if instruction:
+        preferences += f"\nInstruction: {instruction}"
+    prompt = REFINE_TEMPLATE(
+        place=place,
+        start_date=start_date,
+        end_date=end_date,
+        content=content,
+        changes=preferences,
+        recommendations=recommendations,
+    )
+    return prompt + STRUCTURED_TEMPLATE(days=(end_date - start_date).days + 1) if structured else prompt
+
+
+def build_transport_prompt(
+    legs: List[Tuple[str, date, date]],
+    distances: List[Optional[float]],
+    budget: Optional[str] = None,
+    travel_mode: Optional[str] = None,
+    group_type: Optional[str] = None
+) -> str:
+    """Prompt for the transfers of a trip; ``distances`` are km between consecutive legs."""
+    preferences, _ = _preference_blocks(None, budget, None, travel_mode, group_type)
+    route = []
+    for (place, _, _), (next_place, next_start, _), distance in zip(legs, legs[1:], distances):
+        line = f"        - {place} to {next_place} on {next_start}"
+        route.append(line + (f", about {distance:.0f} km apart" if distance is not None else ""))
+    return TRANSPORT_TEMPLATE(preferences=preferences, route="\n".join(route))
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from . import models, schemas
+from .agent import GENERATION_MODE
+from .database import SessionLocal
+from .llm import DEFAULT_TIER
+from .prompts import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+ITINERARY_CACHE_BACKEND = os.getenv("ITINERARY_CACHE_BACKEND", "db")
+ITINERARY_CACHE_TTL = int(os.getenv("ITINERARY_CACHE_TTL", 24 * 3600))
+ITINERARY_CACHE_MAX_ENTRIES = int(os.getenv("ITINERARY_CACHE_MAX_ENTRIES", 10000))
+ITINERARY_CACHE_DIR = os.getenv("ITINERARY_CACHE_DIR", "/app/itinerary_cache")
+
+def _normalize(value: Optional[str]) -> Optional[str]:
+    return " ".join(value.lower().split()) if value else None
+
+
+def cache_key(itinerary: schemas.ItineraryCreate) -> str:
+    """Content address for the generation inputs of an itinerary request."""
+    key = {
+        "prompt_version": PROMPT_VERSION,
+        "destination": _normalize(itinerary.destination),
+        "trip_theme": sorted({_normalize(t) for t in itinerary.trip_theme or [] if t}),
+        "budget": _normalize(itinerary.budget),
+        "pace": _normalize(itinerary.pace),
+        "travel_mode": _normalize(itinerary.travel_mode),
+        "group_type": _normalize(itinerary.group_type),
+    }
+    if itinerary.model_tier and itinerary.model_tier != DEFAULT_TIER:
+        # Added only when set so keys for the default model are unchanged
+        key["model_tier"] = itinerary.model_tier
+    if itinerary.generation_mode and itinerary.generation_mode != GENERATION_MODE:
+        # The pipeline and the agent write differently grounded text
+        key["generation_mode"] = itinerary.generation_mode
+    if itinerary.structured:
+        # Structured results are cached as JSON day records, not text
+        key["structured"] = True
+    if itinerary.cache_fuzzy_dates and itinerary.structured:
+        # Only day records can be re-dated to this request; cached text would
+        # keep the dates of the trip it was generated for. Months rather than
+        # seasons, which depend on the hemisphere.
+        key["days"] = (itinerary.end_date - itinerary.start_date).days + 1
+        key["month"] = itinerary.start_date.month
+    else:
+        key["start_date"] = itinerary.start_date.isoformat()
+        key["end_date"] = itinerary.end_date.isoformat()
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class DatabaseResultStore:
+    def get(self, key: str, ttl: int) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            row = db.get(models.ItineraryCacheEntry, key)
+            if row is None:
+                return None
+            created_at = row.created_at
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            now = datetime.now(timezone.utc)
+            if created_at + timedelta(seconds=ttl) < now:
+                db.delete(row)
+                db.commit()
+                return None
+            row.last_used_at = now
+            db.commit()
+            return row.content
+        finally:
+            db.close()
+
+    def set(self, key: str, content: str, max_entries: int):
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            db.merge(models.ItineraryCacheEntry(key=key, content=content, created_at=now, last_used_at=now))
+            db.commit()
+            overflow = db.query(models.ItineraryCacheEntry).count() - max_entries
+            if overflow > 0:
+                stale = (
+                    db.query(models.ItineraryCacheEntry.key)
+                    .order_by(models.ItineraryCacheEntry.last_used_at)
+                    .limit(overflow)
+                    .subquery()
+                )
+                db.query(models.ItineraryCacheEntry).filter(
+                    models.ItineraryCacheEntry.key.in_(stale)
+                ).delete(synchronize_session=False)
+                db.commit()
+        finally:
+            db.close()
+
+
+class FileResultStore:
+    def __init__(self, directory: str = ITINERARY_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key: str, ttl: int) -> Optional[str]:
+        path = self._path(key)
+        try:
+            # mtime is the creation time, atime tracks last use for eviction
+            if os.path.getmtime(path) + ttl < time.time():
+                os.remove(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+            return content
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, content: str, max_entries: int):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self._path(key))
+
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".txt")]
+        if len(entries) > max_entries:
+            entries.sort(key=lambda e: e.stat().st_atime)
+            for entry in entries[:len(entries) - max_entries]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class ItineraryResultCache:
+    """Reuses generated itinerary text for requests with identical inputs."""
+
+    def __init__(self, backend: str = ITINERARY_CACHE_BACKEND, ttl: int = ITINERARY_CACHE_TTL, max_entries: int = ITINERARY_CACHE_MAX_ENTRIES):
+        if backend == "file":
+            self.store = FileResultStore()
+        elif backend == "db":
+            self.store = DatabaseResultStore()
+        else:
+            self.store = None
+        self.backend = backend if self.store else "off"
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, itinerary: schemas.ItineraryCreate) -> Optional[str]:
+        if self.store is None or itinerary.bypass_cache:
+            return None
+        try:
+            content = self.store.get(cache_key(itinerary), self.ttl)
+        except Exception as e:
+            logger.error(f"Error reading itinerary cache: {e}")
+            content = None
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return content
+
+    def set(self, itinerary: schemas.ItineraryCreate, content: str):
+        if self.store is None or not content:
+            return
+        try:
+            self.store.set(cache_key(itinerary), content, self.max_entries)
+        except Exception as e:
+            logger.error(f"Error writing itinerary cache: {e}")
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "hits": self.hits, "misses": self.misses}
+
+
+result_cache = ItineraryResultCache()
@@ -1,6 +1,35 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator, model_validator
+import datetime
 from datetime import date
-from typing import List, Optional
+from typing import List, Literal, Optional
+
+from .llm import LLM_TIERS
+from .prompts import canonical_theme, canonical_group_type
+
+def _canonical_trip_themes(value):
+    if not value:
+        return value
+    themes = []
+    for theme in value:
+        canonical = canonical_theme(theme)
+        if canonical is None:
+            raise ValueError(f"Unknown trip theme: {theme}")
+        if canonical not in themes:
+            themes.append(canonical)
+    return themes
+
+def _canonical_group_type(value):
+    if not value:
+        return value
+    canonical = canonical_group_type(value)
+    if canonical is None:
+        raise ValueError(f"Unknown group type: {value}")
+    return canonical
+
+def _known_model_tier(value):
+    if value is not None and value not in LLM_TIERS:
+        raise ValueError(f"Unknown model tier: {value}")
+    return value
 
 # Itinerary Schemas
 class ItineraryBase(BaseModel):
@@ -15,17 +44,181 @@ class ItineraryBase(BaseModel):
     group_type: Optional[str] = None
 
 class ItineraryCreate(ItineraryBase):
-    pass
+    # Generation options, not stored on the itinerary
+    bypass_cache: bool = False
+    # Structured only: reuse a cached trip of the same length starting in the same month
+    cache_fuzzy_dates: bool = False
+    # "agent" or "pipeline"; defaults to the GENERATION_MODE setting
+    generation_mode: Optional[Literal["agent", "pipeline"]] = None
+    # One of the configured LLM_TIERS, e.g. a fast model for previews
+    model_tier: Optional[str] = None
+    # Generate per-day records that single days can be regenerated from
+    structured: bool = False
+
+    # Only new requests are validated; stored rows are read back as they are
+    @field_validator("trip_theme")
+    @classmethod
+    def validate_trip_theme(cls, value):
+        return _canonical_trip_themes(value)
+
+    @field_validator("group_type")
+    @classmethod
+    def validate_group_type(cls, value):
+        return _canonical_group_type(value)
+
+    @field_validator("model_tier")
+    @classmethod
+    def validate_model_tier(cls, value):
+        return _known_model_tier(value)
+
+class ItineraryRefine(BaseModel):
+    """Changes to an existing itinerary; only the fields that are sent are applied."""
+    trip_theme: Optional[List[str]] = None
+    budget: Optional[str] = None
+    pace: Optional[str] = None
+    travel_mode: Optional[str] = None
+    group_type: Optional[str] = None
+    # Free-text request, e.g. "swap the museum on day 2 for a food tour"
+    instruction: Optional[str] = None
+    model_tier: Optional[str] = None
+
+    @field_validator("trip_theme")
+    @classmethod
+    def validate_trip_theme(cls, value):
+        return _canonical_trip_themes(value)
+
+    @field_validator("group_type")
+    @classmethod
+    def validate_group_type(cls, value):
+        return _canonical_group_type(value)
 
-class Itinerary(ItineraryBase):
+    @field_validator("model_tier")
+    @classmethod
+    def validate_model_tier(cls, value):
+        return _known_model_tier(value)
+
+    @model_validator(mode="after")
+    def validate_not_empty(self):
+        if not self.preferences() and not self.instruction:
+            raise ValueError("Provide at least one preference to change or an instruction")
+        return self
+
+    def preferences(self) -> dict:
+        return self.dict(exclude_unset=True, exclude={"instruction", "model_tier"})
+
+class ItinerarySummary(ItineraryBase):
     id: int
     owner_id: int
-    content: Optional[str] = None
     pdf_path: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class Itinerary(ItinerarySummary):
+    content: Optional[str] = None
+
+# Structured Itinerary Schemas
+class Activity(BaseModel):
+    time: Optional[str] = None
+    title: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    cost: Optional[float] = None
+    currency: Optional[str] = None
+
+class ItineraryDayBase(BaseModel):
+    day_number: int
+    # datetime.date: a bare ``date`` annotation would resolve to this field
+    date: Optional[datetime.date] = None
+    title: Optional[str] = None
+    activities: List[Activity] = []
+    notes: Optional[str] = None
+
+class ItineraryDay(ItineraryDayBase):
+    id: int
+    itinerary_id: int
+
+    class Config:
+        from_attributes = True
+
+class StructuredItinerary(BaseModel):
+    days: List[ItineraryDayBase]
+
+# Trip Schemas
+class TripLegCreate(BaseModel):
+    destination: str
+    start_date: date
+    end_date: date
+
+class TripCreate(BaseModel):
+    # Cities in travel order; a leg may start on the day the previous one ends
+    legs: List[TripLegCreate]
+    # Trip Preferences, shared by every leg
+    trip_theme: Optional[List[str]] = []
+    budget: Optional[str] = None
+    pace: Optional[str] = None
+    travel_mode: Optional[str] = None
+    group_type: Optional[str] = None
+    generation_mode: Optional[Literal["agent", "pipeline"]] = None
+    model_tier: Optional[str] = None
+
+    @field_validator("legs")
+    @classmethod
+    def validate_legs(cls, value):
+        if not value:
+            raise ValueError("A trip needs at least one leg")
+        for leg in value:
+            if leg.end_date < leg.start_date:
+                raise ValueError(f"Leg to {leg.destination} ends before it starts")
+        for previous, leg in zip(value, value[1:]):
+            if leg.start_date < previous.end_date:
+                raise ValueError("Legs must be in travel order and must not overlap")
+        return value
+
+    @field_validator("trip_theme")
+    @classmethod
+    def validate_trip_theme(cls, value):
+        return _canonical_trip_themes(value)
+
+    @field_validator("group_type")
+    @classmethod
+    def validate_group_type(cls, value):
+        return _canonical_group_type(value)
+
+    @field_validator("model_tier")
+    @classmethod
+    def validate_model_tier(cls, value):
+        return _known_model_tier(value)
+
+    def leg_itineraries(self) -> List[ItineraryCreate]:
+        shared = self.dict(exclude={"legs"})
+        return [ItineraryCreate(**leg.dict(), **shared) for leg in self.legs]
+
+class Trip(BaseModel):
+    id: int
+    owner_id: int
+    start_date: date
+    end_date: date
+    transport_summary: Optional[str] = None
+    legs: List[Itinerary] = []
+
+    class Config:
+        from_attributes = True
+
+# Generation Job Schemas
+class Job(BaseModel):
+    id: str
+    kind: str = "itinerary"
+    status: str
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    itinerary: Optional[Itinerary] = None
+    # Set for multi-city trip jobs, whose result is read from /trips/{id}
+    trip_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
 # User Schemas
 class UserBase(BaseModel):
     username: str
@@ -38,11 +231,14 @@ class UserCreate(UserBase):
 
 class User(UserBase):
     id: int
-    itineraries: List[Itinerary] = []
 
     class Config:
         from_attributes = True
 
+class UserProfile(User):
+    # Only populated when requested with ?include=itineraries
+    itineraries: Optional[List[ItinerarySummary]] = None
+
 
 # Token Schemas for Authentication
 class Token(BaseModel):
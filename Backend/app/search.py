@@ -0,0 +1,63 @@
+import os
+
+from sqlalchemy import DDL, column, event, func, inspect, literal_column, table, text
+
+from . import models
+
+SEARCH_TEXT_CONFIG = os.getenv("SEARCH_TEXT_CONFIG", "english")
+
+# SQLite has no tsvector, so local databases index into an FTS5 table instead.
+# Its rowid is the itinerary id. The owner is indexed as a token so a query
+# only ranks the searching user's rows.
+FTS_TABLE = "itineraries_fts"
+CREATE_FTS_TABLE = f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(destination, content, owner_id)"
+
+fts_table = table(FTS_TABLE, column("rowid"), column("rank"), column(FTS_TABLE))
+
+event.listen(models.Itinerary.__table__, "after_create", DDL(CREATE_FTS_TABLE).execute_if(dialect="sqlite"))
+event.listen(models.Itinerary.__table__, "after_drop", DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"))
+
+
+def search_vector(destination, content):
+    # Matches in the destination rank above matches in the content
+    return func.setweight(func.to_tsvector(SEARCH_TEXT_CONFIG, func.coalesce(destination, "")), literal_column("'A'")).op("||")(
+        func.setweight(func.to_tsvector(SEARCH_TEXT_CONFIG, func.coalesce(content, "")), literal_column("'B'"))
+    )
+
+
+def fts_query(q: str, user_id: int) -> str:
+    # Quote every word so user input is never parsed as FTS5 query syntax
+    words = " ".join('"{}"'.format(word.replace('"', '""')) for word in q.split())
+    return f"owner_id:{int(user_id)} AND {{destination content}}: ({words})"
+
+
+def _text_changed(target) -> bool:
+    attrs = inspect(target).attrs
+    return any(attrs[key].history.has_changes() for key in ("destination", "content_text", "content_compressed", "owner_id"))
+
+
+# Content may be stored compressed, so the index is built here from the
+# plain text rather than by the database.
+
+@event.listens_for(models.Itinerary, "before_insert")
+@event.listens_for(models.Itinerary, "before_update")
+def _update_search_vector(mapper, connection, target):
+    if connection.dialect.name == "postgresql" and _text_changed(target):
+        target.search_vector = search_vector(target.destination, target.content)
+
+
+@event.listens_for(models.Itinerary, "after_insert")
+@event.listens_for(models.Itinerary, "after_update")
+def _update_fts_row(mapper, connection, target):
+    if connection.dialect.name == "sqlite" and _text_changed(target):
+        connection.execute(
+            text(f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, destination, content, owner_id) "
+                 "VALUES (:id, :destination, :content, :owner_id)"),
+            {"id": target.id, "destination": target.destination, "content": target.content, "owner_id": target.owner_id},
+        )
+
+
+@event.listens_for(models.Itinerary, "after_delete")
+def _delete_fts_row(mapper, connection, target):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": target.id})
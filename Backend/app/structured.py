@@ -0,0 +1,84 @@
+import json
+import re
+from datetime import date, timedelta
+from typing import List
+
+from pydantic import ValidationError
+
+from .schemas import Activity, ItineraryDayBase, StructuredItinerary
+
+FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def _extract_json(text: str):
+    """Parse the JSON object in an LLM reply, ignoring code fences and chatter around it."""
+    text = FENCE_RE.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("LLM reply contains no JSON object")
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"LLM reply is not valid JSON: {e}") from e
+
+
+def parse_structured_itinerary(text: str, start_date: date, end_date: date) -> List[ItineraryDayBase]:
+    """Validate a structured itinerary reply into one record per trip day.
+
+    Days are renumbered in order and dated from start_date; extra days
+    beyond the trip length are dropped.
+    """
+    try:
+        days = StructuredItinerary.parse_obj(_extract_json(text)).days
+    except ValidationError as e:
+        raise ValueError(f"LLM reply does not match the itinerary format: {e}") from e
+    if not days:
+        raise ValueError("LLM reply contains no days")
+    days = days[:(end_date - start_date).days + 1]
+    for number, day in enumerate(days, start=1):
+        day.day_number = number
+        day.date = start_date + timedelta(days=number - 1)
+    return days
+
+
+def parse_day(text: str, day_number: int, day_date: date) -> ItineraryDayBase:
+    data = _extract_json(text)
+    # Accept a reply wrapped like a full itinerary
+    if isinstance(data.get("days"), list) and data["days"]:
+        data = data["days"][0]
+    try:
+        day = ItineraryDayBase.parse_obj(data)
+    except ValidationError as e:
+        raise ValueError(f"LLM reply does not match the day format: {e}") from e
+    day.day_number = day_number
+    day.date = day_date
+    return day
+
+
+def _render_activity(activity: Activity) -> str:
+    line = f"- {activity.time}: {activity.title}" if activity.time else f"- {activity.title}"
+    if activity.description:
+        line += f" - {activity.description}"
+    details = [activity.location] if activity.location else []
+    if activity.cost is not None:
+        details.append(f"{activity.cost:g} {activity.currency or ''}".strip())
+    if details:
+        line += f" ({', '.join(details)})"
+    return line
+
+
+def render_itinerary_text(days: List[ItineraryDayBase]) -> str:
+    """Plain-text itinerary, used for the stored content and the PDF."""
+    sections = []
+    for day in days:
+        heading = f"Day {day.day_number}"
+        if day.date:
+            heading += f" ({day.date.isoformat()})"
+        if day.title:
+            heading += f": {day.title}"
+        lines = [heading]
+        lines.extend(_render_activity(activity) for activity in day.activities)
+        if day.notes:
+            lines.append(f"Notes: {day.notes}")
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
@@ -0,0 +1,101 @@
+import os
+import time
+import threading
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from . import models
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+
+
+class UserCache:
+    """Short-lived cache of authenticated users, keyed by username and token ``iat``.
+
+    Only column values are cached. A hit is rebuilt into a detached ``User`` and
+    merged into the request's session without loading, so relationships still
+    lazy-load and changes are saved as usual.
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, maxsize: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, username: str, iat) -> Optional[models.User]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(username, {}).get(iat)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            values = entry[0]
+        user = models.User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def get(self, db, username: str, iat) -> Optional[models.User]:
+        user = self._lookup(username, iat)
+        return db.merge(user, load=False) if user is not None else None
+
+    async def get_async(self, db, username: str, iat) -> Optional[models.User]:
+        user = self._lookup(username, iat)
+        return await db.merge(user, load=False) if user is not None else None
+
+    def set(self, username: str, iat, user: models.User):
+        if self.ttl <= 0:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs}
+        with self._lock:
+            if len(self._entries) >= self.maxsize and username not in self._entries:
+                now = time.monotonic()
+                self._entries = {
+                    name: live for name, tokens in self._entries.items()
+                    if (live := {key: e for key, e in tokens.items() if e[1] >= now})
+                }
+                if len(self._entries) >= self.maxsize:
+                    self._entries.clear()
+            self._entries.setdefault(username, {})[iat] = (values, time.monotonic() + self.ttl)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache()
+
+
+# Any committed change to a user, from an endpoint or elsewhere, drops its
+# cached entries. Invalidating after the commit rather than at flush keeps a
+# concurrent request from caching the old row again in between.
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _mark_stale(mapper, connection, target):
+    stale = object_session(target).info.setdefault("stale_usernames", set())
+    stale.add(target.username)
+    # A renamed user is cached under the old name
+    stale.update(inspect(target).attrs.username.history.deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale(session):
+    for username in session.info.pop("stale_usernames", ()):
+        user_cache.invalidate(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale(session):
+    session.info.pop("stale_usernames", None)
@@ -0,0 +1,118 @@
+"""Throughput of itinerary creation for batches of 1, 10 and 100, one POST per item versus POST /itineraries/batch.
+
+Run from the Backend directory:
+
+    python -m benchmarks.batch [--sizes 1 10 100] [--latency 0.2]
+
+Uses a throwaway SQLite database unless DATABASE_URL is set, and the fake
+LLM with --latency seconds per call. External APIs point at a closed local
+port unless their URLs are set, so context lookups fail fast. Every item
+is a different destination with the result cache bypassed, so each one is
+generated. Time runs from the first request until every job has finished;
+"requests" is the time until the last response, before the jobs finish.
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="planmytrip-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_TOKEN_RATE", "0")
+os.environ.setdefault("PDF_STORAGE_PATH", f"{_tmp}/pdfs")
+os.environ.setdefault("HTTP_RETRIES", "0")
+for name, path in (("NOMINATIM_URL", "/search"), ("WIKIPEDIA_API_URL", "/w/api.php"),
+                   ("OPEN_METEO_URL", "/v1/forecast"), ("OPEN_METEO_ARCHIVE_URL", "/v1/archive")):
+    os.environ.setdefault(name, f"http://127.0.0.1:9{path}")
+
+import argparse
+import logging
+import time
+
+from fastapi.testclient import TestClient
+
+from app import crud, models
+from app.database import Base, SessionLocal, engine
+from app.deps import create_access_token
+from app.jobs import JOB_WORKERS, TERMINAL_STATUSES
+
+
+def _seed() -> str:
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        db.add(models.User(username="bench", email="bench@example.com", hashed_password="unused"))
+        db.commit()
+    finally:
+        db.close()
+    return create_access_token({"sub": "bench"})
+
+
+def _items(run: str, size: int):
+    return [
+        {"destination": f"City {run}-{i}", "start_date": "2025-05-01", "end_date": "2025-05-02", "bypass_cache": True}
+        for i in range(size)
+    ]
+
+
+def _wait(job_ids):
+    while True:
+        db = SessionLocal()
+        try:
+            db_jobs = crud.get_generation_jobs(db, job_ids)
+        finally:
+            db.close()
+        if all(job.status in TERMINAL_STATUSES for job in db_jobs):
+            assert all(job.status == "succeeded" for job in db_jobs), [job.error for job in db_jobs]
+            return
+        time.sleep(0.02)
+
+
+def _one_per_item(client, headers, items):
+    job_ids = []
+    for item in items:
+        response = client.post("/itineraries/", headers=headers, json=item)
+        response.raise_for_status()
+        job_ids.append(response.json()["id"])
+    return job_ids
+
+
+def _batch(client, headers, items):
+    response = client.post("/itineraries/batch", headers=headers, json=items)
+    response.raise_for_status()
+    return [job["id"] for job in response.json()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per LLM call")
+    args = parser.parse_args()
+
+    from app import llm
+    llm.FAKE_LLM_LATENCY = args.latency
+    # Lookups against the closed port fail by design
+    logging.disable(logging.ERROR)
+    headers = {"Authorization": f"Bearer {_seed()}"}
+
+    from app.agent import get_agent
+    from app.main import app
+    get_agent(None).agent.verbose = False
+    print(f"{args.latency:.2f} s per LLM call, {JOB_WORKERS} job workers")
+    with TestClient(app) as client:
+        for size in args.sizes:
+            for name, create in (("one per item", _one_per_item), ("batch", _batch)):
+                started = time.perf_counter()
+                job_ids = create(client, headers, _items(f"{name}-{size}", size))
+                accepted = time.perf_counter() - started
+                _wait(job_ids)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{size:4d} items  {name:12s} requests {accepted * 1000:8.1f} ms"
+                    f"  done {elapsed:6.2f} s  {size / elapsed:6.1f} itineraries/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Storage ratio and encode/decode cost of itinerary content compression.
+
+Run from the Backend directory:
+
+    python -m benchmarks.content_compression [--itineraries 200] [--seed 1]
+
+Itineraries are generated in the markdown layout the LLM returns, with
+varying places and activities, for trips of 1, 3, 7 and 14 days. Each
+one is compressed with plain zlib (dictionary 0) and with the preset
+itinerary dictionary (CURRENT_DICTIONARY), at COMPRESSION_LEVEL. Ratios
+are stored bytes over UTF-8 bytes, including the version byte; times are
+per itinerary.
+"""
+import argparse
+import random
+import time
+
+from app.compression import COMPRESSION_LEVEL, CURRENT_DICTIONARY, compress_content, decompress_content
+
+TRIP_DAYS = (1, 3, 7, 14)
+CITIES = ("Lisbon", "Kyoto", "Jaipur", "Cusco", "Tbilisi", "Oaxaca", "Hanoi", "Marrakesh")
+PLACES = (
+    "the cathedral", "the old town", "the covered market", "the botanical garden", "the fortress",
+    "the harbour", "the national museum", "the hilltop temple", "the spice bazaar", "the riverside promenade",
+    "the royal palace", "the street art district", "the fish market", "the city walls", "the tea houses",
+)
+MEALS = ("street food stalls", "a family-run restaurant", "a rooftop cafe", "the food hall", "a seafood grill")
+
+
+def _itinerary(rng: random.Random, city: str, days: int) -> str:
+    lines = [f"**{days}-Day Itinerary for {city}**", ""]
+    for day in range(1, days + 1):
+        morning, afternoon, evening = rng.sample(PLACES, 3)
+        lines += [
+            f"**Day {day}: {morning.title()} and {afternoon}**",
+            f"* **Morning:** Visit {morning} before the crowds arrive. Breakfast: {rng.choice(MEALS)}.",
+            f"* **Afternoon:** Explore {afternoon}. Lunch: {rng.choice(MEALS)} near {morning}.",
+            f"* **Evening:** Enjoy a sunset view from {evening}. Dinner: {rng.choice(MEALS)}.",
+            "",
+        ]
+    lines += [
+        "**Accommodation Suggestions:** budget-friendly hostels, mid-range hotels and guesthouses near the centre.",
+        f"**Transportation:** public transport, taxi and walking; a cab for day trips from {city}.",
+        "**Weather Considerations:** check the temperature and rainfall, and pack a light jacket.",
+        f"**Food Recommendations:** local cuisine, street food and traditional dishes of {city}.",
+        "**Practical Tips:** Carry some cash. Emergency numbers: 112. Packing list: comfortable walking shoes, sunscreen.",
+    ]
+    return "\n".join(lines)
+
+
+def _timed(fn, values) -> float:
+    started = time.perf_counter()
+    for value in values:
+        fn(value)
+    return (time.perf_counter() - started) / len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--itineraries", type=int, default=200, help="per trip length")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{args.itineraries} itineraries per trip length, zlib level {COMPRESSION_LEVEL}")
+    print(f"{'days':>4s} {'raw bytes':>10s}  {'dictionary':>10s} {'ratio':>6s} {'encode µs':>10s} {'decode µs':>10s}")
+    for days in TRIP_DAYS:
+        texts = [_itinerary(rng, CITIES[i % len(CITIES)], days) for i in range(args.itineraries)]
+        raw = sum(len(text.encode("utf-8")) for text in texts)
+        for version in (0, CURRENT_DICTIONARY):
+            stored = [compress_content(text, version) for text in texts]
+            assert [decompress_content(data) for data in stored] == texts
+            encode = _timed(lambda text: compress_content(text, version), texts)
+            decode = _timed(decompress_content, stored)
+            print(
+                f"{days:4d} {raw // len(texts):10d}  {version:10d} {sum(map(len, stored)) / raw:6.3f}"
+                f" {encode * 1e6:10.1f} {decode * 1e6:10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
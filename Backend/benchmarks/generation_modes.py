@@ -0,0 +1,86 @@
+"""LLM calls and end-to-end latency per itinerary for the agent and pipeline generation modes.
+
+Run from the Backend directory:
+
+    python -m benchmarks.generation_modes [--itineraries 5] [--latency 0.8]
+
+The LLM is a fake with a fixed latency per call. In agent mode it is
+scripted the way a typical ReAct run goes: look up places, look up the
+trip's weather, then answer. External APIs point at a closed local port
+unless their URLs are set, so tool and context lookups fail fast and the
+numbers reflect LLM round-trips only.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='planmytrip-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["LLM_TIERS"] = "benchmark=react-script"
+os.environ.setdefault("HTTP_RETRIES", "0")
+for name, path in (("NOMINATIM_URL", "/search"), ("WIKIPEDIA_API_URL", "/w/api.php"),
+                   ("OPEN_METEO_URL", "/v1/forecast"), ("OPEN_METEO_ARCHIVE_URL", "/v1/archive")):
+    os.environ.setdefault(name, f"http://127.0.0.1:9{path}")
+
+import argparse
+import logging
+import re
+import time
+from datetime import date, timedelta
+from typing import List
+
+from langchain_core.messages import BaseMessage
+
+from app.agent import AIAgent, GENERATION_MODES
+from app.database import Base, engine
+from app.fake_llm import FakeStreamingChatModel
+from app.llm import register_provider
+
+TRIP_RE = re.compile(r"a trip to (.+?) from (\S+) to (\S+?)\.")
+CITIES = ("Lisbon", "Kyoto", "Jaipur", "Cusco", "Tbilisi")
+
+
+class ReActScriptedModel(FakeStreamingChatModel):
+    """Fake LLM that calls the places and weather tools before answering."""
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = str(messages[-1].content) if messages else ""
+        trip = TRIP_RE.search(prompt)
+        if "Action:" not in prompt or not trip:
+            return super()._reply(messages)
+        place, start_date, end_date = trip.groups()
+        # The format instructions mention Observation once; each tool result adds one
+        steps = prompt.count("Observation:") - 1
+        if steps <= 0:
+            return f"Thought: I should find places to visit\nAction: _search_places_tool\nAction Input: {place}"
+        if steps == 1:
+            return f"Thought: I should check the weather\nAction: _get_weather_tool\nAction Input: {place}, {start_date}, {end_date}"
+        return f"Thought: I now know the final answer\nFinal Answer: {self.response}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--itineraries", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per LLM call")
+    args = parser.parse_args()
+
+    register_provider("react-script")(lambda model: ReActScriptedModel(latency=args.latency))
+    # Lookups against the closed port fail by design
+    logging.disable(logging.ERROR)
+    Base.metadata.create_all(engine)
+    agent = AIAgent("benchmark")
+    agent.agent.verbose = False
+
+    start = date.today() + timedelta(days=60)
+    print(f"{args.itineraries} itineraries, {args.latency:.2f} s per LLM call")
+    for mode in GENERATION_MODES:
+        calls = agent.llm.token_usage()["calls"]
+        started = time.perf_counter()
+        for i in range(args.itineraries):
+            agent.generate_itinerary(CITIES[i % len(CITIES)], start, start + timedelta(days=2), mode=mode)
+        elapsed = (time.perf_counter() - started) / args.itineraries
+        calls = (agent.llm.token_usage()["calls"] - calls) / args.itineraries
+        print(f"{mode:10s} {calls:4.1f} LLM calls/itinerary  {elapsed:6.2f} s/itinerary")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Latency and connection reuse of the shared HTTP clients against a local stub server.
+
+Run from the Backend directory:
+
+    python -m benchmarks.http_client [--requests 200] [--delay 0.02] [--concurrency 8]
+
+The stub answers every GET after a fixed delay over keep-alive connections
+and counts the connections it accepts. Each mode sends the same requests:
+a fresh connection per request, the shared sync client one at a time and
+from a thread pool, and the shared async client with asyncio.gather. The
+pooled modes are capped at HTTP_MAX_PER_HOST requests in flight, and their
+latencies include the wait for a slot.
+"""
+import os
+
+os.environ.setdefault("HTTP_RETRIES", "0")
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.http_client import HTTP_MAX_PER_HOST, async_http_client, http_client
+
+
+class StubServer:
+    def __init__(self, delay: float):
+        self.connections = set()
+        lock = threading.Lock()
+        connections = self.connections
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment so delayed ACKs do not skew latency
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with lock:
+                    connections.add(self.client_address)
+                time.sleep(delay)
+                body = b'{"ok": true}'
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _timed(get, url: str) -> float:
+    started = time.perf_counter()
+    get(url).raise_for_status()
+    return time.perf_counter() - started
+
+
+def fresh_connections(url: str, n: int, concurrency: int):
+    return [_timed(requests.get, url) for _ in range(n)]
+
+
+def sync_sequential(url: str, n: int, concurrency: int):
+    return [_timed(http_client.get, url) for _ in range(n)]
+
+
+def sync_threads(url: str, n: int, concurrency: int):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda _: _timed(http_client.get, url), range(n)))
+
+
+def async_gather(url: str, n: int, concurrency: int):
+    async def timed():
+        started = time.perf_counter()
+        (await async_http_client.get(url)).raise_for_status()
+        return time.perf_counter() - started
+
+    async def run():
+        try:
+            return await asyncio.gather(*(timed() for _ in range(n)))
+        finally:
+            await async_http_client.aclose()
+
+    return asyncio.run(run())
+
+
+MODES = (
+    ("fresh connections", fresh_connections),
+    ("sync sequential", sync_sequential),
+    ("sync threads", sync_threads),
+    ("async gather", async_gather),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.02, help="seconds the stub waits before answering")
+    parser.add_argument("--concurrency", type=int, default=8, help="threads for the sync threads mode")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.delay * 1000:.0f} ms stub delay, {HTTP_MAX_PER_HOST} per host")
+    for name, run in MODES:
+        stub = StubServer(args.delay)
+        try:
+            started = time.perf_counter()
+            latencies = sorted(run(stub.url, args.requests, args.concurrency))
+            elapsed = time.perf_counter() - started
+        finally:
+            stub.close()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"{name:18s} {args.requests / elapsed:7.1f} req/s  p50 {statistics.median(latencies) * 1000:6.1f} ms"
+            f"  p99 {p99 * 1000:6.1f} ms  {len(stub.connections):4d} connections"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Logins per second, and latency of other requests, while logins are hashed on request threads or in the process pool.
+
+Run from the Backend directory:
+
+    python -m benchmarks.logins [--logins 64] [--concurrency 16] [--rounds 10]
+
+Uses a throwaway SQLite database unless DATABASE_URL is set. Clients log
+in concurrently while others keep calling an authenticated endpoint, the
+mixed workload a login burst lands on. "request threads" verifies in the
+API's threadpool, as the endpoints did before the password hasher;
+"process pool" goes through PasswordHasher with PASSWORD_HASH_WORKERS
+processes.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='planmytrip-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("USER_CACHE_TTL", "0")
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.database import Base, SessionLocal, dispose_async_engine, engine
+from app.deps import create_access_token
+from app.main import app
+from app.passwords import PASSWORD_HASH_WORKERS, password_hasher
+
+USERS = 8
+
+
+def _seed(hashed_password: str):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        db.add_all(
+            models.User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password=hashed_password)
+            for i in range(USERS)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _p99(latencies) -> float:
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+async def _run(logins: int, concurrency: int):
+    login_latencies, other_latencies = [], []
+    done = asyncio.Event()
+    token = create_access_token({"sub": "bench0"})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def login_client(share: int):
+            for n in range(share):
+                started = time.perf_counter()
+                response = await client.post("/token", data={"username": f"bench{n % USERS}", "password": "secret"})
+                response.raise_for_status()
+                login_latencies.append(time.perf_counter() - started)
+
+        async def other_client():
+            while not done.is_set():
+                started = time.perf_counter()
+                (await client.get("/users/me/", headers={"Authorization": f"Bearer {token}"})).raise_for_status()
+                other_latencies.append(time.perf_counter() - started)
+
+        others = [asyncio.create_task(other_client()) for _ in range(4)]
+        started = time.perf_counter()
+        await asyncio.gather(*(login_client(logins // concurrency + (i < logins % concurrency)) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*others)
+    await dispose_async_engine()
+    return logins / elapsed, _p99(login_latencies), _p99(other_latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost of the stored hashes")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    # The hasher's workers build their context from the environment
+    from app import passwords
+    passwords.BCRYPT_ROUNDS = args.rounds
+    context = passwords.build_context()
+    passwords.pwd_context = context
+    _seed(context.hash("secret"))
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async def verify_on_thread(password, hashed_password):
+        return await run_in_threadpool(context.verify_and_update, password, hashed_password)
+
+    print(f"{args.logins} logins, {args.concurrency} login clients, bcrypt cost {args.rounds}, {PASSWORD_HASH_WORKERS} hash workers")
+    for name in ("request threads", "process pool"):
+        if name == "request threads":
+            password_hasher.verify_and_update = verify_on_thread
+        else:
+            del password_hasher.verify_and_update
+            # Start the workers outside the timed run
+            asyncio.run(password_hasher.hash("warm-up"))
+        rate, login_p99, other_p99 = asyncio.run(_run(args.logins, args.concurrency))
+        print(f"{name:16s} {rate:6.1f} logins/s  login p99 {login_p99 * 1000:7.1f} ms  /users/me/ p99 {other_p99 * 1000:7.1f} ms")
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
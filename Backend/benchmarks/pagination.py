@@ -0,0 +1,111 @@
+"""Latency per itinerary list page with OFFSET over full rows versus keyset over summary columns.
+
+Run from the Backend directory:
+
+    python -m benchmarks.pagination [--itineraries 100000] [--limit 100] [--repeat 5]
+
+Uses a throwaway SQLite database unless DATABASE_URL is set. One user
+gets --itineraries rows of about 4 KB of content each, next to a second
+user with as many again. Pages are read near the start, middle and end of
+the user's list: "offset" is the list query before keyset pagination,
+loading whole rows and skipping earlier ones, and "keyset" is the
+endpoint's query through crud._itinerary_summaries_query on the
+(owner_id, id) index. The best of --repeat reads is reported per page.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='planmytrip-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy import func, insert, select
+
+from app import crud, models
+from app.database import Base, SessionLocal, engine
+
+CONTENT = ("Day 1: Morning in the old town, lunch at the market, sunset at the viewpoint. " * 52)[:4096]
+BATCH_SIZE = 5000
+
+
+def _seed(count: int):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        users = [models.User(username=name, email=f"{name}@example.com", hashed_password="unused") for name in ("bench", "other")]
+        db.add_all(users)
+        db.commit()
+        owners = [user.id for user in users]
+        # Core inserts, interleaving the two users' rows; the search index is not needed here
+        rows = (
+            {"destination": "Lisbon", "start_date": date(2025, 5, 1), "end_date": date(2025, 5, 3),
+             "content_text": CONTENT, "owner_id": owners[i % 2], "trip_theme": ["cultural"], "budget": "Moderate"}
+            for i in range(count * 2)
+        )
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                db.execute(insert(models.Itinerary), batch)
+                batch = []
+        if batch:
+            db.execute(insert(models.Itinerary), batch)
+        db.commit()
+        return owners[0]
+    finally:
+        db.close()
+
+
+def _offset_page(db, user_id: int, offset: int, limit: int):
+    return db.query(models.Itinerary).filter(models.Itinerary.owner_id == user_id).order_by(models.Itinerary.id).offset(offset).limit(limit).all()
+
+
+def _keyset_page(db, user_id: int, after_id, limit: int):
+    return db.execute(crud._itinerary_summaries_query(user_id, after_id, limit)).scalars().all()
+
+
+def _best(repeat: int, run) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            run(db)
+            best = min(best, time.perf_counter() - started)
+        finally:
+            db.close()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--itineraries", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    user_id = _seed(args.itineraries)
+    print(f"Seeded {args.itineraries} itineraries per user in {time.perf_counter() - started:.1f} s, {args.limit} per page")
+
+    db = SessionLocal()
+    try:
+        ids = db.execute(
+            select(models.Itinerary.id).filter(models.Itinerary.owner_id == user_id).order_by(models.Itinerary.id)
+        ).scalars().all()
+        assert db.execute(select(func.count()).select_from(models.Itinerary)).scalar() == args.itineraries * 2
+    finally:
+        db.close()
+
+    for label, offset in (("first", 0), ("middle", len(ids) // 2), ("last", len(ids) - args.limit)):
+        after_id = ids[offset - 1] if offset else None
+        offset_time = _best(args.repeat, lambda db: _offset_page(db, user_id, offset, args.limit))
+        keyset_time = _best(args.repeat, lambda db: _keyset_page(db, user_id, after_id, args.limit))
+        print(f"{label:6s} page  offset {offset_time * 1000:8.2f} ms  keyset {keyset_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""PDFs per second and p99 latency of the PDF renderer against the previous per-request path.
+
+Run from the Backend directory:
+
+    python -m benchmarks.pdf_render [--pdfs 40] [--concurrency 8]
+
+Concurrent clients each download their share of PDFs, every one with
+distinct content so none is served from disk. "per-request font" is the
+code path before the process pool: a new FPDF that parses DejaVuSans for
+every document and writes the file, run on request threads like a sync
+endpoint. "process pool" awaits PDFGenerator.aensure_pdf from the event
+loop with PDF_WORKERS workers that parsed the font once. Small
+itineraries cover three days and long ones thirty.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("PDF_STORAGE_PATH", tempfile.mkdtemp(prefix="planmytrip-bench-pdfs-"))
+
+import argparse
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.pdf_generator import FONT_PATH, PDF_STORAGE_PATH, PDF_WORKERS, PDFGenerator
+
+DAY = (
+    "Day {day}: Morning: Walk through the old town and visit the cathedral. "
+    "Afternoon: Lunch at the covered market, then a museum of local history. "
+    "Evening: Sunset from the viewpoint and dinner at a family-run restaurant.\n\n"
+)
+SIZES = (("small", 3), ("long", 30))
+
+
+def _hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _itinerary(days: int, n: int) -> str:
+    return f"Itinerary {n}\n\n" + "".join(DAY.format(day=day) for day in range(1, days + 1))
+
+
+def per_request_font(content: str) -> str:
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.add_font("DejaVu", "", FONT_PATH)
+    pdf.set_font("DejaVu", size=12)
+    pdf.multi_cell(0, 10, content)
+    path = os.path.join(PDF_STORAGE_PATH, f"baseline-{_hash(content)}.pdf")
+    pdf.output(path)
+    return path
+
+
+def _timed(render, content: str) -> float:
+    started = time.perf_counter()
+    render(content)
+    return time.perf_counter() - started
+
+
+def run_threads(contents, concurrency: int):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda content: _timed(per_request_font, content), contents))
+
+
+def run_pool(generator: PDFGenerator, contents, concurrency: int):
+    async def client(share):
+        latencies = []
+        for content in share:
+            started = time.perf_counter()
+            await generator.aensure_pdf(_hash(content), content)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def run():
+        shares = await asyncio.gather(*(client(contents[i::concurrency]) for i in range(concurrency)))
+        return [latency for share in shares for latency in share]
+
+    return asyncio.run(run())
+
+
+def _report(name: str, size: str, count: int, elapsed: float, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{size:6s} {name:17s} {count / elapsed:6.1f} PDFs/s  p99 {p99 * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdfs", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    generator = PDFGenerator()
+    # Start the workers and load their font outside the timed runs
+    asyncio.run(generator.arender("warm-up"))
+    print(f"{args.pdfs} PDFs per run, {args.concurrency} concurrent clients, {PDF_WORKERS} PDF workers")
+    try:
+        for size, days in SIZES:
+            for name, run in (
+                ("per-request font", lambda contents: run_threads(contents, args.concurrency)),
+                ("process pool", lambda contents: run_pool(generator, contents, args.concurrency)),
+            ):
+                contents = [_itinerary(days, n) + name for n in range(args.pdfs)]
+                started = time.perf_counter()
+                latencies = run(contents)
+                _report(name, size, args.pdfs, time.perf_counter() - started, latencies)
+    finally:
+        generator.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Time and walking distance of the day planner against round-robin days.
+
+Run from the Backend directory:
+
+    python -m benchmarks.planner [--runs 20] [--seed 1]
+
+Synthetic cities have six dense districts plus scattered sights within
+10 km of the centre, listed nearest the centre first as the POI index
+returns them. plan_days groups them into days and orders each day; the
+round-robin plan, which the agent's suggestion tool used before, deals
+the same places out to days in turn and visits them in list order. Route
+km is the walk within days, summed over the trip; times and distances
+are means over --runs cities.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.planner import STOPS_PER_DAY, haversine_matrix, plan_days
+
+CASES = (
+    (100, 3, "relaxed"),
+    (300, 7, None),
+    (500, 14, "packed"),
+    (500, 60, "packed"),
+)
+CENTRE = (38.7223, -9.1393)
+DISTRICTS = 6
+# Degrees; about 10 km and 400 m
+CITY_SPREAD = 0.09
+DISTRICT_SPREAD = 0.004
+
+
+def _city(rng: np.random.Generator, count: int):
+    districts = np.array(CENTRE) + rng.uniform(-CITY_SPREAD / 2, CITY_SPREAD / 2, (DISTRICTS, 2))
+    dense = count * 2 // 3
+    points = np.concatenate([
+        districts[rng.integers(DISTRICTS, size=dense)] + rng.normal(scale=DISTRICT_SPREAD, size=(dense, 2)),
+        np.array(CENTRE) + rng.uniform(-CITY_SPREAD, CITY_SPREAD, (count - dense, 2)),
+    ])
+    points = points[np.argsort(np.hypot(*(points - np.array(CENTRE)).T))]
+    return [{"title": f"Place {i}", "lat": float(lat), "lon": float(lon)} for i, (lat, lon) in enumerate(points)]
+
+
+def _route_km(days) -> float:
+    total = 0.0
+    for day in days:
+        if len(day) > 1:
+            dist = haversine_matrix(np.array([poi["lat"] for poi in day]), np.array([poi["lon"] for poi in day]))
+            total += float(dist[np.arange(len(day) - 1), np.arange(1, len(day))].sum())
+    return total
+
+
+def _round_robin(pois, days: int, pace):
+    used = pois[:days * STOPS_PER_DAY[pace]]
+    return [used[day::days] for day in range(days)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'POIs':>5s} {'days':>5s}  {'pace':8s} {'stops':>5s} {'time ms':>8s} {'route km':>9s} {'round-robin km':>15s}")
+    for count, days, pace in CASES:
+        elapsed = planned = round_robin = 0.0
+        for _ in range(args.runs):
+            pois = _city(rng, count)
+            started = time.perf_counter()
+            plan = plan_days(pois, days, pace)
+            elapsed += time.perf_counter() - started
+            planned += _route_km(plan)
+            round_robin += _route_km(_round_robin(pois, days, pace))
+        stops = sum(map(len, plan))
+        print(
+            f"{count:5d} {days:5d}  {pace or '-':8s} {stops:5d} {elapsed / args.runs * 1000:8.1f}"
+            f" {planned / args.runs:9.1f} {round_robin / args.runs:15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
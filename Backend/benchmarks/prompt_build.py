@@ -0,0 +1,71 @@
+"""Per-request cost of validating an itinerary request and building its prompt.
+
+Run from the Backend directory:
+
+    python -m benchmarks.prompt_build [--requests 10000] [--batches 5]
+
+Each batch validates and builds prompts for a mix of requests with no
+preferences, several aliased themes and a group type. The best batch is
+reported, as microseconds per request.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from app.prompts import build_itinerary_prompt
+from app.schemas import ItineraryCreate
+
+REQUESTS = (
+    {"destination": "Goa"},
+    {"destination": "Jaipur", "trip_theme": ["Culture", "food", "Adventurous"], "budget": "Moderate",
+     "pace": "Packed", "travel_mode": "Cab", "group_type": "family"},
+    {"destination": "Kyoto", "trip_theme": ["spiritual"], "group_type": "senior friendly", "pace": "Relaxed"},
+)
+
+
+def _bodies(count: int):
+    start = date(2025, 1, 1)
+    for i in range(count):
+        body = dict(REQUESTS[i % len(REQUESTS)])
+        body["start_date"] = start + timedelta(days=i % 300)
+        body["end_date"] = body["start_date"] + timedelta(days=i % 7)
+        yield body
+
+
+def _build(itinerary: ItineraryCreate) -> str:
+    return build_itinerary_prompt(
+        itinerary.destination, itinerary.start_date, itinerary.end_date,
+        trip_theme=itinerary.trip_theme, budget=itinerary.budget, pace=itinerary.pace,
+        travel_mode=itinerary.travel_mode, group_type=itinerary.group_type,
+    )
+
+
+def _best(batches: int, run) -> float:
+    best = float("inf")
+    for _ in range(batches):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--batches", type=int, default=5)
+    args = parser.parse_args()
+
+    bodies = list(_bodies(args.requests))
+    itineraries = [ItineraryCreate(**body) for body in bodies]
+    timings = {
+        "validate": _best(args.batches, lambda: [ItineraryCreate(**body) for body in bodies]),
+        "build prompt": _best(args.batches, lambda: [_build(itinerary) for itinerary in itineraries]),
+        "validate + build": _best(args.batches, lambda: [_build(ItineraryCreate(**body)) for body in bodies]),
+    }
+    print(f"{args.requests} requests per batch, best of {args.batches}")
+    for name, seconds in timings.items():
+        print(f"{name:18s} {seconds * 1e6 / args.requests:7.2f} us/request  {seconds * 1000:8.1f} ms/batch")
+
+
+if __name__ == "__main__":
+    main()
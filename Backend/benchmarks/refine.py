@@ -0,0 +1,89 @@
+"""LLM calls, tokens and latency of refining an itinerary versus regenerating it.
+
+Run from the Backend directory:
+
+    python -m benchmarks.refine [--itineraries 5] [--latency 0.8] [--token-rate 50]
+
+The LLM is the fake model, with a fixed latency per call and a delay per
+generated token; it counts whitespace-delimited tokens sent and generated.
+In agent mode it calls the places and weather tools before answering, as
+in benchmarks.generation_modes. Each itinerary changes one preference, the
+budget: "regenerate" runs the full generation again in each mode, as
+creating a new itinerary did, and "refine" sends the existing content and
+only the change. Structured itineraries are compared the same way on their
+day records. External APIs point at a closed local port unless their URLs
+are set, so context lookups fail fast and add no prompt tokens; with real
+lookups, regeneration prompts are larger still.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='planmytrip-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+# Sets up the rest of the environment, including the scripted model's tier
+from benchmarks.generation_modes import ReActScriptedModel
+
+import argparse
+import logging
+import time
+from datetime import date, timedelta
+
+from app.agent import AIAgent, GENERATION_MODES
+from app.database import Base, engine
+from app.llm import register_provider
+
+CITIES = ("Lisbon", "Kyoto", "Jaipur", "Cusco", "Tbilisi")
+TRIP_DAYS = 3
+PREFERENCES = {"budget": "Moderate", "pace": "Relaxed"}
+CHANGES = {"budget": "Luxury"}
+
+
+def _measure(agent: AIAgent, name: str, count: int, run):
+    before = agent.llm.token_usage()
+    started = time.perf_counter()
+    for i in range(count):
+        run(CITIES[i % len(CITIES)])
+    elapsed = (time.perf_counter() - started) / count
+    usage = {key: (value - before[key]) / count for key, value in agent.llm.token_usage().items()}
+    print(
+        f"{name:24s} {usage['calls']:4.1f} calls  {usage['prompt']:7.0f} prompt  {usage['completion']:6.0f} completion"
+        f"  {elapsed:6.2f} s/itinerary"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--itineraries", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per LLM call")
+    parser.add_argument("--token-rate", type=float, default=50, help="generated tokens per second, 0 for no delay")
+    args = parser.parse_args()
+
+    token_delay = 1 / args.token_rate if args.token_rate > 0 else 0.0
+    register_provider("react-script")(lambda model: ReActScriptedModel(latency=args.latency, token_delay=token_delay))
+    # Lookups against the closed port fail by design
+    logging.disable(logging.ERROR)
+    Base.metadata.create_all(engine)
+    agent = AIAgent("benchmark")
+    agent.agent.verbose = False
+
+    start = date.today() + timedelta(days=60)
+    end = start + timedelta(days=TRIP_DAYS - 1)
+    content = agent.generate_itinerary(CITIES[0], start, end, mode="pipeline", **PREFERENCES)
+    days = agent.generate_structured_itinerary(CITIES[0], start, end, **PREFERENCES)
+    revised = {**PREFERENCES, **CHANGES}
+
+    print(f"{args.itineraries} {TRIP_DAYS}-day itineraries, {args.latency:.2f} s per LLM call, {args.token_rate:g} tokens/s; per itinerary:")
+    for mode in GENERATION_MODES:
+        _measure(agent, f"regenerate ({mode})", args.itineraries,
+                 lambda city: agent.generate_itinerary(city, start, end, mode=mode, **revised))
+    _measure(agent, "refine", args.itineraries,
+             lambda city: agent.refine_itinerary(city, start, end, content, CHANGES))
+    _measure(agent, "regenerate (structured)", args.itineraries,
+             lambda city: agent.generate_structured_itinerary(city, start, end, **revised))
+    _measure(agent, "refine (structured)", args.itineraries,
+             lambda city: agent.refine_structured_itinerary(city, start, end, days, CHANGES))
+
+
+if __name__ == "__main__":
+    main()
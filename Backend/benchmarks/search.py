@@ -0,0 +1,146 @@
+"""Latency of itinerary search queries at up to millions of rows, indexed versus a LIKE scan.
+
+Run from the Backend directory:
+
+    python -m benchmarks.search [--itineraries 1000000] [--users 100] [--queries 50]
+
+Uses a throwaway SQLite database with the FTS5 index unless DATABASE_URL
+points at PostgreSQL, where the tsvector and trip_theme GIN indexes are
+used. Rows are spread evenly over --users users and carry short generated
+content. Each search runs for random users through the endpoint's query,
+crud._itinerary_search_query; text searches are also run as the
+case-insensitive LIKE scan over destination and content that search
+replaces. p50 and p99 latencies are in milliseconds.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='planmytrip-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert, or_, select, text
+
+from app import crud, models
+from app.database import Base, SessionLocal, engine
+from app.search import FTS_TABLE, search_vector
+
+CITIES = ("Lisbon", "Porto", "Kyoto", "Osaka", "Jaipur", "Udaipur", "Cusco", "Lima", "Tbilisi", "Batumi")
+WORDS = (
+    "alfama", "tram", "fado", "temple", "shrine", "market", "fortress", "palace", "museum", "garden",
+    "beach", "vineyard", "hike", "canyon", "bazaar", "cathedral", "harbour", "lagoon", "monastery", "ruins",
+)
+THEMES = ("adventure", "religious", "cultural", "foodie", "relaxation", "romantic", "family-friendly")
+BUDGETS = ("Budget", "Moderate", "Luxury")
+BATCH_SIZE = 10000
+
+SEARCHES = (
+    ("text", {"q": "alfama tram"}),
+    ("text + theme", {"q": "temple", "trip_theme": ["religious", "cultural"]}),
+    ("theme + budget", {"trip_theme": ["adventure"], "budget": "Luxury"}),
+    ("date range", {"date_from": date(2025, 7, 1), "date_to": date(2025, 7, 14)}),
+)
+
+
+def _rows(rng: random.Random, owners, count: int):
+    start = date(2025, 1, 1)
+    for i in range(count):
+        city = rng.choice(CITIES)
+        words = " ".join(rng.sample(WORDS, 6))
+        day = start + timedelta(days=rng.randrange(365))
+        yield {
+            "destination": city,
+            "start_date": day,
+            "end_date": day + timedelta(days=rng.randrange(1, 8)),
+            "content_text": f"Day 1: Arrive in {city} and see the {words}. Day 2: Free morning, dinner in the old town.",
+            "owner_id": owners[i % len(owners)],
+            "trip_theme": rng.sample(THEMES, rng.randrange(0, 3)),
+            "budget": rng.choice(BUDGETS),
+        }
+
+
+def _seed(count: int, users: int, rng: random.Random):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        db_users = [models.User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password="unused") for i in range(users)]
+        db.add_all(db_users)
+        db.commit()
+        owners = [user.id for user in db_users]
+        batch = []
+        for row in _rows(rng, owners, count):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                db.execute(insert(models.Itinerary), batch)
+                batch = []
+        if batch:
+            db.execute(insert(models.Itinerary), batch)
+        # Bulk inserts skip the ORM events that index each row, so index in one statement
+        itineraries = models.Itinerary.__table__
+        if engine.dialect.name == "postgresql":
+            db.execute(itineraries.update().values(search_vector=search_vector(itineraries.c.destination, itineraries.c.content)))
+        else:
+            db.execute(text(
+                f"INSERT INTO {FTS_TABLE} (rowid, destination, content, owner_id) "
+                "SELECT id, destination, content, owner_id FROM itineraries"
+            ))
+        db.commit()
+        return owners
+    finally:
+        db.close()
+
+
+def _like_query(user_id: int, q: str):
+    query = select(models.Itinerary).filter(models.Itinerary.owner_id == user_id)
+    for word in q.split():
+        pattern = f"%{word}%"
+        query = query.filter(or_(models.Itinerary.destination.ilike(pattern), models.Itinerary.content_text.ilike(pattern)))
+    return query.order_by(models.Itinerary.id.desc()).limit(100)
+
+
+def _latencies(queries: int, owners, rng: random.Random, build):
+    latencies = []
+    db = SessionLocal()
+    try:
+        for _ in range(queries):
+            query = build(rng.choice(owners))
+            started = time.perf_counter()
+            db.execute(query).scalars().all()
+            latencies.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    return sorted(latencies)
+
+
+def _report(name: str, latencies):
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:26s} p50 {statistics.median(latencies) * 1000:8.2f} ms  p99 {p99 * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--itineraries", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    owners = _seed(args.itineraries, args.users, rng)
+    dialect = engine.dialect.name
+    print(f"Seeded {args.itineraries} itineraries for {args.users} users on {dialect} in {time.perf_counter() - started:.1f} s")
+
+    for name, filters in SEARCHES:
+        _report(name, _latencies(args.queries, owners, rng, lambda user_id: crud._itinerary_search_query(dialect, user_id, **filters)))
+        if "q" in filters:
+            _report(f"{name} (LIKE scan)", _latencies(args.queries, owners, rng, lambda user_id: _like_query(user_id, filters["q"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cold-start time of importing app.main, with the slowest imports from python -X importtime.
+
+Run from the Backend directory:
+
+    python -m benchmarks.startup [--runs 5] [--top 15] [--target 1.0]
+
+Each run imports app.main in a fresh interpreter, against a throwaway
+SQLite database and without GOOGLE_API_KEY, as a worker boots before the
+agent is first used. One more run under -X importtime, which slows the
+import down, gives the module table, sorted by self time so that nested
+imports are not counted twice.
+Heavy dependencies that must stay out of the import (langchain, the model
+SDKs, fpdf) are checked too. Exits non-zero if the median import exceeds
+--target seconds or a heavy dependency was loaded.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Loaded on first use of the agent or in the PDF renderer processes only
+DEFERRED_MODULES = ("langchain", "langchain_core", "langchain_google_genai", "google.generativeai", "fpdf")
+
+IMPORT_SCRIPT = f"""
+import sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+loaded = [name for name in {DEFERRED_MODULES!r} if name in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def _run(env, importtime: bool = False):
+    options = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *options, "-c", IMPORT_SCRIPT],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    elapsed, _, loaded = result.stdout.strip().rpartition("\n")[2].partition(" ")
+    return float(elapsed), [name for name in loaded.split(",") if name], result.stderr
+
+
+def _importtime_table(stderr: str):
+    """Parse -X importtime output into (self µs, cumulative µs, module) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target", type=float, default=1.0, help="seconds")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop("GOOGLE_API_KEY", None)
+    env.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='planmytrip-bench-')}/bench.db")
+    env.setdefault("SECRET_KEY", "benchmark")
+
+    runs = [_run(env) for _ in range(args.runs)]
+    times = [elapsed for elapsed, _, _ in runs]
+    _, _, importtime = _run(env, importtime=True)
+
+    print(f"import app.main over {args.runs} runs: best {min(times):.3f} s  median {statistics.median(times):.3f} s  target {args.target:.3f} s")
+    print(f"{'self ms':>8s} {'cumulative ms':>13s}  module")
+    for self_us, cumulative_us, module in sorted(_importtime_table(importtime), reverse=True)[:args.top]:
+        print(f"{self_us / 1000:8.1f} {cumulative_us / 1000:13.1f}  {module}")
+
+    loaded = sorted({name for _, names, _ in runs for name in names})
+    if loaded:
+        print(f"Deferred modules loaded at import: {', '.join(loaded)}")
+    if loaded or statistics.median(times) > args.target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Latency of multi-city trip jobs as legs are added, legs generated one at a time versus concurrently.
+
+Run from the Backend directory:
+
+    python -m benchmarks.trips [--legs 1 2 4 8] [--latency 0.5] [--concurrency 4]
+
+Uses a throwaway SQLite database unless DATABASE_URL is set, the fake LLM
+with --latency seconds per call and the result cache off. Legs are
+generated in pipeline mode, one LLM call each, and trips of two or more
+legs make one more call for the transport summary. External APIs point at
+a closed local port unless their URLs are set, so geocoding and context
+lookups fail fast. Each trip is timed from POST /trips/ until its job
+finishes, with the leg pool at 1 worker and at --concurrency workers;
+"calls in turn" is the LLM time alone with every call made one after
+another.
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="planmytrip-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_TOKEN_RATE", "0")
+os.environ["ITINERARY_CACHE_BACKEND"] = "off"
+os.environ.setdefault("HTTP_RETRIES", "0")
+for name, path in (("NOMINATIM_URL", "/search"), ("WIKIPEDIA_API_URL", "/w/api.php"),
+                   ("OPEN_METEO_URL", "/v1/forecast"), ("OPEN_METEO_ARCHIVE_URL", "/v1/archive")):
+    os.environ.setdefault(name, f"http://127.0.0.1:9{path}")
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app import crud, models
+from app.database import Base, SessionLocal, engine
+from app.deps import create_access_token
+from app.jobs import TERMINAL_STATUSES, job_queue
+
+CITIES = ("Lisbon", "Porto", "Madrid", "Seville", "Granada", "Valencia", "Barcelona", "Bilbao")
+LEG_DAYS = 3
+
+
+def _seed() -> str:
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        db.add(models.User(username="bench", email="bench@example.com", hashed_password="unused"))
+        db.commit()
+    finally:
+        db.close()
+    return create_access_token({"sub": "bench"})
+
+
+def _trip(legs: int) -> dict:
+    start = date.today() + timedelta(days=60)
+    return {
+        "generation_mode": "pipeline",
+        "legs": [
+            {
+                "destination": CITIES[i % len(CITIES)],
+                "start_date": (start + timedelta(days=i * LEG_DAYS)).isoformat(),
+                "end_date": (start + timedelta(days=(i + 1) * LEG_DAYS)).isoformat(),
+            }
+            for i in range(legs)
+        ],
+    }
+
+
+def _run(client, headers, legs: int) -> float:
+    started = time.perf_counter()
+    response = client.post("/trips/", headers=headers, json=_trip(legs))
+    response.raise_for_status()
+    job_id = response.json()["id"]
+    while True:
+        db = SessionLocal()
+        try:
+            db_job = crud.get_generation_job(db, job_id)
+        finally:
+            db.close()
+        if db_job.status in TERMINAL_STATUSES:
+            assert db_job.status == "succeeded", db_job.error
+            return time.perf_counter() - started
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--legs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per LLM call")
+    parser.add_argument("--concurrency", type=int, default=4, help="leg workers")
+    args = parser.parse_args()
+
+    from app import llm
+    llm.FAKE_LLM_LATENCY = args.latency
+    # Lookups against the closed port fail by design
+    logging.disable(logging.ERROR)
+    headers = {"Authorization": f"Bearer {_seed()}"}
+
+    from app.agent import get_agent
+    from app.main import app
+    # Build the agent outside the timed runs
+    get_agent(None)
+    print(f"{args.latency:.2f} s per LLM call, {LEG_DAYS}-day legs")
+    print(f"{'legs':>4s} {'1 worker':>9s} {f'{args.concurrency} workers':>10s} {'calls in turn':>14s}")
+    with TestClient(app) as client:
+        default_executor = job_queue.leg_executor
+        # The first job also pays for the worker threads and first connections
+        _run(client, headers, 1)
+        try:
+            for legs in args.legs:
+                times = []
+                for workers in (1, args.concurrency):
+                    job_queue.leg_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trip-leg")
+                    times.append(_run(client, headers, legs))
+                    job_queue.leg_executor.shutdown()
+                calls = legs + (legs > 1)
+                print(f"{legs:4d} {times[0]:8.2f}s {times[1]:9.2f}s {calls * args.latency:13.2f}s")
+        finally:
+            job_queue.leg_executor = default_executor
+
+
+if __name__ == "__main__":
+    main()
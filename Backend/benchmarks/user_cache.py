@@ -0,0 +1,100 @@
+"""Database round-trips and latency per authenticated request, with and without the user cache.
+
+Run from the Backend directory:
+
+    python -m benchmarks.user_cache [--requests 500]
+
+Uses a throwaway SQLite database unless DATABASE_URL is set. Every
+statement sent on the sync or async engine is counted while the client
+repeatedly calls a few authenticated endpoints in three setups: no cache
+with a username-only token, no cache with the user id in the token, and
+a warm cache.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='planmytrip-bench-')}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+import argparse
+import logging
+import time
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import crud, models, schemas
+from app.database import Base, SessionLocal, engine, get_async_engine
+from app.deps import create_access_token
+from app.main import app
+from app.user_cache import USER_CACHE_TTL, user_cache
+
+ENDPOINTS = ("/profile", "/users/me/", "/itineraries/")
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def _seed() -> int:
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        user = models.User(username="bench", email="bench@example.com", hashed_password="unused")
+        db.add(user)
+        db.commit()
+        itinerary = schemas.ItineraryCreate(destination="Lisbon", start_date=date(2025, 5, 1), end_date=date(2025, 5, 3))
+        for _ in range(5):
+            crud.create_user_itinerary(db, itinerary, user.id, content="Day 1: Alfama.")
+        return user.id
+    finally:
+        db.close()
+
+
+def _run(client: TestClient, counter: StatementCounter, headers: dict, requests: int):
+    for endpoint in ENDPOINTS:
+        # Warms the cache and the connection pools
+        client.get(endpoint, headers=headers).raise_for_status()
+    counter.count = 0
+    started = time.perf_counter()
+    for i in range(requests):
+        client.get(ENDPOINTS[i % len(ENDPOINTS)], headers=headers).raise_for_status()
+    return counter.count / requests, (time.perf_counter() - started) * 1000 / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    # The test client logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    user_id = _seed()
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    event.listen(get_async_engine().sync_engine, "before_cursor_execute", counter)
+
+    setups = (
+        ("no cache, username in token", 0, None),
+        ("no cache, user id in token", 0, user_id),
+        ("cache, user id in token", USER_CACHE_TTL or 30, user_id),
+    )
+    with TestClient(app) as client:
+        print(f"{args.requests} requests over {', '.join(ENDPOINTS)}")
+        for name, ttl, token_user_id in setups:
+            user_cache.ttl = ttl
+            user_cache.invalidate("bench")
+            token = create_access_token(data={"sub": "bench"}, user_id=token_user_id)
+            queries, latency = _run(client, counter, {"Authorization": f"Bearer {token}"}, args.requests)
+            print(f"{name:30s} {queries:5.2f} queries/request  {latency:6.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
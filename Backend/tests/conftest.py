@@ -0,0 +1,118 @@
+import os
+import tempfile
+
+# Settings are read when the app modules are imported, so the test
+# environment has to be in place first. External APIs point at a closed
+# port; tests that need them serve stubs or patch the fetchers.
+_tmp = tempfile.mkdtemp(prefix="planmytrip-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_tmp}/test.db",
+    SECRET_KEY="test-secret",
+    ALGORITHM="HS256",
+    LLM_PROVIDER="fake",
+    FAKE_LLM_TOKEN_RATE="0",
+    BCRYPT_ROUNDS="4",
+    PASSWORD_HASH_WORKERS="1",
+    PDF_STORAGE_PATH=f"{_tmp}/pdfs",
+    ITINERARY_CACHE_BACKEND="db",
+    USER_CACHE_TTL="0",
+    HTTP_RETRIES="0",
+    HTTP_TIMEOUT="1",
+    NOMINATIM_URL="http://127.0.0.1:9/search",
+    WIKIPEDIA_API_URL="http://127.0.0.1:9/w/api.php",
+    OPEN_METEO_URL="http://127.0.0.1:9/v1/forecast",
+    OPEN_METEO_ARCHIVE_URL="http://127.0.0.1:9/v1/archive",
+)
+
+import time
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import search  # noqa: F401  registers the SQLite FTS table
+from app.database import Base, SessionLocal, engine, get_async_engine
+from app.geocache import geocode_cache
+from app.forecast import forecast_cache
+from app.main import app
+
+# The app resumes pending jobs on startup, before any test resets the schema
+Base.metadata.create_all(engine)
+
+
+@pytest.fixture(autouse=True)
+def schema():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    geocode_cache.clear()
+    forecast_cache.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    # One client for the session: shutting the app down stops its worker pools
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    def make(username: str = "alice"):
+        response = client.post(
+            "/register", json={"username": username, "email": f"{username}@example.com", "password": "secret"}
+        )
+        assert response.status_code == 200, response.text
+        token = client.post("/token", data={"username": username, "password": "secret"}).json()["access_token"]
+        return response.json()["id"], {"Authorization": f"Bearer {token}"}
+    return make
+
+
+@pytest.fixture
+def auth_headers(make_user):
+    return make_user()[1]
+
+
+@pytest.fixture
+def wait_for_job(client):
+    def wait(job_id: str, headers: dict, timeout: float = 10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = client.get(f"/jobs/{job_id}", headers=headers).json()
+            if job["status"] in ("succeeded", "failed"):
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"Job {job_id} did not finish")
+    return wait
+
+
+@pytest.fixture
+def count_queries():
+    """Counts statements sent on the sync and async engines while the block runs."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    @contextmanager
+    def count():
+        engines = (engine, get_async_engine().sync_engine)
+        for target in engines:
+            event.listen(target, "before_cursor_execute", record)
+        statements.clear()
+        try:
+            yield statements
+        finally:
+            for target in engines:
+                event.remove(target, "before_cursor_execute", record)
+    return count
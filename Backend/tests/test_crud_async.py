@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app import crud, schemas
+from app.database import AsyncSessionLocal, dispose_async_engine
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def adb():
+    async with AsyncSessionLocal() as session:
+        yield session
+    # Pooled aiosqlite connections belong to this test's event loop
+    await dispose_async_engine()
+
+
+def _user(username="alice"):
+    return schemas.UserCreate(username=username, email=f"{username}@example.com", password="secret")
+
+
+def _itinerary(destination, **fields):
+    return schemas.ItineraryCreate(destination=destination, start_date=date(2025, 5, 1), end_date=date(2025, 5, 2), **fields)
+
+
+async def test_create_and_get_user(adb):
+    created = await crud.create_user_async(adb, _user(), "hash")
+
+    assert (await crud.get_user_by_username_async(adb, "alice")).id == created.id
+    assert (await crud.get_user_by_email_async(adb, "alice@example.com")).id == created.id
+    assert await crud.get_user_by_username_async(adb, "bob") is None
+
+
+async def test_ensure_user_available(adb):
+    await crud.create_user_async(adb, _user(), "hash")
+
+    await crud.ensure_user_available_async(adb, _user("bob"))
+    with pytest.raises(HTTPException, match="Username already registered"):
+        await crud.ensure_user_available_async(adb, _user())
+    with pytest.raises(HTTPException, match="Email already registered"):
+        await crud.ensure_user_available_async(
+            adb, schemas.UserCreate(username="alice2", email="alice@example.com", password="secret")
+        )
+
+
+async def test_create_user_reports_a_duplicate_that_raced_in(adb):
+    # Registration checks availability first; these skip it like a concurrent request would
+    await crud.create_user_async(adb, _user(), "hash")
+
+    with pytest.raises(HTTPException, match="Username already registered"):
+        await crud.create_user_async(adb, _user(), "hash")
+    with pytest.raises(HTTPException, match="Email already registered"):
+        await crud.create_user_async(
+            adb, schemas.UserCreate(username="alice2", email="alice@example.com", password="secret"), "hash"
+        )
+    assert (await crud.get_user_by_username_async(adb, "alice")).hashed_password == "hash"
+
+
+async def test_itineraries_by_user_pages_by_id(adb, db):
+    user = await crud.create_user_async(adb, _user(), "hash")
+    other = await crud.create_user_async(adb, _user("bob"), "hash")
+    ids = [crud.create_user_itinerary(db, _itinerary(city), user.id, content=city).id for city in ("Lisbon", "Porto", "Faro")]
+    crud.create_user_itinerary(db, _itinerary("Madrid"), other.id)
+
+    first_page = await crud.get_itineraries_by_user_async(adb, user.id, limit=2)
+    assert [itinerary.id for itinerary in first_page] == ids[:2]
+    second_page = await crud.get_itineraries_by_user_async(adb, user.id, after_id=ids[1], limit=2)
+    assert [itinerary.id for itinerary in second_page] == ids[2:]
+
+
+async def test_search_itineraries(adb, db):
+    user = await crud.create_user_async(adb, _user(), "hash")
+    louvre = crud.create_user_itinerary(db, _itinerary("Paris"), user.id, content="Day 1: The Louvre.").id
+    crud.create_user_itinerary(db, _itinerary("Rome"), user.id, content="Day 1: The Colosseum.")
+
+    results = await crud.search_itineraries_async(adb, user.id, q="louvre")
+
+    assert [itinerary.id for itinerary in results] == [louvre]
+
+
+async def test_get_itinerary_and_days(adb, db):
+    user = await crud.create_user_async(adb, _user(), "hash")
+    days = [schemas.ItineraryDayBase(day_number=n, title=f"Day {n}") for n in (2, 1)]
+    itinerary_id = crud.create_user_itinerary(db, _itinerary("Lisbon"), user.id, content="Lisbon", days=days).id
+
+    assert (await crud.get_itinerary_async(adb, itinerary_id)).destination == "Lisbon"
+    assert [day.day_number for day in await crud.get_itinerary_days_async(adb, itinerary_id)] == [1, 2]
+    assert await crud.get_itinerary_async(adb, itinerary_id + 1) is None
+
+
+async def test_get_trip_and_generation_job(adb, db):
+    user = await crud.create_user_async(adb, _user(), "hash")
+    trip = schemas.TripCreate(legs=[
+        schemas.TripLegCreate(destination="Lisbon", start_date=date(2025, 5, 1), end_date=date(2025, 5, 2)),
+        schemas.TripLegCreate(destination="Porto", start_date=date(2025, 5, 2), end_date=date(2025, 5, 3)),
+    ])
+    db_job = crud.create_trip_job(db, "trip-job", trip, user.id)
+    itinerary_job = crud.create_generation_job(db, "itinerary-job", _itinerary("Faro"), user.id)
+
+    db_trip = await crud.get_trip_async(adb, db_job.trip_id)
+    assert db_trip.owner_id == user.id
+    assert (await crud.get_generation_job_async(adb, "trip-job")).trip_id == db_trip.id
+    assert (await crud.get_generation_job_async(adb, itinerary_job.id)).itinerary is None
+    assert await crud.get_generation_job_async(adb, "missing") is None
@@ -0,0 +1,5 @@
+def test_db_pool_metrics_require_a_login(client, auth_headers):
+    assert client.get("/metrics/db-pool").status_code == 401
+    response = client.get("/metrics/db-pool", headers=auth_headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"sync", "async"}
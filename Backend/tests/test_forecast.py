@@ -0,0 +1,86 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+from app import forecast
+from app.forecast import ForecastCache
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+# The forecast fixture was issued on this day and covers the 16 days from it
+TODAY = date(2025, 6, 1)
+LAT, LON = 38.72, -9.14
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+@pytest.fixture
+def open_meteo(monkeypatch):
+    """Serves the recorded Open-Meteo responses, trimmed to the requested dates like the API does."""
+    responses = {}
+    for url, name in ((forecast.OPEN_METEO_URL, "open_meteo_forecast.json"), (forecast.OPEN_METEO_ARCHIVE_URL, "open_meteo_archive.json")):
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            responses[url] = json.load(f)
+    requests = []
+
+    def get(url, params=None, **kwargs):
+        requests.append((url, params["start_date"], params["end_date"]))
+        data = responses[url]
+        daily = data["daily"]
+        keep = [i for i, day in enumerate(daily["time"]) if params["start_date"] <= day <= params["end_date"]]
+        return FakeResponse({**data, "daily": {name: [values[i] for i in keep] for name, values in daily.items()}})
+
+    monkeypatch.setattr(forecast.http_client, "get", get)
+    return requests
+
+
+def _daily(start_date: date, end_date: date):
+    return ForecastCache().get_daily(LAT, LON, start_date, end_date, today=TODAY)
+
+
+def test_days_within_the_horizon_are_forecast_and_later_days_typical(open_meteo):
+    days = _daily(date(2025, 6, 14), date(2025, 6, 18))
+
+    assert [(day["date"], day["basis"]) for day in days] == [
+        ("2025-06-14", "forecast"),
+        ("2025-06-15", "forecast"),
+        ("2025-06-16", "forecast"),
+        ("2025-06-17", "typical"),
+        ("2025-06-18", "typical"),
+    ]
+    # Typical days carry the recorded weather of the same date a year earlier
+    assert days[3]["temperature_2m_max"] == 30.0 and days[3]["weathercode"] == 61
+    assert days[0]["temperature_2m_max"] == 30.5 and days[0]["weathercode"] == 3
+    assert open_meteo == [
+        (forecast.OPEN_METEO_URL, "2025-06-14", "2025-06-16"),
+        (forecast.OPEN_METEO_ARCHIVE_URL, "2024-06-17", "2024-06-18"),
+    ]
+
+
+@pytest.mark.parametrize("day, basis, url", [
+    (date(2025, 6, 16), "forecast", forecast.OPEN_METEO_URL),
+    # One past the last day the forecast covers
+    (date(2025, 6, 17), "typical", forecast.OPEN_METEO_ARCHIVE_URL),
+])
+def test_forecast_horizon_edge(open_meteo, day, basis, url):
+    days = _daily(day, day)
+
+    assert [(d["date"], d["basis"]) for d in days] == [(day.isoformat(), basis)]
+    assert [request[0] for request in open_meteo] == [url]
+
+
+def test_past_days_use_recorded_weather(open_meteo):
+    days = _daily(date(2025, 5, 20), date(2025, 5, 21))
+
+    assert [(day["date"], day["basis"]) for day in days] == [("2025-05-20", "recorded"), ("2025-05-21", "recorded")]
+    assert open_meteo == [(forecast.OPEN_METEO_ARCHIVE_URL, "2025-05-20", "2025-05-21")]
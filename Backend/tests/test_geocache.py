@@ -0,0 +1,95 @@
+import threading
+import time
+
+from app.geocache import GeocodeCache
+
+LISBON = ("38.7077507", "-9.1365919")
+
+
+class Geocoder:
+    """Counts upstream lookups; blocks until released when ``gate`` is set."""
+
+    def __init__(self, result=LISBON, gate: threading.Event = None):
+        self.result = result
+        self.gate = gate
+        self.calls = []
+
+    def __call__(self, city: str):
+        self.calls.append(city)
+        if self.gate is not None:
+            self.gate.wait(5)
+        return self.result
+
+
+def test_second_lookup_is_a_hit():
+    cache = GeocodeCache(persist=False)
+    geocoder = Geocoder()
+
+    assert cache.get_or_fetch("Lisbon", geocoder) == LISBON
+    # Keys ignore case and surrounding whitespace
+    assert cache.get_or_fetch("  lisbon ", geocoder) == LISBON
+
+    assert geocoder.calls == ["Lisbon"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_concurrent_lookups_of_a_city_are_coalesced():
+    cache = GeocodeCache(persist=False)
+    gate = threading.Event()
+    geocoder = Geocoder(gate=gate)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("Lisbon", geocoder))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert geocoder.calls == ["Lisbon"]
+    assert results == [LISBON] * 5
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_not_found_results_are_not_cached():
+    cache = GeocodeCache(persist=False)
+    geocoder = Geocoder(result=(None, None))
+
+    assert cache.get_or_fetch("Atlantis", geocoder) == (None, None)
+    assert cache.get_or_fetch("Atlantis", geocoder) == (None, None)
+
+    # A failed or empty lookup is retried rather than remembered
+    assert geocoder.calls == ["Atlantis", "Atlantis"]
+    assert cache.stats()["size"] == 0
+
+
+def test_expired_entries_are_fetched_again():
+    cache = GeocodeCache(ttl=0, persist=False)
+    geocoder = Geocoder()
+
+    cache.get_or_fetch("Lisbon", geocoder)
+    cache.get_or_fetch("Lisbon", geocoder)
+
+    assert geocoder.calls == ["Lisbon", "Lisbon"]
+
+
+def test_persistent_tier_survives_a_restart():
+    geocoder = Geocoder()
+    GeocodeCache(persist=True).get_or_fetch("Lisbon", geocoder)
+
+    # A new process starts with an empty memory tier
+    restarted = GeocodeCache(persist=True)
+    assert restarted.get_or_fetch("Lisbon", geocoder) == LISBON
+
+    assert geocoder.calls == ["Lisbon"]
+    assert restarted.stats()["persistent_hits"] == 1
+
+
+def test_cache_metrics_require_a_login(client, auth_headers):
+    assert client.get("/metrics/caches").status_code == 401
+    response = client.get("/metrics/caches", headers=auth_headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"geocode", "forecast", "poi", "itinerary", "user"}
@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app import agent, forecast, poi
+from app.agent import AIAgent
+from app.http_client import async_http_client, http_client
+
+STUB_DELAY = 0.3
+
+
+class StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+def _reply(path: str, query: dict):
+    if path == "/search":
+        return [{"lat": "38.72", "lon": "-9.14"}]
+    if path == "/w/api.php" and query.get("list") == "geosearch":
+        return {"query": {"geosearch": [
+            {"pageid": 1, "title": "Belem Tower", "lat": 38.69, "lon": -9.21, "dist": 6000},
+            {"pageid": 2, "title": "Alfama", "lat": 38.71, "lon": -9.13, "dist": 900},
+        ]}}
+    if path == "/w/api.php":
+        return {"query": {"pages": [{"pageid": 1, "extract": "A tower."}, {"pageid": 2, "extract": "A district."}]}}
+    if path == "/v1/forecast":
+        start, end = date.fromisoformat(query["start_date"]), date.fromisoformat(query["end_date"])
+        days = [date.fromordinal(n).isoformat() for n in range(start.toordinal(), end.toordinal() + 1)]
+        return {"daily": {
+            "time": days,
+            "weathercode": [0] * len(days),
+            "temperature_2m_max": [22.0] * len(days),
+            "temperature_2m_min": [14.0] * len(days),
+            "precipitation_sum": [0.0] * len(days),
+        }}
+    return None
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """Local stand-in for the geocoder, Wikipedia and Open-Meteo with keep-alive connections."""
+    state = StubState()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            with state.lock:
+                state.connections.add(self.client_address)
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            if url.path != "/search":
+                time.sleep(STUB_DELAY)
+            with state.lock:
+                state.in_flight -= 1
+            body = json.dumps(_reply(url.path, query)).encode()
+            self.send_response(200 if body != b"null" else 404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(agent, "NOMINATIM_URL", f"{base}/search")
+    monkeypatch.setattr(poi, "WIKIPEDIA_API_URL", f"{base}/w/api.php")
+    monkeypatch.setattr(forecast, "OPEN_METEO_URL", f"{base}/v1/forecast")
+    yield base, state
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(stub_server):
+    base, state = stub_server
+    for _ in range(5):
+        assert http_client.get(f"{base}/search", params={"city": "Lisbon"}).status_code == 200
+
+    assert len(state.connections) == 1
+
+
+def test_gather_city_context_fetches_places_and_weather_concurrently(stub_server):
+    _, state = stub_server
+    today = date.today()
+
+    context = AIAgent.gather_city_context("Lisbon", today, today)
+
+    assert context["places"] == ["Alfama", "Belem Tower"]
+    assert "Clear" in context["forecast"]
+    # The forecast request overlaps the Wikipedia requests
+    assert state.max_in_flight >= 2
+
+
+def test_gather_city_context_without_coordinates(monkeypatch):
+    monkeypatch.setattr(AIAgent, "_get_city_coords", staticmethod(lambda city: (None, None)))
+
+    assert AIAgent.gather_city_context("Atlantis", date(2025, 1, 1), date(2025, 1, 2)) == {"places": [], "forecast": ""}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_async_client_reuses_connections(stub_server):
+    base, state = stub_server
+    try:
+        for _ in range(5):
+            assert (await async_http_client.get(f"{base}/search", params={"city": "Lisbon"})).status_code == 200
+    finally:
+        # The pooled connections belong to this test's event loop
+        await async_http_client.aclose()
+
+    assert len(state.connections) == 1
+
+
+@pytest.mark.anyio
+async def test_agather_city_context_fetches_places_and_weather_concurrently(stub_server):
+    _, state = stub_server
+    today = date.today()
+    try:
+        context = await AIAgent.agather_city_context("Lisbon", today, today)
+    finally:
+        await async_http_client.aclose()
+
+    assert context == AIAgent.gather_city_context("Lisbon", today, today)
+    assert context["places"] == ["Alfama", "Belem Tower"]
+    assert "Clear" in context["forecast"]
+    assert state.max_in_flight >= 2
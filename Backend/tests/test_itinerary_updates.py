@@ -0,0 +1,122 @@
+import json
+from datetime import date
+
+from app import crud, schemas
+from app.agent import AIAgent
+from app.fake_llm import FakeStreamingChatModel
+from app.result_cache import result_cache
+
+TRIP = schemas.ItineraryCreate(destination="Lisbon", start_date=date(2025, 5, 1), end_date=date(2025, 5, 3), structured=True)
+
+
+def _structured(db, user_id, day_numbers=(1, 2, 3)):
+    days = [
+        schemas.ItineraryDayBase(day_number=n, title=f"Original day {n}", activities=[{"title": f"Stop {n}"}])
+        for n in day_numbers
+    ]
+    return crud.create_user_itinerary(db, TRIP, user_id, content="Original.", days=days).id
+
+
+def _titles(client, headers, itinerary_id):
+    return [day["title"] for day in client.get(f"/itineraries/{itinerary_id}/days", headers=headers).json()]
+
+
+def test_regenerate_day_runs_as_a_job(client, db, make_user, wait_for_job):
+    user_id, headers = make_user()
+    itinerary_id = _structured(db, user_id)
+
+    response = client.post(f"/itineraries/{itinerary_id}/days/2/regenerate", headers=headers)
+
+    assert response.status_code == 202, response.text
+    assert response.json()["kind"] == "day"
+    job = wait_for_job(response.json()["id"], headers)
+    assert job["status"] == "succeeded", job
+    assert job["itinerary"]["id"] == itinerary_id
+    titles = _titles(client, headers, itinerary_id)
+    assert titles[0] == "Original day 1" and titles[2] == "Original day 3"
+    assert titles[1].startswith("Day 2 highlights")
+    assert job["itinerary"]["content"] != "Original."
+
+
+def test_regenerate_day_failure_marks_the_job_failed(client, db, make_user, wait_for_job, monkeypatch):
+    user_id, headers = make_user()
+    itinerary_id = _structured(db, user_id)
+
+    def regenerate_day(self, *args, **kwargs):
+        raise ValueError("LLM reply was not valid JSON")
+
+    monkeypatch.setattr(AIAgent, "regenerate_day", regenerate_day)
+    response = client.post(f"/itineraries/{itinerary_id}/days/1/regenerate", headers=headers)
+
+    job = wait_for_job(response.json()["id"], headers)
+    assert job["status"] == "failed"
+    assert "not valid JSON" in job["error"]
+    assert _titles(client, headers, itinerary_id) == ["Original day 1", "Original day 2", "Original day 3"]
+
+
+def test_regenerate_day_rejects_unknown_days(client, db, make_user):
+    user_id, headers = make_user()
+    itinerary_id = _structured(db, user_id)
+    plain = crud.create_user_itinerary(db, TRIP, user_id, content="Plain text.").id
+
+    assert client.post(f"/itineraries/{itinerary_id}/days/4/regenerate", headers=headers).status_code == 404
+    assert client.post(f"/itineraries/{plain}/days/1/regenerate", headers=headers).status_code == 404
+
+
+def _refine(client, headers, itinerary_id, body, wait_for_job):
+    response = client.patch(f"/itineraries/{itinerary_id}/refine", json=body, headers=headers)
+    assert response.status_code == 202, response.text
+    assert response.json()["kind"] == "refine"
+    return wait_for_job(response.json()["id"], headers)
+
+
+def test_refine_runs_as_a_job(client, db, make_user, wait_for_job):
+    user_id, headers = make_user()
+    itinerary_id = crud.create_user_itinerary(db, TRIP, user_id, content="Day 1: Alfama.").id
+
+    job = _refine(client, headers, itinerary_id, {"budget": "Luxury", "pace": None}, wait_for_job)
+
+    assert job["status"] == "succeeded", job
+    itinerary = client.get(f"/itineraries/{itinerary_id}", headers=headers).json()
+    assert itinerary["budget"] == "Luxury"
+    assert "Revised for: Budget Level: Luxury No longer required: Pace Preference" in itinerary["content"]
+
+
+def test_structured_refine_rejects_a_short_reply(client, db, make_user, wait_for_job, monkeypatch):
+    user_id, headers = make_user()
+    itinerary_id = _structured(db, user_id)
+    reply = {"days": [{"day_number": 1, "title": "Only day", "activities": []}]}
+    monkeypatch.setattr(FakeStreamingChatModel, "_reply", lambda self, messages: json.dumps(reply))
+
+    job = _refine(client, headers, itinerary_id, {"budget": "Luxury"}, wait_for_job)
+
+    assert job["status"] == "failed"
+    assert "1 days, expected 3" in job["error"]
+    assert _titles(client, headers, itinerary_id) == ["Original day 1", "Original day 2", "Original day 3"]
+    assert client.get(f"/itineraries/{itinerary_id}", headers=headers).json()["budget"] is None
+
+
+def test_structured_refine_adds_missing_day_records(client, db, make_user, wait_for_job):
+    user_id, headers = make_user()
+    itinerary_id = _structured(db, user_id, day_numbers=(1, 2))
+
+    job = _refine(client, headers, itinerary_id, {"pace": "Relaxed"}, wait_for_job)
+
+    assert job["status"] == "succeeded", job
+    assert _titles(client, headers, itinerary_id) == ["Day 1 highlights", "Day 2 highlights", "Day 3 highlights"]
+
+
+def test_structured_create_rejects_a_short_reply(client, db, make_user, wait_for_job, monkeypatch):
+    _, headers = make_user()
+    reply = {"days": [{"day_number": 1, "title": "Only day", "activities": []}]}
+    monkeypatch.setattr(FakeStreamingChatModel, "_reply", lambda self, messages: json.dumps(reply))
+    body = json.loads(TRIP.json())
+
+    response = client.post("/itineraries/", json=body, headers=headers)
+
+    assert response.status_code == 202, response.text
+    job = wait_for_job(response.json()["id"], headers)
+    assert job["status"] == "failed"
+    assert "1 days, expected 3" in job["error"]
+    assert client.get("/itineraries/", headers=headers).json() == []
+    assert result_cache.get(TRIP) is None
@@ -0,0 +1,198 @@
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app import crud, jobs, models, schemas
+
+REQUEST = schemas.ItineraryCreate(destination="Lisbon", start_date=date(2025, 4, 1), end_date=date(2025, 4, 2))
+
+
+def _job(db, user_id, **fields):
+    db_job = crud.create_generation_job(db, f"job-{time.monotonic_ns()}", REQUEST, user_id)
+    return crud.update_generation_job(db, db_job, **fields) if fields else db_job
+
+
+def test_two_workers_run_a_job_once(db, make_user, monkeypatch):
+    user_id, _ = make_user()
+    calls = []
+    started = threading.Barrier(2)
+
+    def generate(itinerary):
+        calls.append(itinerary)
+        time.sleep(0.2)
+        return "Day 1: Tram 28.", None
+
+    def run(job_id):
+        started.wait()
+        jobs.run_generation_job(job_id)
+
+    monkeypatch.setattr(jobs, "generate", generate)
+    job_id = _job(db, user_id).id
+    workers = [threading.Thread(target=run, args=(job_id,)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    db.expire_all()
+    assert len(calls) == 1
+    assert crud.get_generation_job(db, job_id).status == "succeeded"
+    assert db.query(models.Itinerary).count() == 1
+
+
+def test_claim_skips_running_and_finished_jobs(db, make_user):
+    user_id, _ = make_user()
+    stale_before = datetime.now(timezone.utc) - timedelta(minutes=15)
+    queued = _job(db, user_id)
+    running = _job(db, user_id, status="running")
+    finished = _job(db, user_id, status="succeeded")
+
+    assert crud.claim_generation_job(db, queued.id, stale_before)
+    assert not crud.claim_generation_job(db, queued.id, stale_before)
+    assert not crud.claim_generation_job(db, running.id, stale_before)
+    assert not crud.claim_generation_job(db, finished.id, stale_before)
+
+
+def test_resume_pending_only_takes_over_stale_running_jobs(db, make_user, monkeypatch):
+    user_id, _ = make_user()
+    queued = _job(db, user_id)
+    running = _job(db, user_id, status="running")
+    stale = _job(db, user_id, status="running")
+    _job(db, user_id, status="failed")
+    db.query(models.GenerationJob).filter(models.GenerationJob.id == stale.id).update(
+        {"updated_at": datetime.now(timezone.utc) - timedelta(seconds=jobs.JOB_LEASE_SECONDS + 60)}
+    )
+    db.commit()
+
+    submitted = []
+    monkeypatch.setattr(jobs.job_queue, "_submit", lambda job_id: (submitted.append(job_id), jobs.job_queue.slots.release()))
+    jobs.job_queue.resume_pending()
+
+    assert sorted(submitted) == sorted([queued.id, stale.id])
+    assert running.id not in submitted
+
+
+def test_failed_trip_leg_deletes_the_trip(client, make_user, wait_for_job, monkeypatch):
+    _, headers = make_user()
+    generate_leg = jobs._generate_leg
+
+    def fail_in_porto(itinerary):
+        if itinerary.destination == "Porto":
+            raise RuntimeError("Injected LLM failure")
+        return generate_leg(itinerary)
+
+    monkeypatch.setattr(jobs, "_generate_leg", fail_in_porto)
+    response = client.post("/trips/", headers=headers, json={"legs": [
+        {"destination": "Lisbon", "start_date": "2025-05-01", "end_date": "2025-05-03"},
+        {"destination": "Porto", "start_date": "2025-05-03", "end_date": "2025-05-05"},
+    ]})
+    assert response.status_code == 202, response.text
+    trip_id = response.json()["trip_id"]
+
+    job = wait_for_job(response.json()["id"], headers)
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Injected LLM failure"
+    assert job["trip_id"] is None
+    assert client.get(f"/trips/{trip_id}", headers=headers).status_code == 404
+    assert client.get("/itineraries/", headers=headers).json() == []
+
+
+def test_full_queue_returns_503(client, make_user, monkeypatch):
+    _, headers = make_user()
+
+    def enqueue(*args, **kwargs):
+        raise jobs.JobQueueFull()
+
+    monkeypatch.setattr(jobs.job_queue, "enqueue", enqueue)
+    response = client.post("/itineraries/", headers=headers, json={
+        "destination": "Lisbon", "start_date": "2025-05-01", "end_date": "2025-05-02", "bypass_cache": True,
+    })
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def _batch_item(destination, **options):
+    return {"destination": destination, "start_date": "2025-05-01", "end_date": "2025-05-02", "bypass_cache": True, **options}
+
+
+def test_batch_dedupes_identical_items(client, make_user, wait_for_job, db):
+    _, headers = make_user()
+    lisbon = _batch_item("Lisbon")
+
+    response = client.post("/itineraries/batch", headers=headers, json=[lisbon, _batch_item("Porto"), lisbon])
+
+    assert response.status_code == 202, response.text
+    ids = [job["id"] for job in response.json()]
+    assert ids[0] == ids[2] and ids[0] != ids[1]
+    finished = [wait_for_job(job_id, headers) for job_id in ids]
+    assert [job["status"] for job in finished] == ["succeeded"] * 3
+    assert [job["itinerary"]["destination"] for job in finished] == ["Lisbon", "Porto", "Lisbon"]
+    assert db.query(models.GenerationJob).count() == 2
+    assert db.query(models.Itinerary).count() == 2
+
+
+def test_batch_serves_cached_items_without_a_queue_slot(client, make_user, db, monkeypatch):
+    _, headers = make_user()
+    cached = _batch_item("Lisbon", bypass_cache=False)
+    jobs.result_cache.set(schemas.ItineraryCreate(**cached), "Day 1: Tram 28.")
+    monkeypatch.setattr(jobs.job_queue, "slots", threading.BoundedSemaphore(1))
+
+    response = client.post("/itineraries/batch", headers=headers, json=[cached, _batch_item("Porto")])
+
+    assert response.status_code == 202, response.text
+    hit, queued = response.json()
+    assert hit["status"] == "succeeded"
+    assert hit["itinerary"]["content"] == "Day 1: Tram 28."
+    assert queued["status"] in ("queued", "running", "succeeded")
+
+
+def test_batch_that_only_partly_fits_the_queue_returns_503(client, make_user, db, monkeypatch):
+    _, headers = make_user()
+    slots = threading.BoundedSemaphore(2)
+    monkeypatch.setattr(jobs.job_queue, "slots", slots)
+
+    response = client.post("/itineraries/batch", headers=headers, json=[
+        _batch_item("Lisbon"), _batch_item("Porto"), _batch_item("Faro"), _batch_item("Lisbon"),
+    ])
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert db.query(models.GenerationJob).count() == 0
+    # The two slots taken before the queue ran out are given back
+    assert slots.acquire(blocking=False) and slots.acquire(blocking=False)
+
+
+def test_enqueue_batch_releases_slots_when_the_insert_fails(db, make_user, monkeypatch):
+    user_id, _ = make_user()
+    queue = jobs.JobQueue(workers=1, queue_size=2)
+    submitted = []
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("Injected insert failure")
+
+    monkeypatch.setattr(queue, "_submit", submitted.append)
+    monkeypatch.setattr(jobs.crud, "create_generation_job_batch", fail)
+    requests = [schemas.ItineraryCreate(**_batch_item(city)) for city in ("Lisbon", "Porto")]
+    with pytest.raises(RuntimeError, match="Injected insert failure"):
+        queue.enqueue_batch(db, requests, user_id)
+
+    assert submitted == []
+    assert all(queue.slots.acquire(blocking=False) for _ in range(3))
+    queue.shutdown()
+
+
+def test_enqueue_batch_is_all_or_nothing_when_slots_run_out(db, make_user):
+    user_id, _ = make_user()
+    queue = jobs.JobQueue(workers=1, queue_size=2)
+    requests = [schemas.ItineraryCreate(**_batch_item(city)) for city in ("Lisbon", "Porto", "Faro", "Braga")]
+
+    with pytest.raises(jobs.JobQueueFull):
+        queue.enqueue_batch(db, requests, user_id)
+
+    assert db.query(models.GenerationJob).count() == 0
+    assert all(queue.slots.acquire(blocking=False) for _ in range(3))
+    queue.shutdown()
@@ -0,0 +1,80 @@
+from datetime import date
+
+from app import crud, schemas
+
+TRIP = schemas.ItineraryCreate(destination="Lisbon", start_date=date(2025, 5, 1), end_date=date(2025, 5, 3))
+
+
+def _add(db, user_id, count, content="Day 1: Alfama."):
+    return [crud.create_user_itinerary(db, TRIP, user_id, content=content).id for _ in range(count)]
+
+
+def _pages(client, headers, limit):
+    """Follow X-Next-Cursor from the first page to the last, returning the ids of each page."""
+    pages, params = [], {"limit": limit}
+    while True:
+        response = client.get("/itineraries/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([itinerary["id"] for itinerary in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        params = {"limit": limit, "after": cursor}
+
+
+def test_cursor_walks_every_itinerary_once(client, db, make_user):
+    user_id, headers = make_user()
+    # Identical rows: only the id tells them apart
+    ids = _add(db, user_id, 7)
+
+    pages = _pages(client, headers, limit=3)
+
+    assert pages == [ids[0:3], ids[3:6], ids[6:7]]
+
+
+def test_a_full_last_page_is_followed_by_an_empty_one(client, db, make_user):
+    user_id, headers = make_user()
+    ids = _add(db, user_id, 4)
+
+    assert _pages(client, headers, limit=2) == [ids[0:2], ids[2:4], []]
+
+
+def test_pages_only_hold_the_users_own_itineraries(client, db, make_user):
+    user_id, headers = make_user("alice")
+    other_id, _ = make_user("bob")
+    mine = []
+    for _ in range(3):
+        mine += _add(db, user_id, 1)
+        _add(db, other_id, 1)
+
+    assert _pages(client, headers, limit=2) == [mine[0:2], mine[2:3]]
+
+
+def test_cursor_survives_the_deletion_of_its_itinerary(client, db, make_user):
+    user_id, headers = make_user()
+    ids = _add(db, user_id, 4)
+    first = client.get("/itineraries/", params={"limit": 2}, headers=headers)
+    cursor = first.headers["X-Next-Cursor"]
+    assert cursor == str(ids[1])
+
+    db.delete(crud.get_itinerary(db, ids[1]))
+    db.commit()
+
+    response = client.get("/itineraries/", params={"limit": 2, "after": cursor}, headers=headers)
+    assert [itinerary["id"] for itinerary in response.json()] == ids[2:4]
+
+
+def test_list_items_are_summaries(client, db, make_user):
+    user_id, headers = make_user()
+    _add(db, user_id, 1, content="Day 1: A long day in Alfama.")
+
+    item = client.get("/itineraries/", headers=headers).json()[0]
+
+    assert "content" not in item
+    assert item["destination"] == "Lisbon"
+
+
+def test_malformed_cursors_and_limits_are_rejected(client, auth_headers):
+    for params in ({"after": "abc"}, {"after": "1.5"}, {"limit": 0}, {"limit": 101}):
+        response = client.get("/itineraries/", params=params, headers=auth_headers)
+        assert response.status_code == 422, params
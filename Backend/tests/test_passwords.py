@@ -0,0 +1,64 @@
+import threading
+
+from passlib.context import CryptContext
+
+from app import models, passwords
+from app.passwords import password_hasher
+
+
+def _login(client, username="alice", password="secret"):
+    return client.post("/token", data={"username": username, "password": password})
+
+
+def _stored_hash(db, user_id):
+    db.expire_all()
+    return db.get(models.User, user_id).hashed_password
+
+
+def test_login_rehashes_a_password_with_another_cost(client, db, make_user):
+    user_id, _ = make_user()
+    # Stored when BCRYPT_ROUNDS was higher than the suite's 4
+    db.get(models.User, user_id).hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("secret")
+    db.commit()
+
+    assert _login(client).status_code == 200
+    rehashed = _stored_hash(db, user_id)
+    assert rehashed.startswith("$2b$04$")
+
+    assert _login(client).status_code == 200
+    assert _stored_hash(db, user_id) == rehashed
+
+
+def test_failed_login_keeps_the_stored_hash(client, db, make_user):
+    user_id, _ = make_user()
+    stored = _stored_hash(db, user_id)
+
+    assert _login(client, password="wrong").status_code == 401
+    assert _stored_hash(db, user_id) == stored
+
+
+def test_argon2_schemes_accept_and_upgrade_bcrypt_hashes(monkeypatch):
+    bcrypt_hash = passwords.build_context().hash("secret")
+    monkeypatch.setattr(passwords, "PASSWORD_SCHEMES", ["argon2", "bcrypt"])
+    context = passwords.build_context()
+
+    valid, new_hash = context.verify_and_update("secret", bcrypt_hash)
+
+    assert valid
+    assert new_hash.startswith("$argon2")
+    assert context.verify_and_update("secret", new_hash) == (True, None)
+    assert context.verify_and_update("wrong", bcrypt_hash) == (False, None)
+
+
+def test_busy_hasher_returns_503(client, make_user, monkeypatch):
+    make_user()
+    # No free slots, as if every worker and queue slot were taken
+    monkeypatch.setattr(password_hasher, "slots", threading.BoundedSemaphore(1))
+    password_hasher.slots.acquire()
+
+    response = _login(client)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    register = client.post("/register", json={"username": "bob", "email": "bob@example.com", "password": "secret"})
+    assert register.status_code == 503
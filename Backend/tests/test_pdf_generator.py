@@ -0,0 +1,130 @@
+import os
+import re
+from datetime import date
+
+from fpdf import FPDF
+
+from app import crud, schemas
+from app.pdf_generator import FONT_PATH, PDFGenerator, pdf_generator_instance, render_pdf
+
+TEXT = "Día 1: Café in São Paulo, €15 — Zürich → Kraków, Ελλάδα, Москва, 東京"
+
+
+def _render_with_add_font(content: str) -> bytes:
+    pdf = FPDF()
+    pdf.add_font("DejaVu", "", FONT_PATH)
+    pdf.add_page()
+    pdf.set_font("DejaVu", size=12)
+    pdf.multi_cell(0, 10, content)
+    return bytes(pdf.output())
+
+
+def _without_timestamp(data: bytes) -> bytes:
+    # The file /ID is derived from the creation date as well
+    return re.sub(rb"/CreationDate \(D:[^)]*\)|/ID \[<[0-9A-F]+><[0-9A-F]+>\]", b"", data)
+
+
+def test_preloaded_font_renders_like_add_font():
+    # Guards the preloaded font copy, which relies on fpdf2 internals
+    assert _without_timestamp(render_pdf(TEXT)) == _without_timestamp(_render_with_add_font(TEXT))
+
+
+def test_documents_do_not_share_font_subsets():
+    first = render_pdf(TEXT)
+    render_pdf("Ærøskøbing, Þingvellir, Ōsaka")
+
+    assert _without_timestamp(render_pdf(TEXT)) == _without_timestamp(first)
+
+
+def _add(db, user_id, content):
+    itinerary = schemas.ItineraryCreate(destination="Lisbon", start_date=date(2025, 5, 1), end_date=date(2025, 5, 2))
+    return crud.create_user_itinerary(db, itinerary, user_id, content=content)
+
+
+def _download(client, headers, itinerary_id):
+    response = client.get(f"/itineraries/{itinerary_id}/download", headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _refine(client, wait_for_job, headers, itinerary_id):
+    response = client.patch(f"/itineraries/{itinerary_id}/refine", json={"budget": "Luxury"}, headers=headers)
+    assert response.status_code == 202, response.text
+    assert wait_for_job(response.json()["id"], headers)["status"] == "succeeded"
+
+
+def test_refine_removes_the_replaced_pdf(client, db, make_user, wait_for_job):
+    user_id, headers = make_user()
+    itinerary = _add(db, user_id, "Day 1: Alfama.")
+    old_path = pdf_generator_instance._path(itinerary.content_hash)
+    _download(client, headers, itinerary.id)
+    assert os.path.exists(old_path)
+
+    _refine(client, wait_for_job, headers, itinerary.id)
+
+    assert not os.path.exists(old_path)
+    _download(client, headers, itinerary.id)
+
+
+def test_refine_keeps_a_pdf_other_itineraries_share(client, db, make_user, wait_for_job):
+    user_id, headers = make_user()
+    itinerary = _add(db, user_id, "Day 1: Belem.")
+    _add(db, user_id, "Day 1: Belem.")
+    shared_path = pdf_generator_instance._path(itinerary.content_hash)
+    _download(client, headers, itinerary.id)
+
+    _refine(client, wait_for_job, headers, itinerary.id)
+
+    assert os.path.exists(shared_path)
+
+
+def test_download_serves_ranges_and_etags(client, db, make_user):
+    user_id, headers = make_user()
+    itinerary = _add(db, user_id, "Day 1: Sintra.")
+    full = _download(client, headers, itinerary.id)
+    etag = full.headers["ETag"]
+
+    partial = client.get(f"/itineraries/{itinerary.id}/download", headers={**headers, "Range": "bytes=0-3"})
+    assert partial.status_code == 206
+    assert partial.content == full.content[:4] == b"%PDF"
+    assert partial.headers["Content-Range"] == f"bytes 0-3/{len(full.content)}"
+    unsatisfiable = client.get(f"/itineraries/{itinerary.id}/download", headers={**headers, "Range": "bytes=999999-"})
+    assert unsatisfiable.status_code == 416
+    assert client.get(f"/itineraries/{itinerary.id}/download", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_download_survives_the_pdf_being_discarded_while_sent(client, db, make_user, monkeypatch):
+    user_id, headers = make_user()
+    itinerary = _add(db, user_id, "Day 1: Cascais.")
+    expected = _download(client, headers, itinerary.id).content
+    aopen_pdf = PDFGenerator.aopen_pdf
+
+    async def open_then_discard(self, content_hash, content):
+        # What a refine finishing mid-download does
+        f = await aopen_pdf(self, content_hash, content)
+        self.discard(content_hash)
+        return f
+
+    monkeypatch.setattr(PDFGenerator, "aopen_pdf", open_then_discard)
+
+    assert _download(client, headers, itinerary.id).content == expected
+    assert not os.path.exists(pdf_generator_instance._path(itinerary.content_hash))
+
+
+def test_download_renders_again_if_the_pdf_is_discarded_before_it_is_opened(client, db, make_user, monkeypatch):
+    user_id, headers = make_user()
+    itinerary = _add(db, user_id, "Day 1: Evora.")
+    aensure_pdf = PDFGenerator.aensure_pdf
+    calls = []
+
+    async def ensure_then_discard(self, content_hash, content):
+        path = await aensure_pdf(self, content_hash, content)
+        if not calls:
+            self.discard(content_hash)
+        calls.append(path)
+        return path
+
+    monkeypatch.setattr(PDFGenerator, "aensure_pdf", ensure_then_discard)
+
+    assert _download(client, headers, itinerary.id).content.startswith(b"%PDF")
+    assert len(calls) == 2
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from app import agent
+from app.agent import AIAgent
+from app.planner import STOPS_PER_DAY, balanced_kmeans, haversine_matrix, order_route, plan_days
+
+
+def _pois(count: int, seed: int = 0):
+    """Places scattered within about 5 km of central Lisbon, nearest the centre first."""
+    rng = np.random.default_rng(seed)
+    lat = 38.7223 + rng.uniform(-0.045, 0.045, count)
+    lon = -9.1393 + rng.uniform(-0.055, 0.055, count)
+    order = np.argsort(np.hypot(lat - 38.7223, lon + 9.1393))
+    return [{"title": f"Place {i}", "lat": float(lat[i]), "lon": float(lon[i])} for i in order]
+
+
+def _nearest_neighbour(dist: np.ndarray, start: int):
+    order, left = [start], set(range(len(dist))) - {start}
+    while left:
+        order.append(min(left, key=lambda j: dist[order[-1], j]))
+        left.discard(order[-1])
+    return order
+
+
+def _length(dist: np.ndarray, route) -> float:
+    return float(sum(dist[a, b] for a, b in zip(route, route[1:])))
+
+
+def test_haversine_distance_between_cities():
+    # Lisbon to Porto
+    dist = haversine_matrix(np.array([38.7223, 41.1579]), np.array([-9.1393, -8.6291]))
+
+    assert dist[0, 1] == pytest.approx(274, abs=2)
+    assert dist[0, 0] == 0 and dist[0, 1] == dist[1, 0]
+
+
+@pytest.mark.parametrize("n, k", [(23, 5), (12, 3), (40, 7)])
+def test_balanced_kmeans_respects_capacity(n, k):
+    points = np.random.default_rng(n).normal(size=(n, 2))
+    capacity = -(-n // k)
+
+    labels = balanced_kmeans(points, k, capacity)
+
+    assert len(labels) == n
+    assert labels.min() >= 0 and labels.max() < k
+    assert np.bincount(labels, minlength=k).max() <= capacity
+
+
+def test_balanced_kmeans_keeps_separate_groups_together():
+    centres = np.array([[0.0, 0.0], [50.0, 0.0], [0.0, 50.0]])
+    points = np.concatenate([centre + np.random.default_rng(i).normal(size=(4, 2)) for i, centre in enumerate(centres)])
+
+    labels = balanced_kmeans(points, 3, capacity=4)
+
+    assert sorted(len(set(labels[i:i + 4])) for i in range(0, 12, 4)) == [1, 1, 1]
+    assert len(set(labels)) == 3
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_two_opt_never_lengthens_the_nearest_neighbour_route(seed):
+    pois = _pois(12, seed)
+    dist = haversine_matrix(np.array([p["lat"] for p in pois]), np.array([p["lon"] for p in pois]))
+
+    route = order_route(dist, start=3)
+
+    assert route[0] == 3
+    assert sorted(route.tolist()) == list(range(12))
+    assert _length(dist, route) <= _length(dist, _nearest_neighbour(dist, 3)) + 1e-9
+
+
+def test_short_routes_are_nearest_neighbour_order():
+    dist = haversine_matrix(np.array([0.0, 0.0, 0.0]), np.array([0.0, 2.0, 1.0]))
+
+    assert order_route(dist).tolist() == [0, 2, 1]
+
+
+@pytest.mark.parametrize("pace", [None, "relaxed", "Packed"])
+def test_days_are_balanced_up_to_the_stops_for_the_pace(pace):
+    stops = STOPS_PER_DAY[pace.lower() if pace else None]
+    pois = _pois(100)
+
+    plan = plan_days(pois, 5, pace)
+
+    assert len(plan) == 5
+    assert [len(day) for day in plan] == [stops] * 5
+    # The places nearest the centre are used, each once
+    titles = [poi["title"] for day in plan for poi in day]
+    assert sorted(titles) == sorted(poi["title"] for poi in pois[:5 * stops])
+
+
+def test_uneven_places_fill_each_day_up_to_capacity():
+    plan = plan_days(_pois(10), 3)
+
+    assert len(plan) == 3
+    assert sum(len(day) for day in plan) == 10
+    assert max(len(day) for day in plan) <= 4
+
+
+def test_more_days_than_places_leaves_free_days_at_the_end():
+    plan = plan_days(_pois(2), 4)
+
+    assert [len(day) for day in plan] == [1, 1, 0, 0]
+
+
+def test_places_without_coordinates_are_skipped():
+    located = _pois(3)
+
+    plan = plan_days([{"title": "Nowhere", "lat": None, "lon": None}] + located, 1)
+
+    assert sorted(poi["title"] for poi in plan[0]) == sorted(poi["title"] for poi in located)
+
+
+@pytest.mark.parametrize("pois, days, expected", [
+    ([], 3, [[], [], []]),
+    (_pois(5), 0, []),
+    ([{"title": "Nowhere"}], 2, [[], []]),
+])
+def test_nothing_to_plan(pois, days, expected):
+    assert plan_days(pois, days) == expected
+
+
+def test_suggest_itinerary_marks_free_days(monkeypatch):
+    pois = _pois(2)
+    monkeypatch.setattr(agent.poi_index, "places", lambda city: pois)
+
+    suggestion = AIAgent._suggest_itinerary("Lisbon", 4)
+
+    assert [line.split(":")[0] for line in suggestion] == ["Day 1", "Day 2", "Day 3", "Day 4"]
+    assert all(line.startswith(f"Day {i}: Visit Place ") for i, line in enumerate(suggestion[:2], start=1))
+    assert suggestion[2:] == ["Day 3: Free day", "Day 4: Free day"]
+
+
+def test_suggest_itinerary_without_places(monkeypatch):
+    monkeypatch.setattr(agent.poi_index, "places", lambda city: [])
+
+    assert AIAgent._suggest_itinerary("Atlantis", 2) == ["No places found."]
@@ -0,0 +1,148 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import models, poi
+from app.agent import POI_CONTEXT_LIMIT, AIAgent
+from app.poi import DETAILS_BATCH_SIZE, POIIndex
+
+LISBON = ("38.7077507", "-9.1365919")
+PAGES = 120
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+@pytest.fixture
+def wikipedia(monkeypatch):
+    """Serves PAGES geosearch results around any point and their page details.
+
+    Results come back out of distance order; page 1's categories arrive in
+    two parts, behind a ``continue`` token, as the API splits long properties.
+    """
+    pageids = list(range(1, PAGES + 1))
+    random.Random(1).shuffle(pageids)
+    requests = []
+
+    def get(url, params=None, **kwargs):
+        requests.append(params)
+        if params.get("list") == "geosearch":
+            return FakeResponse({"query": {"geosearch": [
+                {"pageid": pageid, "title": f"Place {pageid}", "lat": 38.7, "lon": -9.1, "dist": pageid * 10.0}
+                for pageid in pageids
+            ]}})
+        batch = [int(pageid) for pageid in params["pageids"].split("|")]
+        if "clcontinue" in params:
+            return FakeResponse({"query": {"pages": [{"pageid": 1, "categories": [{"title": "Category:Viewpoints"}]}]}})
+        data = {"query": {"pages": [
+            {
+                "pageid": pageid,
+                "extract": f"About place {pageid}.",
+                "coordinates": [{"lat": 38.0 + pageid / 1000, "lon": -9.0}],
+                "categories": [{"title": "Category:Landmarks in Lisbon"}],
+            }
+            for pageid in batch
+        ]}}
+        if 1 in batch:
+            data["continue"] = {"clcontinue": "1|Viewpoints", "continue": "||"}
+        return FakeResponse(data)
+
+    monkeypatch.setattr(poi.http_client, "get", get)
+    monkeypatch.setattr(poi, "_fetch_city_coords", lambda city: LISBON)
+    return requests
+
+
+def _geosearches(requests):
+    return [params for params in requests if params.get("list") == "geosearch"]
+
+
+def _details(requests):
+    return [params for params in requests if params.get("list") != "geosearch"]
+
+
+def test_page_details_are_fetched_in_batches(wikipedia):
+    pois = poi.fetch_pois(*LISBON)
+
+    assert len(pois) == PAGES
+    details = _details(wikipedia)
+    # Three batches of at most 50 pages, plus the continuation of page 1's categories
+    assert len(details) == 4
+    batches = [params["pageids"].split("|") for params in details if "clcontinue" not in params]
+    assert [len(batch) for batch in batches] == [DETAILS_BATCH_SIZE, DETAILS_BATCH_SIZE, PAGES - 2 * DETAILS_BATCH_SIZE]
+    assert sorted(int(pageid) for batch in batches for pageid in batch) == list(range(1, PAGES + 1))
+
+    first = next(p for p in pois if p["pageid"] == 1)
+    assert first["extract"] == "About place 1."
+    assert first["categories"] == ["Landmarks in Lisbon", "Viewpoints"]
+    assert (first["lat"], first["lon"]) == (38.001, -9.0)
+
+
+def test_index_serves_later_lookups_from_the_database(wikipedia, db):
+    index = POIIndex()
+
+    assert len(index.places("Lisbon")) == PAGES
+    fetches = len(wikipedia)
+    assert db.query(models.PointOfInterest).filter(models.PointOfInterest.city == "lisbon").count() == PAGES
+
+    # Keys ignore case and spacing; a new index, as in another worker, reads the same rows
+    assert len(index.places("  LISBON ")) == PAGES
+    assert len(POIIndex().places("Lisbon")) == PAGES
+    assert len(wikipedia) == fetches
+    assert index.stats() == {"hits": 1, "misses": 1}
+
+
+def test_stale_cities_are_fetched_again(wikipedia, db):
+    index = POIIndex(ttl=3600)
+    index.places("Lisbon")
+    db.query(models.PointOfInterest).update({"fetched_at": datetime.now(timezone.utc) - timedelta(hours=2)})
+    db.commit()
+    fetches = len(wikipedia)
+
+    index.places("Lisbon")
+
+    assert len(wikipedia) > fetches
+    assert db.query(models.PointOfInterest).count() == PAGES
+
+
+def test_limit_returns_the_nearest_places(wikipedia):
+    index = POIIndex()
+    nearest = [f"Place {pageid}" for pageid in range(1, 6)]
+
+    # Both the first fetch and indexed reads are ordered by distance
+    assert [p["title"] for p in index.places("Lisbon", limit=5)] == nearest
+    assert [p["title"] for p in index.places("Lisbon", limit=5)] == nearest
+
+
+def test_agent_place_search_uses_the_index(wikipedia):
+    titles = AIAgent._search_places("Lisbon")
+
+    assert titles == [f"Place {pageid}" for pageid in range(1, POI_CONTEXT_LIMIT + 1)]
+    fetches = len(wikipedia)
+    assert AIAgent._search_places("Lisbon") == titles
+    assert len(wikipedia) == fetches
+
+
+def test_warm_cli_indexes_cities_and_skips_fresh_ones(wikipedia, tmp_path, capsys):
+    cities = tmp_path / "cities.txt"
+    cities.write_text("Porto\n\nKyoto\n")
+
+    poi.main(["warm", "Lisbon", "--file", str(cities)])
+
+    assert capsys.readouterr().out.splitlines() == [f"{city}: {PAGES} places" for city in ("Lisbon", "Porto", "Kyoto")]
+    assert len(_geosearches(wikipedia)) == 3
+
+    poi.main(["warm", "Lisbon"])
+    assert len(_geosearches(wikipedia)) == 3
+
+    poi.main(["warm", "Lisbon", "--refresh"])
+    assert len(_geosearches(wikipedia)) == 4
+    assert capsys.readouterr().out.splitlines() == [f"Lisbon: {PAGES} places"] * 2
@@ -0,0 +1,28 @@
+from datetime import date
+
+import pytest
+
+from app import crud, schemas
+
+
+def _add_itineraries(db, user_id, count):
+    itinerary = schemas.ItineraryCreate(destination="Lisbon", start_date=date(2025, 5, 1), end_date=date(2025, 5, 2))
+    days = [schemas.ItineraryDayBase(day_number=n, title=f"Day {n}") for n in (1, 2)]
+    for _ in range(count):
+        crud.create_user_itinerary(db, itinerary, user_id, content="Day 1: Alfama.", days=days)
+
+
+@pytest.mark.parametrize("itineraries", [1, 10])
+@pytest.mark.parametrize("path", ["/itineraries/", "/users/me/?include=itineraries"])
+def test_itinerary_lists_use_a_fixed_number_of_queries(client, db, make_user, count_queries, path, itineraries):
+    user_id, headers = make_user()
+    _add_itineraries(db, user_id, itineraries)
+
+    with count_queries() as statements:
+        response = client.get(path, headers=headers)
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert len(body if isinstance(body, list) else body["itineraries"]) == itineraries
+    # The current user, then one query for the summaries; days and content are never loaded
+    assert len(statements) == 2, statements
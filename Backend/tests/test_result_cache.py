@@ -0,0 +1,50 @@
+from datetime import date
+
+from app import schemas
+from app.agent import GENERATION_MODE, GENERATION_MODES
+from app.jobs import cached_result
+from app.result_cache import cache_key
+from app.structured import render_itinerary_text
+
+
+def _request(start, end, **options):
+    return schemas.ItineraryCreate(destination="Cape Town", start_date=start, end_date=end, **options)
+
+
+def test_fuzzy_dates_ignored_for_text_itineraries():
+    first = _request(date(2025, 7, 1), date(2025, 7, 3), cache_fuzzy_dates=True)
+    second = _request(date(2025, 7, 10), date(2025, 7, 12), cache_fuzzy_dates=True)
+
+    assert cache_key(first) != cache_key(second)
+    assert cache_key(first) == cache_key(_request(date(2025, 7, 1), date(2025, 7, 3)))
+
+
+def test_fuzzy_dates_match_structured_trips_by_length_and_month():
+    july = _request(date(2025, 7, 1), date(2025, 7, 3), cache_fuzzy_dates=True, structured=True)
+
+    assert cache_key(july) == cache_key(_request(date(2025, 7, 20), date(2025, 7, 22), cache_fuzzy_dates=True, structured=True))
+    assert cache_key(july) != cache_key(_request(date(2025, 7, 20), date(2025, 7, 23), cache_fuzzy_dates=True, structured=True))
+    # Same season in the north, but a different month
+    assert cache_key(july) != cache_key(_request(date(2025, 8, 1), date(2025, 8, 3), cache_fuzzy_dates=True, structured=True))
+
+
+def test_generation_mode_only_keys_when_it_differs_from_the_default():
+    default = _request(date(2025, 7, 1), date(2025, 7, 3))
+    other_mode = next(mode for mode in GENERATION_MODES if mode != GENERATION_MODE)
+
+    assert cache_key(default) == cache_key(_request(date(2025, 7, 1), date(2025, 7, 3), generation_mode=GENERATION_MODE))
+    assert cache_key(default) != cache_key(_request(date(2025, 7, 1), date(2025, 7, 3), generation_mode=other_mode))
+
+
+def test_fuzzy_structured_hit_is_redated_to_the_request():
+    cached = schemas.StructuredItinerary(days=[
+        {"day_number": 1, "date": "2025-07-01", "title": "Table Mountain", "activities": []},
+        {"day_number": 2, "date": "2025-07-02", "title": "Cape Point", "activities": []},
+    ]).json()
+    request = _request(date(2025, 7, 20), date(2025, 7, 21), cache_fuzzy_dates=True, structured=True)
+
+    content, days = cached_result(request, cached)
+
+    assert [day.date for day in days] == [date(2025, 7, 20), date(2025, 7, 21)]
+    assert content == render_itinerary_text(days)
+    assert "2025-07-01" not in content
@@ -0,0 +1,97 @@
+from datetime import date
+
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app import crud, models, schemas
+
+
+def _add(db, user_id, destination, content, trip_theme=(), **preferences):
+    itinerary = schemas.ItineraryCreate(
+        destination=destination,
+        start_date=date(2025, 5, 1),
+        end_date=date(2025, 5, 3),
+        trip_theme=list(trip_theme),
+        **preferences,
+    )
+    return crud.create_user_itinerary(db, itinerary, user_id, content=content).id
+
+
+def _search(client, headers, **params):
+    response = client.get("/itineraries/search", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return [itinerary["id"] for itinerary in response.json()]
+
+
+def test_search_by_text(client, db, make_user):
+    user_id, headers = make_user()
+    louvre = _add(db, user_id, "Paris", "Day 1: Visit the Louvre and walk along the Seine.")
+    alps = _add(db, user_id, "Chamonix", "Day 1: Cable car up the Aiguille du Midi.")
+    goa = _add(db, user_id, "Goa", "Day 1: Beach day, then dinner in Panjim.")
+
+    assert _search(client, headers, q="louvre") == [louvre]
+    assert _search(client, headers, q="Chamonix") == [alps]
+    assert _search(client, headers, q="beach dinner") == [goa]
+    assert _search(client, headers, q="submarine") == []
+
+
+def test_search_text_is_scoped_to_the_user(client, db, make_user):
+    user_id, headers = make_user("alice")
+    other_id, _ = make_user("bob")
+    mine = _add(db, user_id, "Paris", "Museums all day.")
+    _add(db, other_id, "Paris", "Museums all day.")
+
+    assert _search(client, headers, q="museums") == [mine]
+
+
+def test_search_by_theme(client, db, make_user):
+    user_id, headers = make_user()
+    hiking = _add(db, user_id, "Chamonix", "Hiking.", trip_theme=["Adventure"])
+    temples = _add(db, user_id, "Kyoto", "Temples.", trip_theme=["Religious", "Cultural"])
+    _add(db, user_id, "Goa", "Beaches.")
+
+    assert _search(client, headers, trip_theme="adventure") == [hiking]
+    # Any of the given themes matches; newest first without a text query
+    assert _search(client, headers, trip_theme=["cultural", "adventure"]) == [temples, hiking]
+    # Aliases are mapped like they are on create
+    assert _search(client, headers, trip_theme="spiritual") == [temples]
+
+
+def test_search_text_theme_and_filters_combined(client, db, make_user):
+    user_id, headers = make_user()
+    match = _add(db, user_id, "Kyoto", "Day 1: Fushimi Inari shrine at dawn.", trip_theme=["Religious"], budget="Moderate")
+    _add(db, user_id, "Kyoto", "Day 1: Fushimi Inari shrine at dawn.", trip_theme=["Adventure"], budget="Moderate")
+    _add(db, user_id, "Kyoto", "Day 1: Fushimi Inari shrine at dawn.", trip_theme=["Religious"], budget="Luxury")
+    _add(db, user_id, "Nara", "Day 1: Deer park.", trip_theme=["Religious"], budget="Moderate")
+
+    assert _search(client, headers, q="shrine", trip_theme="religious", budget="Moderate") == [match]
+    assert _search(client, headers, q="shrine", trip_theme="religious", date_from="2025-06-01") == []
+
+
+def test_search_rejects_unknown_theme(client, auth_headers):
+    response = client.get("/itineraries/search", params={"trip_theme": "underwater"}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+
+def test_theme_filter_is_typed_for_postgres():
+    # Runs everywhere; tests/test_search_postgres.py runs it against a server
+    query = crud._itinerary_search_query("postgresql", 1, trip_theme=["adventure", "cultural"])
+
+    sql = str(query.compile(dialect=asyncpg.dialect()))
+
+    assert "itineraries.trip_theme && CAST(ARRAY[$2::VARCHAR, $3::VARCHAR] AS VARCHAR[])" in sql
+
+
+def test_rows_saved_before_validation_are_still_readable(client, db, make_user):
+    user_id, headers = make_user()
+    legacy = models.Itinerary(
+        destination="Chamonix", start_date=date(2025, 5, 1), end_date=date(2025, 5, 3),
+        owner_id=user_id, content="Hiking.", trip_theme=["Adventure", "Mountains"], group_type="Backpackers",
+    )
+    db.add(legacy)
+    db.commit()
+
+    for path in ("/itineraries/", f"/itineraries/{legacy.id}", "/profile?include=itineraries"):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, (path, response.text)
+    assert client.get(f"/itineraries/{legacy.id}", headers=headers).json()["trip_theme"] == ["Adventure", "Mountains"]
@@ -0,0 +1,71 @@
+import json
+
+from app import main
+from app.agent import AgentUnavailable, AIAgent
+from app.fake_llm import FAKE_ITINERARY
+
+REQUEST = {"destination": "Lisbon", "start_date": "2025-05-01", "end_date": "2025-05-03", "generation_mode": "pipeline"}
+
+
+def _records(response):
+    assert response.headers["content-type"] == "application/x-ndjson"
+    # Every line is one complete JSON record
+    lines = response.text.split("\n")
+    assert lines[-1] == ""
+    return [json.loads(line) for line in lines[:-1]]
+
+
+def test_stream_frames_chunks_and_saves_the_itinerary(client, make_user):
+    _, headers = make_user()
+
+    response = client.post("/itineraries/stream", json=REQUEST, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.headers["X-Cache"] == "MISS"
+    records = _records(response)
+    assert [record["type"] for record in records[:-1]] == ["chunk"] * (len(records) - 1)
+    assert len(records) > 2
+    content = "".join(record["text"] for record in records[:-1])
+    assert content == FAKE_ITINERARY
+    done = records[-1]
+    assert done["type"] == "done"
+    assert done["itinerary"]["content"] == content
+    saved = client.get(f"/itineraries/{done['itinerary']['id']}", headers=headers).json()
+    assert saved["content"] == content
+
+    # The streamed result is cached for the next identical request
+    again = client.post("/itineraries/stream", json=REQUEST, headers=headers)
+    assert again.headers["X-Cache"] == "HIT"
+    assert "".join(r["text"] for r in _records(again) if r["type"] == "chunk") == content
+
+
+def test_stream_reports_llm_failures_as_an_error_record(client, make_user, monkeypatch):
+    _, headers = make_user()
+
+    def stream_itinerary(self, *args, **kwargs):
+        yield "Day 1: "
+        raise RuntimeError("Injected LLM failure")
+
+    monkeypatch.setattr(AIAgent, "stream_itinerary", stream_itinerary)
+    response = client.post("/itineraries/stream", json=REQUEST, headers=headers)
+
+    assert response.status_code == 200
+    assert _records(response) == [
+        {"type": "chunk", "text": "Day 1: "},
+        {"type": "error", "detail": "Injected LLM failure"},
+    ]
+    assert client.get("/itineraries/", headers=headers).json() == []
+
+
+def test_stream_without_an_agent_returns_503(client, make_user, monkeypatch):
+    _, headers = make_user()
+
+    def get_agent(tier=None):
+        raise AgentUnavailable("GOOGLE_API_KEY environment variable not set.")
+
+    monkeypatch.setattr(main, "get_agent", get_agent)
+    response = client.post("/itineraries/stream", json=REQUEST, headers=headers)
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Itinerary generation is currently unavailable"}
+    assert client.get("/itineraries/", headers=headers).json() == []
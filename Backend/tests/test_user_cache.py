@@ -0,0 +1,84 @@
+import pytest
+
+from app import models
+from app.user_cache import user_cache
+
+
+@pytest.fixture(autouse=True)
+def cached_users(monkeypatch):
+    # The suite runs with the cache off; these tests turn it on
+    monkeypatch.setattr(user_cache, "ttl", 30)
+    monkeypatch.setattr(user_cache, "_entries", {})
+
+
+def _me(client, headers):
+    return client.get("/users/me/", headers=headers)
+
+
+def test_repeat_requests_are_served_from_the_cache(client, make_user):
+    _, headers = make_user()
+    _me(client, headers)
+    hits = user_cache.hits
+
+    assert _me(client, headers).json()["username"] == "alice"
+    assert user_cache.hits == hits + 1
+
+
+def test_change_password_invalidates_the_cached_user(client, make_user):
+    _, headers = make_user()
+    _me(client, headers)
+
+    response = client.post("/change-password", json={"current_password": "secret", "new_password": "changed"}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert "alice" not in user_cache._entries
+    # A stale cached hash would still expect the old password here
+    response = client.post("/change-password", json={"current_password": "changed", "new_password": "again"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_updating_a_user_invalidates_the_cached_user(client, db, make_user):
+    user_id, headers = make_user()
+    _me(client, headers)
+
+    db.get(models.User, user_id).email = "alice@example.org"
+    db.commit()
+
+    assert "alice" not in user_cache._entries
+    assert _me(client, headers).json()["email"] == "alice@example.org"
+
+
+def test_rolled_back_changes_keep_the_cached_user(client, db, make_user):
+    user_id, headers = make_user()
+    _me(client, headers)
+
+    db.get(models.User, user_id).email = "alice@example.org"
+    db.flush()
+    db.rollback()
+
+    assert "alice" in user_cache._entries
+    assert _me(client, headers).json()["email"] == "alice@example.com"
+
+
+def test_a_deleted_users_token_misses_the_cache(client, db, make_user):
+    user_id, headers = make_user()
+    _me(client, headers)
+
+    db.delete(db.get(models.User, user_id))
+    db.commit()
+
+    assert "alice" not in user_cache._entries
+    # The token's uid no longer resolves to a user
+    assert _me(client, headers).status_code == 401
+
+
+def test_renaming_a_user_invalidates_the_old_name(client, db, make_user):
+    user_id, headers = make_user()
+    _me(client, headers)
+
+    db.get(models.User, user_id).username = "carol"
+    db.commit()
+
+    assert "alice" not in user_cache._entries
+    # The token's uid now belongs to a user with another name
+    assert _me(client, headers).status_code == 401
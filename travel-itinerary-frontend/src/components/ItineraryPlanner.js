@@ -38,13 +38,26 @@ const ItineraryPlanner = ({ logout, user }) => {
         );
     };
 
+    const waitForJob = async (jobId) => {
+        for (;;) {
+            const { data: job } = await apiClient.get(`/jobs/${jobId}`);
+            if (job.status === 'succeeded') {
+                return job.itinerary;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error);
+            }
+            await new Promise(resolve => setTimeout(resolve, 2000));
+        }
+    };
+
     const handleSubmit = async (e) => {
         e.preventDefault();
         setError('');
         setSuccess('');
 
         try {
-            const response = await apiClient.post('/itineraries/', {
+            const { data: job } = await apiClient.post('/itineraries/', {
                 destination,
                 start_date: startDate,
                 end_date: endDate,
@@ -54,11 +67,14 @@ const ItineraryPlanner = ({ logout, user }) => {
                 travel_mode: travelMode || null,
                 group_type: groupType || null
             });
-            setSuccess(`Successfully created itinerary for ${response.data.destination}!`);
+            setSuccess('Your itinerary is being generated...');
+            const itinerary = await waitForJob(job.id);
+            setSuccess(`Successfully created itinerary for ${itinerary.destination}!`);
             setTimeout(() => {
                 navigate('/past-trips');
             }, 2000);
         } catch (err) {
+            setSuccess('');
             setError('Failed to create itinerary. Please try again.');
         }
     };
@@ -110,7 +110,7 @@ const PastTrips = ({ token, logout, user }) => {
                                                     <div className="flex items-center justify-between">
                                                         <h3 className="text-lg font-semibold text-gray-900">{trip.destination}</h3>
                                                         <button 
-                                                            onClick={() => handleDownload(trip.id, trip.pdf_path)}
+                                                            onClick={() => handleDownload(trip.id, `itinerary_${trip.destination}.pdf`)}
                                                             className="px-4 py-2 bg-indigo-600 text-white text-sm font-medium rounded-md hover:bg-indigo-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500"
                                                         >
                                                             Download PDF